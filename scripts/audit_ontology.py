@@ -2,21 +2,206 @@
 Ontology Audit - Node Count & Confidence Assessment
 """
 
+import hashlib
 import json
+import sys
 from pathlib import Path
 from collections import defaultdict
 
+from task_model import TaskOntology
+
 SCHEMA_DIR = Path("schema")
 CROSSWALK_DIR = Path("crosswalk")
 
+AUDIT_CACHE = SCHEMA_DIR / ".audit_cache.json"
+AUDIT_CACHE_VERSION = 1     # bump when any audit_* counter changes
+
+
 def load_json(path):
     if path.exists():
         with open(path) as f:
             return json.load(f)
     return {}
 
-def count_nodes():
-    """Count all nodes in the ontology"""
+# =============================================================================
+# LAYER AUDITS - one pass over each parsed document, returning (stats, gaps)
+# =============================================================================
+
+def audit_task_ontology(doc):
+    task_ont = TaskOntology.from_json(doc)
+    return {
+        "trades": len(task_ont.trades),
+        "phases": len(task_ont.phases),
+        "tasks": len(task_ont.tasks),
+        "confidence": "MEDIUM",
+        "source": "User seed + O*NET"
+    }, []
+
+def audit_trade_definitions(doc):
+    trades = doc.get("trades", {})
+    mapped = sum(1 for t in trades.values() if t.get("naics") != "UNMAPPED")
+    unmapped = len(trades) - mapped
+
+    stats = {
+        "total_trades": len(trades),
+        "naics_mapped": mapped,
+        "unmapped": unmapped,
+        "confidence": "HIGH" if unmapped == 0 else "MEDIUM",
+        "source": "NAICS + Uniclass crosswalk"
+    }
+    gaps = [f"{unmapped} trades lack NAICS mapping"] if unmapped > 0 else []
+    return stats, gaps
+
+def audit_schedule(doc):
+    sched_tasks = doc.get("schedule_tasks", {})
+    task_count = 0
+    inspection_count = 0
+    has_predecessor = 0
+
+    for phase, subphases in sched_tasks.items():
+        if not isinstance(subphases, dict):
+            continue
+        if "tasks" in subphases:
+            # Direct tasks (like CLOSE_OUT)
+            task_lists = [subphases.get("tasks", [])]
+        else:
+            # Nested subphases
+            task_lists = [data.get("tasks", []) for data in subphases.values()
+                          if isinstance(data, dict) and "tasks" in data]
+        for tasks in task_lists:
+            for t in tasks:
+                task_count += 1
+                if t.get("predecessor"):
+                    has_predecessor += 1
+                if t.get("inspection"):
+                    inspection_count += 1
+
+    stats = {
+        "schedule_tasks": task_count,
+        "with_predecessors": has_predecessor,
+        "without_predecessors": task_count - has_predecessor,
+        "inspections": inspection_count,
+        "draws": len(sched_tasks.get("DRAWS", {}).get("draws", [])),
+        "confidence": "HIGH",
+        "source": "User workflow template"
+    }
+    gaps = []
+    predecessor_pct = (has_predecessor / task_count * 100) if task_count > 0 else 0
+    if predecessor_pct < 80:
+        gaps.append(f"Only {predecessor_pct:.0f}% of schedule tasks have predecessors defined")
+    return stats, gaps
+
+def audit_cost_model(doc):
+    line_items = 0
+    linked_to_trade = 0
+
+    for cat_name, cat_data in doc.get("cost_categories", {}).items():
+        for sub_name, sub_data in cat_data.get("subcategories", {}).items():
+            for item in sub_data.get("line_items", []):
+                line_items += 1
+                if item.get("trade"):
+                    linked_to_trade += 1
+
+    stats = {
+        "line_items": line_items,
+        "linked_to_trade": linked_to_trade,
+        "unlinked": line_items - linked_to_trade,
+        "confidence": "MEDIUM",
+        "source": "User budget template"
+    }
+    gaps = []
+    link_pct = (linked_to_trade / line_items * 100) if line_items > 0 else 0
+    if link_pct < 90:
+        gaps.append(f"Only {link_pct:.0f}% of cost items linked to trades")
+    return stats, gaps
+
+def audit_product_rules(doc):
+    product_count = sum(len(cat_data.get("products", []))
+                        for cat_data in doc.get("product_categories", {}).values())
+    rule_count = 0
+    task_rules = 0
+
+    for trade, tasks in doc.get("task_product_rules", {}).items():
+        if isinstance(tasks, dict):
+            for task_name, task_data in tasks.items():
+                if isinstance(task_data, dict):
+                    task_rules += 1
+                    rule_count += len(task_data.get("rules", []))
+
+    stats = {
+        "products": product_count,
+        "task_rules": task_rules,
+        "conditions": rule_count,
+        "constraints": len(doc.get("constraint_rules", {}).get("rules", [])),
+        "confidence": "LOW",
+        "source": "Generated - needs validation"
+    }
+    return stats, ["Product rules need expert validation"]
+
+def audit_crosswalk(doc):
+    mappings = doc.get("mappings", [])
+    by_tier = defaultdict(int)
+    for m in mappings:
+        by_tier[m.get("confidence_tier", 4)] += 1
+
+    stats = {
+        "total_mappings": len(mappings),
+        "tier_1_ground_truth": by_tier.get(1, 0),
+        "tier_2_high": by_tier.get(2, 0),
+        "tier_3_medium": by_tier.get(3, 0),
+        "tier_4_low": by_tier.get(4, 0),
+        "confidence": "VALIDATED",
+        "source": "NAICS + Uniclass + O*NET + BLS triangulation"
+    }
+    gaps = []
+    tier4_pct = (by_tier.get(4, 0) / len(mappings) * 100) if mappings else 0
+    if tier4_pct > 15:
+        gaps.append(f"{tier4_pct:.0f}% of crosswalk mappings are low confidence")
+    return stats, gaps
+
+# Report order
+LAYERS = [
+    ("Task Ontology", SCHEMA_DIR / "task_ontology.json", audit_task_ontology),
+    ("Trade Definitions", SCHEMA_DIR / "trade_definitions.json", audit_trade_definitions),
+    ("Schedule Ontology", SCHEMA_DIR / "schedule_ontology.json", audit_schedule),
+    ("Cost Model", SCHEMA_DIR / "cost_model.json", audit_cost_model),
+    ("Product Rules", SCHEMA_DIR / "product_rules.json", audit_product_rules),
+    ("Classification Crosswalk", CROSSWALK_DIR / "final_crosswalk.json", audit_crosswalk),
+]
+
+# =============================================================================
+# CACHED AUDIT
+# =============================================================================
+
+def load_audit_cache():
+    cache = load_json(AUDIT_CACHE)
+    if cache.get("version") != AUDIT_CACHE_VERSION:
+        return {"version": AUDIT_CACHE_VERSION, "files": {}}
+    return cache
+
+def audit_layer(path, auditor, cached):
+    """Return (entry, reused) for one source file.
+
+    Unchanged size + mtime reuses the cached counts without reading the
+    file; otherwise the file is read once, and its hash decides whether
+    the cached counts still apply before it is parsed and walked.
+    """
+    stat = path.stat()
+    stamp = [stat.st_size, stat.st_mtime_ns]
+    if cached and cached.get("stat") == stamp:
+        return cached, True
+
+    raw = path.read_bytes()
+    digest = hashlib.sha256(raw).hexdigest()
+    if cached and cached.get("sha256") == digest:
+        return dict(cached, stat=stamp), True
+
+    doc = json.loads(raw) if raw.strip() else {}
+    stats, gaps = auditor(doc) if doc else (None, [])
+    return {"sha256": digest, "stat": stamp, "stats": stats, "gaps": gaps}, False
+
+def audit_sources(use_cache=True):
+    """Count all nodes in the ontology; returns (counts, layers served from cache)"""
 
     counts = {
         "layer": {},
@@ -25,169 +210,23 @@ def count_nodes():
         "gaps": []
     }
 
-    # 1. TASK ONTOLOGY
-    task_ont = load_json(SCHEMA_DIR / "task_ontology.json")
-    if task_ont:
-        trades = task_ont.get("trades", {})
-        task_count = 0
-        phase_count = 0
-        for trade_name, trade_data in trades.items():
-            phases = trade_data.get("phases", {})
-            phase_count += len(phases)
-            for phase_name, phase_data in phases.items():
-                tasks = phase_data.get("tasks", [])
-                task_count += len(tasks)
-
-        counts["layer"]["Task Ontology"] = {
-            "trades": len(trades),
-            "phases": phase_count,
-            "tasks": task_count,
-            "confidence": "MEDIUM",
-            "source": "User seed + O*NET"
-        }
-
-    # 2. TRADE DEFINITIONS
-    trade_def = load_json(SCHEMA_DIR / "trade_definitions.json")
-    if trade_def:
-        trades = trade_def.get("trades", {})
-        mapped = sum(1 for t in trades.values() if t.get("naics") != "UNMAPPED")
-        unmapped = len(trades) - mapped
-
-        counts["layer"]["Trade Definitions"] = {
-            "total_trades": len(trades),
-            "naics_mapped": mapped,
-            "unmapped": unmapped,
-            "confidence": "HIGH" if unmapped == 0 else "MEDIUM",
-            "source": "NAICS + Uniclass crosswalk"
-        }
-        if unmapped > 0:
-            counts["gaps"].append(f"{unmapped} trades lack NAICS mapping")
-
-    # 3. SCHEDULE ONTOLOGY
-    sched = load_json(SCHEMA_DIR / "schedule_ontology.json")
-    if sched:
-        sched_tasks = sched.get("schedule_tasks", {})
-        task_count = 0
-        inspection_count = 0
-        has_predecessor = 0
-        no_predecessor = 0
-
-        for phase, subphases in sched_tasks.items():
-            if isinstance(subphases, dict):
-                if "tasks" in subphases:
-                    # Direct tasks (like CLOSE_OUT)
-                    for t in subphases.get("tasks", []):
-                        task_count += 1
-                        if t.get("predecessor"):
-                            has_predecessor += 1
-                        else:
-                            no_predecessor += 1
-                        if t.get("inspection"):
-                            inspection_count += 1
-                else:
-                    # Nested subphases
-                    for subphase, data in subphases.items():
-                        if isinstance(data, dict) and "tasks" in data:
-                            for t in data.get("tasks", []):
-                                task_count += 1
-                                if t.get("predecessor"):
-                                    has_predecessor += 1
-                                else:
-                                    no_predecessor += 1
-                                if t.get("inspection"):
-                                    inspection_count += 1
-
-        counts["layer"]["Schedule Ontology"] = {
-            "schedule_tasks": task_count,
-            "with_predecessors": has_predecessor,
-            "without_predecessors": no_predecessor,
-            "inspections": inspection_count,
-            "draws": len(sched.get("schedule_tasks", {}).get("DRAWS", {}).get("draws", [])),
-            "confidence": "HIGH",
-            "source": "User workflow template"
-        }
-
-        predecessor_pct = (has_predecessor / task_count * 100) if task_count > 0 else 0
-        if predecessor_pct < 80:
-            counts["gaps"].append(f"Only {predecessor_pct:.0f}% of schedule tasks have predecessors defined")
-
-    # 4. COST MODEL
-    cost = load_json(SCHEMA_DIR / "cost_model.json")
-    if cost:
-        line_items = 0
-        linked_to_trade = 0
-
-        for cat_name, cat_data in cost.get("cost_categories", {}).items():
-            for sub_name, sub_data in cat_data.get("subcategories", {}).items():
-                for item in sub_data.get("line_items", []):
-                    line_items += 1
-                    if item.get("trade"):
-                        linked_to_trade += 1
-
-        counts["layer"]["Cost Model"] = {
-            "line_items": line_items,
-            "linked_to_trade": linked_to_trade,
-            "unlinked": line_items - linked_to_trade,
-            "confidence": "MEDIUM",
-            "source": "User budget template"
-        }
-
-        link_pct = (linked_to_trade / line_items * 100) if line_items > 0 else 0
-        if link_pct < 90:
-            counts["gaps"].append(f"Only {link_pct:.0f}% of cost items linked to trades")
-
-    # 5. PRODUCT RULES
-    products = load_json(SCHEMA_DIR / "product_rules.json")
-    if products:
-        product_count = 0
-        rule_count = 0
-        task_rules = 0
-
-        for cat_name, cat_data in products.get("product_categories", {}).items():
-            product_count += len(cat_data.get("products", []))
-
-        for trade, tasks in products.get("task_product_rules", {}).items():
-            if isinstance(tasks, dict):
-                for task_name, task_data in tasks.items():
-                    if isinstance(task_data, dict):
-                        task_rules += 1
-                        rules = task_data.get("rules", [])
-                        rule_count += len(rules)
-
-        constraint_count = len(products.get("constraint_rules", {}).get("rules", []))
-
-        counts["layer"]["Product Rules"] = {
-            "products": product_count,
-            "task_rules": task_rules,
-            "conditions": rule_count,
-            "constraints": constraint_count,
-            "confidence": "LOW",
-            "source": "Generated - needs validation"
-        }
-        counts["gaps"].append("Product rules need expert validation")
-
-    # 6. CROSSWALK (from earlier work)
-    crosswalk = load_json(CROSSWALK_DIR / "final_crosswalk.json")
-    if crosswalk:
-        mappings = crosswalk.get("mappings", [])
-        by_tier = defaultdict(int)
-        for m in mappings:
-            tier = m.get("confidence_tier", 4)
-            by_tier[tier] += 1
-
-        counts["layer"]["Classification Crosswalk"] = {
-            "total_mappings": len(mappings),
-            "tier_1_ground_truth": by_tier.get(1, 0),
-            "tier_2_high": by_tier.get(2, 0),
-            "tier_3_medium": by_tier.get(3, 0),
-            "tier_4_low": by_tier.get(4, 0),
-            "confidence": "VALIDATED",
-            "source": "NAICS + Uniclass + O*NET + BLS triangulation"
-        }
-
-        tier4_pct = (by_tier.get(4, 0) / len(mappings) * 100) if mappings else 0
-        if tier4_pct > 15:
-            counts["gaps"].append(f"{tier4_pct:.0f}% of crosswalk mappings are low confidence")
+    cache = load_audit_cache() if use_cache else {"version": AUDIT_CACHE_VERSION, "files": {}}
+    files = {}
+    reused = []
+    for layer, path, auditor in LAYERS:
+        if not path.exists():
+            continue
+        entry, hit = audit_layer(path, auditor, cache["files"].get(str(path)))
+        files[str(path)] = entry
+        if hit:
+            reused.append(layer)
+        if entry["stats"] is not None:
+            counts["layer"][layer] = entry["stats"]
+            counts["gaps"].extend(entry["gaps"])
+
+    if use_cache and files != cache["files"]:
+        with open(AUDIT_CACHE, "w") as f:
+            json.dump({"version": AUDIT_CACHE_VERSION, "files": files}, f, indent=2)
 
     # Total nodes
     total = 0
@@ -197,7 +236,11 @@ def count_nodes():
                 total += val
     counts["total"] = total
 
-    return counts
+    return counts, reused
+
+def count_nodes(use_cache=True):
+    """Count all nodes in the ontology"""
+    return audit_sources(use_cache)[0]
 
 def assess_deployability(counts):
     """Assess if ontology is ready for use"""
@@ -409,9 +452,17 @@ def print_report(counts, assessment):
         print(f"{uc:<35} {ready:<10} {notes}")
 
 def main():
-    counts = count_nodes()
+    # --no-cache re-walks every layer; --quiet prints one summary line
+    # (for CI and pre-save hooks)
+    args = sys.argv[1:]
+    counts, reused = audit_sources(use_cache="--no-cache" not in args)
     assessment = assess_deployability(counts)
-    print_report(counts, assessment)
+    if "--quiet" in args:
+        print(f"Audit: {counts['total']} nodes, {len(counts['gaps'])} gaps, "
+              f"{assessment['overall']} ({assessment['weighted_score']*100:.0f}%), "
+              f"{len(reused)}/{len(counts['layer'])} layers cached")
+    else:
+        print_report(counts, assessment)
 
     # Save audit results
     output = {
@@ -423,7 +474,8 @@ def main():
     with open(SCHEMA_DIR / "audit_results.json", "w") as f:
         json.dump(output, f, indent=2, default=str)
 
-    print(f"\nAudit saved to: {SCHEMA_DIR / 'audit_results.json'}")
+    if "--quiet" not in args:
+        print(f"\nAudit saved to: {SCHEMA_DIR / 'audit_results.json'}")
 
 if __name__ == "__main__":
     main()
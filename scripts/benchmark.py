@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""Benchmark the crosswalk pipeline stages on synthetic corpora.
+
+Builds synthetic NAICS/Uniclass corpora at several multiples of the sizes
+in extracted/ and times each stage against them:
+
+  linguistic      match_naics_to_uniclass (all five tables)
+  embedding       build_embedding_candidates
+  cooccurrence    build_cooccurrence_candidates
+  hierarchy       propagate_mappings (ss + pr)
+  classify_tiers  classify_tiers over all candidate files
+  final_merge     final_merge.main
+
+Corpus at scale N: replica 0 is the real data; replicas 1..N-1 copy every
+node under a replica-specific code (NAICS '238130' -> '23' '0rr' '8130',
+Uniclass 'Ss_25_10' -> 'Ss_25rr_10') so code hierarchies keep their
+shape, and resample 30% of each name's words from the table's own word
+frequencies. Candidate files are replicated the same way so the
+downstream stages see realistic candidate volumes.
+
+Each stage runs in a fresh interpreter so peak RSS is per stage. Pairwise
+stages whose NAICS x Uniclass pair count exceeds MAX_PAIRS are timed on
+a sample of NAICS sources and their wall time is extrapolated (marked in
+the report). Stages that exceed STAGE_TIMEOUT are recorded as timed out.
+
+Results go to reports/benchmark.json and are compared against
+reports/benchmark_baseline.json when it exists (exit code 1 if any stage
+is slower than REGRESSION_TOLERANCE x its baseline wall time).
+
+Usage: benchmark.py [scales] [--save-baseline] [--max-pairs=N] [--timeout=S]
+       e.g. benchmark.py 1,10,100
+"""
+
+import contextlib
+import io
+import json
+import multiprocessing
+import random
+import re
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+BASE = Path(__file__).parent.parent
+EXTRACTED = BASE / "extracted"
+CANDIDATES = BASE / "candidates"
+REPORTS = BASE / "reports"
+
+REPORT_FILE = REPORTS / "benchmark.json"
+BASELINE_FILE = REPORTS / "benchmark_baseline.json"
+
+DEFAULT_SCALES = [1, 10, 100]
+MAX_PAIRS = 2_000_000
+STAGE_TIMEOUT = 900
+REGRESSION_TOLERANCE = 1.25
+MIN_REGRESSION_S = 0.05     # ignore noise on stages that take milliseconds
+PERTURB_RATE = 0.3
+SEED = 42
+
+UNICLASS_TABLES = ['ss', 'pr', 'ac', 'en', 'co']
+STAGES = ['linguistic', 'embedding', 'cooccurrence', 'hierarchy', 'classify_tiers', 'final_merge']
+
+STOPWORDS = {'and', 'or', 'the', 'a', 'an', 'of', 'for', 'to', 'in', 'on', 'with', 'by', 'as', 'at', 'from'}
+
+
+# =============================================================================
+# SYNTHETIC CORPUS
+# =============================================================================
+
+def normalize(text: str) -> list:
+    """Same tokenization as extract_nodes.normalize."""
+    text = re.sub(r'[^a-z0-9\s]', ' ', text.lower())
+    return sorted(set(text.split()) - STOPWORDS)
+
+
+def replica_code(code: str, r: int) -> str:
+    """Code of replica r (0 = the real code).
+
+    NAICS gets a '0rr' tag after the sector (no real code has '0' as its
+    third digit); Uniclass gets 'rr' appended to the group number. Table
+    and sector roots are shared by all replicas.
+    """
+    if r == 0:
+        return code
+    if code.isdigit():
+        return code if len(code) <= 2 else f"{code[:2]}0{r:02d}{code[2:]}"
+    parts = code.split('_')
+    if len(parts) < 2:
+        return code
+    parts[1] = f"{parts[1]}{r:02d}"
+    return '_'.join(parts)
+
+
+def replica_id(node_id: str, r: int) -> str:
+    prefix, _, code = node_id.partition(':')
+    return f"{prefix}:{replica_code(code, r)}" if code else node_id
+
+
+def perturb_name(name: str, words: list, rng: random.Random) -> str:
+    return ' '.join(rng.choice(words) if rng.random() < PERTURB_RATE else w for w in name.split())
+
+
+def replicate_nodes(nodes: list, scale: int, rng: random.Random) -> list:
+    words = [w for n in nodes for w in n['name'].split()]
+    out = list(nodes)
+    for r in range(1, scale):
+        for n in nodes:
+            code = replica_code(n['code'], r)
+            if code == n['code']:
+                continue
+            name = perturb_name(n['name'], words, rng)
+            out.append(dict(n, id=replica_id(n['id'], r), code=code, name=name, tokens=normalize(name)))
+    return out
+
+
+def replicate_candidates(items: list, scale: int) -> list:
+    """Copy each candidate record into every replica (ids mapped alike)."""
+    id_keys = ('source_id', 'target_id', 'parent_source', 'parent_target')
+    out = list(items)
+    for r in range(1, scale):
+        for item in items:
+            copy = {k: replica_id(v, r) if k in id_keys else v for k, v in item.items()}
+            if 'matches' in item:
+                copy['matches'] = [{k: replica_id(v, r) if k in id_keys else v for k, v in m.items()}
+                                   for m in item['matches']]
+            out.append(copy)
+    return out
+
+
+def build_corpus(root: Path, scale: int, seed: int = SEED) -> dict:
+    """Write extracted/ and candidates/ for one scale under root."""
+    rng = random.Random(seed)
+    (root / "extracted").mkdir(parents=True)
+    (root / "candidates").mkdir()
+    (root / "crosswalk").mkdir()
+
+    sizes = {}
+    for name in ['naics'] + [f"uniclass_{t}" for t in UNICLASS_TABLES]:
+        with open(EXTRACTED / f"{name}.json") as f:
+            nodes = replicate_nodes(json.load(f), scale, rng)
+        with open(root / "extracted" / f"{name}.json", 'w') as f:
+            json.dump(nodes, f)
+        sizes[name] = len(nodes)
+
+    for path in sorted(CANDIDATES.glob("naics_to_uniclass_*.json")):
+        with open(path) as f:
+            items = replicate_candidates(json.load(f), scale)
+        with open(root / "candidates" / path.name, 'w') as f:
+            json.dump(items, f)
+    return sizes
+
+
+def sample_extracted(root: Path, naics: list) -> Path:
+    """Extracted dir with a NAICS subset and the full Uniclass tables."""
+    sample = root / "extracted_sample"
+    if sample.exists():
+        shutil.rmtree(sample)
+    sample.mkdir()
+    with open(sample / "naics.json", 'w') as f:
+        json.dump(naics, f)
+    for t in UNICLASS_TABLES:
+        (sample / f"uniclass_{t}.json").symlink_to(root / "extracted" / f"uniclass_{t}.json")
+    return sample
+
+
+# =============================================================================
+# STAGES (each runs in its own interpreter)
+# =============================================================================
+
+def _load(root: Path, name: str) -> list:
+    with open(root / "extracted" / f"{name}.json") as f:
+        return json.load(f)
+
+
+def _sample_sources(sources: list, targets: int, max_pairs: int) -> list:
+    """All sources, or a seeded sample small enough for the pair budget."""
+    if len(sources) * targets <= max_pairs:
+        return sources
+    k = max(1, max_pairs // max(targets, 1))
+    return random.Random(SEED).sample(sources, k)
+
+
+def stage_linguistic(root: Path, max_pairs: int) -> dict:
+    from linguistic_match import match_naics_to_uniclass
+    naics = [n for n in _load(root, "naics") if n['code'].startswith('23')]
+    tables = [_load(root, f"uniclass_{t}") for t in UNICLASS_TABLES]
+    pairs = len(naics) * sum(len(u) for u in tables)
+    sample = _sample_sources(naics, sum(len(u) for u in tables), max_pairs)
+    k = len(sample)
+    start = time.perf_counter()
+    for uniclass in tables:
+        match_naics_to_uniclass(sample, uniclass)
+    wall = time.perf_counter() - start
+    return {'wall_s': wall * len(naics) / k, 'measured_s': wall, 'items': pairs,
+            'sampled': k < len(naics), 'sample_fraction': k / len(naics) if naics else 1}
+
+
+def stage_embedding(root: Path, max_pairs: int) -> dict:
+    import embedding_match
+    naics = [n for n in _load(root, "naics") if n['code'].startswith('23')]
+    targets = sum(len(_load(root, f"uniclass_{t}")) for t in UNICLASS_TABLES)
+    pairs = len(naics) * targets
+    sample = _sample_sources(naics, targets, max_pairs)
+    k = len(sample)
+    embedding_match.EXTRACTED = root / "extracted" if k == len(naics) else sample_extracted(root, sample)
+    start = time.perf_counter()
+    embedding_match.build_embedding_candidates()
+    wall = time.perf_counter() - start
+    return {'wall_s': wall * len(naics) / k, 'measured_s': wall, 'items': pairs,
+            'sampled': k < len(naics), 'sample_fraction': k / len(naics) if naics else 1}
+
+
+def stage_cooccurrence(root: Path, max_pairs: int) -> dict:
+    import cooccurrence_match
+    cooccurrence_match.EXTRACTED = root / "extracted"
+    cooccurrence_match.CANDIDATES = root / "candidates"
+    items = 0
+    for t in ['ss', 'pr']:
+        with open(root / "candidates" / f"naics_to_uniclass_{t}.json") as f:
+            items += sum(len(c.get('matches', [])) for c in json.load(f))
+    start = time.perf_counter()
+    cooccurrence_match.build_cooccurrence_candidates()
+    return {'wall_s': time.perf_counter() - start, 'items': items}
+
+
+def stage_hierarchy(root: Path, max_pairs: int) -> dict:
+    from hierarchy_propagate import build_naics_hierarchy, build_uniclass_hierarchy, propagate_mappings
+    naics = _load(root, "naics")
+    inputs = []
+    for t in ['ss', 'pr']:
+        with open(root / "candidates" / f"naics_to_uniclass_{t}.json") as f:
+            inputs.append((_load(root, f"uniclass_{t}"), json.load(f)))
+    items = sum(len(c['matches']) for _, cands in inputs for c in cands)
+    start = time.perf_counter()
+    naics_hier = build_naics_hierarchy(naics)
+    for uniclass, cands in inputs:
+        propagate_mappings(cands, naics_hier, build_uniclass_hierarchy(uniclass))
+    return {'wall_s': time.perf_counter() - start, 'items': items}
+
+
+def stage_classify_tiers(root: Path, max_pairs: int) -> dict:
+    import export_ground_truth
+    export_ground_truth.EXTRACTED = root / "extracted"
+    export_ground_truth.CANDIDATES = root / "candidates"
+    export_ground_truth.CROSSWALK = root / "crosswalk"
+    features = export_ground_truth.load_all_mappings()
+    start = time.perf_counter()
+    tiers = export_ground_truth.classify_tiers(features)
+    wall = time.perf_counter() - start
+
+    # Input for the final_merge stage, in validation_tiers.json layout
+    summary = {name: len(records) for name, records in tiers.items()}
+    summary['total'] = sum(summary.values())
+    with open(root / "crosswalk" / "validation_tiers.json", 'w') as f:
+        json.dump({'generated_at': datetime.now().isoformat(), 'summary': summary, 'tiers': tiers}, f)
+    return {'wall_s': wall, 'items': summary['total']}
+
+
+def stage_final_merge(root: Path, max_pairs: int) -> dict:
+    import final_merge
+    import perf
+    for name in ['ONET_MATCHES', 'EXPERT_VALIDATIONS', 'BLS_MATRIX', 'BRICK_SYSTEMS',
+                 'SYNONYMS', 'UK_US_SYNONYMS']:
+        setattr(final_merge, name, BASE / getattr(final_merge, name))
+    final_merge.VALIDATION_TIERS = root / "crosswalk" / "validation_tiers.json"
+    final_merge.OUTPUT = root / "crosswalk" / "final_crosswalk.json"
+    final_merge.FEATURES = root / "crosswalk" / "pair_features"
+    perf.REPORTS = root / "reports"
+    with open(final_merge.VALIDATION_TIERS) as f:
+        items = json.load(f)['summary']['total']
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        final_merge.main()
+    return {'wall_s': time.perf_counter() - start, 'items': items}
+
+
+def _stage_worker(stage: str, root: str, max_pairs: int, conn):
+    sys.path.insert(0, str(Path(__file__).parent))
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = globals()[f"stage_{stage}"](Path(root), max_pairs)
+        result['peak_rss_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        conn.send(result)
+    except Exception as e:
+        conn.send({'error': f"{type(e).__name__}: {e}"})
+    finally:
+        conn.close()
+
+
+def run_stage(stage: str, root: Path, max_pairs: int, timeout: float) -> dict:
+    ctx = multiprocessing.get_context('spawn')
+    parent, child = ctx.Pipe(duplex=False)
+    proc = ctx.Process(target=_stage_worker, args=(stage, str(root), max_pairs, child))
+    proc.start()
+    child.close()
+    if parent.poll(timeout):
+        result = parent.recv()
+    else:
+        proc.terminate()
+        result = {'error': f"timed out after {timeout:.0f}s"}
+    proc.join()
+    if 'wall_s' in result:
+        result['pairs_per_s'] = result['items'] / result['wall_s'] if result['wall_s'] > 0 else None
+    return result
+
+
+# =============================================================================
+# REPORT
+# =============================================================================
+
+def compare(report: dict, baseline: dict) -> list:
+    """Stage/scale entries slower than REGRESSION_TOLERANCE x baseline."""
+    regressions = []
+    for scale, stages in report['results'].items():
+        for stage, result in stages.items():
+            base = baseline.get('results', {}).get(scale, {}).get(stage, {})
+            if 'wall_s' not in result or not base.get('wall_s'):
+                continue
+            ratio = result['wall_s'] / base['wall_s']
+            result['vs_baseline'] = round(ratio, 2)
+            if ratio > REGRESSION_TOLERANCE and result['wall_s'] - base['wall_s'] > MIN_REGRESSION_S:
+                regressions.append(f"{stage} @ {scale}x: {ratio:.2f}x baseline "
+                                   f"({result['wall_s']:.2f}s vs {base['wall_s']:.2f}s)")
+    return regressions
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    flags = dict(a[2:].partition('=')[::2] for a in sys.argv[1:] if a.startswith('--'))
+    scales = [int(s) for s in args[0].split(',')] if args else DEFAULT_SCALES
+    max_pairs = int(flags.get('max-pairs') or MAX_PAIRS)
+    timeout = float(flags.get('timeout') or STAGE_TIMEOUT)
+
+    report = {
+        'generated_at': datetime.now().isoformat(),
+        'python': sys.version.split()[0],
+        'max_pairs': max_pairs,
+        'corpus': {},
+        'results': {},
+    }
+
+    for scale in scales:
+        print(f"\n=== Scale {scale}x ===")
+        with tempfile.TemporaryDirectory(prefix=f"corelot_bench_{scale}x_") as tmp:
+            root = Path(tmp)
+            start = time.perf_counter()
+            sizes = build_corpus(root, scale)
+            print(f"  Corpus built in {time.perf_counter() - start:.1f}s: "
+                  + ', '.join(f"{k}={v}" for k, v in sizes.items()))
+            report['corpus'][str(scale)] = sizes
+
+            results = report['results'][str(scale)] = {}
+            for stage in STAGES:
+                result = run_stage(stage, root, max_pairs, timeout)
+                results[stage] = result
+                if 'error' in result:
+                    print(f"  {stage:15} {result['error']}")
+                    continue
+                note = f" (extrapolated from {result['sample_fraction']:.1%})" if result.get('sampled') else ""
+                print(f"  {stage:15} {result['wall_s']:>9.2f}s  {result['items']:>12,} items  "
+                      f"{result['pairs_per_s'] or 0:>12,.0f}/s  {result['peak_rss_mb']:>7.0f} MB{note}")
+
+    regressions = []
+    if BASELINE_FILE.exists() and '--save-baseline' not in sys.argv:
+        with open(BASELINE_FILE) as f:
+            regressions = compare(report, json.load(f))
+        report['regressions'] = regressions
+
+    REPORTS.mkdir(exist_ok=True)
+    out = BASELINE_FILE if '--save-baseline' in sys.argv else REPORT_FILE
+    with open(out, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nSaved to {out}")
+
+    if regressions:
+        print("\nREGRESSIONS:")
+        for r in regressions:
+            print(f"  {r}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""BM25 ranking of Uniclass titles for each NAICS name.
+
+TF-IDF cosine (embedding_match) has no document-length normalization, so
+long Uniclass Pr titles are penalized and one-word titles over-rewarded.
+BM25 saturates term frequency (K1) and normalizes by title length (B).
+
+Method:
+1. Per table, precompute each term's postings as (impact, node) pairs,
+   where impact is the term's full BM25 contribution to that title, and
+   sort them by impact, highest first.
+2. For a NAICS query, walk the query terms' lists in parallel one depth
+   at a time. Every node first seen is scored exactly from its stored
+   impacts. The impacts at the current depth bound the score of any
+   node not yet seen (threshold algorithm), so the walk stops once the
+   k-th best score reaches that bound, or the bound drops below
+   MIN_SCORE. Most postings are never read.
+3. Scores are reported normalized by the query's upper bound (the sum
+   of its terms' top impacts; terms missing from the table count at the
+   IDF of an unseen term), so they fall in 0..1 like other methods and a
+   title matching half the query cannot score 1.0. Generic trade words
+   (trigram_match.GENERIC) are dropped from queries.
+
+Usage: bm25_match.py [--all-naics]   (default: construction, NAICS 23)
+"""
+
+import heapq
+import json
+import math
+import sys
+from collections import Counter, defaultdict
+from pathlib import Path
+
+import perf
+from crosswalk_store import write_through_candidates
+from embedding_match import load_extracted, tokenize
+from trigram_match import GENERIC
+
+BASE = Path(__file__).parent.parent
+CANDIDATES = BASE / "candidates"
+
+TABLES = ['ss', 'pr', 'ac', 'en', 'co']
+K1 = 1.2
+B = 0.75
+MIN_SCORE = 0.35    # minimum normalized score to keep a match
+TOP_K = 5
+
+
+class BM25Index:
+    """Impact-ordered BM25 postings over one table's names."""
+
+    def __init__(self, nodes: list, k1: float = K1, b: float = B):
+        self.nodes = nodes
+        docs = [Counter(tokenize(n['name'])) for n in nodes]
+        n = len(docs)
+        avgdl = sum(sum(d.values()) for d in docs) / n if n else 1.0
+        df = Counter(t for d in docs for t in d)
+        idf = {t: math.log(1 + (n - c + 0.5) / (c + 0.5)) for t, c in df.items()}
+        self.unseen_idf = math.log(1 + (n + 0.5) / 0.5)
+
+        self.impacts = []   # per node: term -> BM25 contribution
+        postings = defaultdict(list)
+        for i, d in enumerate(docs):
+            norm = k1 * (1 - b + b * sum(d.values()) / avgdl)
+            impacts = {t: idf[t] * tf * (k1 + 1) / (tf + norm) for t, tf in d.items()}
+            self.impacts.append(impacts)
+            for t, w in impacts.items():
+                postings[t].append((w, i))
+        self.postings = {t: sorted(p, key=lambda x: (-x[0], x[1])) for t, p in postings.items()}
+
+    def search(self, text: str, top_k: int = TOP_K, min_score: float = MIN_SCORE) -> list:
+        """[(normalized score, node)] best first, for scores of at least min_score."""
+        query = [t for t in dict.fromkeys(tokenize(text)) if t not in GENERIC]
+        terms = [t for t in query if t in self.postings]
+        if not terms:
+            return []
+        lists = [self.postings[t] for t in terms]
+        # Query terms absent from the table still count toward the normalizer
+        upper = sum(p[0][0] for p in lists) + self.unseen_idf * (len(query) - len(terms))
+        floor = min_score * upper
+
+        heap, seen = [], set()   # heap: (score, -node) min-heap of the best top_k
+        depth, longest = 0, max(len(p) for p in lists)
+        while depth < longest:
+            bound = 0.0
+            for p in lists:
+                if depth >= len(p):
+                    continue
+                w, i = p[depth]
+                bound += w
+                if i in seen:
+                    continue
+                seen.add(i)
+                impacts = self.impacts[i]
+                score = sum(impacts.get(t, 0.0) for t in terms)
+                if score < floor:
+                    continue
+                if len(heap) < top_k:
+                    heapq.heappush(heap, (score, -i))
+                elif (score, -i) > heap[0]:
+                    heapq.heapreplace(heap, (score, -i))
+            depth += 1
+            if bound < floor or (len(heap) == top_k and heap[0][0] >= bound):
+                break
+
+        read = sum(min(depth, len(p)) for p in lists)
+        perf.count('postings_read', read)
+        perf.count('postings_skipped', sum(len(p) for p in lists) - read)
+        perf.count('pairs_scored', len(seen))
+
+        ranked = sorted(heap, reverse=True)
+        return [(score / upper, self.nodes[-neg]) for score, neg in ranked]
+
+
+def confidence(score: float) -> str:
+    if score >= 0.8:
+        return 'A'
+    elif score >= 0.6:
+        return 'B'
+    elif score >= 0.45:
+        return 'C'
+    return 'D'
+
+
+def build_bm25_candidates(all_naics: bool = False) -> dict:
+    """Build top-k BM25 candidates for every Uniclass table."""
+    naics = load_extracted("naics")
+    if not all_naics:
+        naics = [n for n in naics if n['id'].replace('naics:', '').startswith('23')]
+
+    results = {}
+    for table in TABLES:
+        uc_nodes = load_extracted(f"uniclass_{table}")
+        if not uc_nodes:
+            continue
+
+        with perf.span('index', table=table):
+            index = BM25Index(uc_nodes)
+
+        candidates = []
+        with perf.span('search', table=table):
+            for naics_node in naics:
+                matches = [{
+                    'target_id': uc_node['id'],
+                    'target_name': uc_node['name'],
+                    'relationship': 'lexically_similar',
+                    'confidence': confidence(score),
+                    'score': round(score, 3),
+                    'method': 'bm25'
+                } for score, uc_node in index.search(naics_node['name'])]
+                if matches:
+                    perf.count('candidates_kept', len(matches))
+                    candidates.append({
+                        'source_id': naics_node['id'],
+                        'source_name': naics_node['name'],
+                        'matches': matches
+                    })
+
+        results[table] = candidates
+
+    return results
+
+
+def save_candidates(results: dict):
+    """Save BM25 candidates."""
+    total = 0
+    for table, candidates in results.items():
+        if not candidates:
+            continue
+
+        outfile = CANDIDATES / f"naics_to_uniclass_{table}_bm25.json"
+        with open(outfile, 'w') as f:
+            json.dump(candidates, f, indent=2)
+        write_through_candidates(outfile, candidates)
+
+        count = sum(len(c['matches']) for c in candidates)
+        total += count
+        print(f"BM25 {table.upper()}: {len(candidates)} sources, {count} mappings")
+
+    print(f"Total BM25 mappings: {total}")
+
+
+@perf.staged('bm25')
+def main():
+    all_naics = '--all-naics' in sys.argv
+    print(f"Building BM25 candidates ({'all NAICS' if all_naics else 'construction NAICS'})...\n")
+    results = build_bm25_candidates(all_naics)
+    with perf.span('save'):
+        save_candidates(results)
+
+
+if __name__ == "__main__":
+    main()
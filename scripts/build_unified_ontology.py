@@ -3,13 +3,17 @@ Build Unified Task Ontology
 Merges all scope sources + adds missing trades + creates cost model
 """
 
+import bisect
+import hashlib
+import itertools
 import json
+import random
+import re
 from pathlib import Path
 from collections import defaultdict
 
 DATA_DIR = Path("data")
 SCHEMA_DIR = Path("schema")
-SCHEMA_DIR.mkdir(exist_ok=True)
 
 # =============================================================================
 # TRADE DEFINITIONS (Complete with NAICS/Uniclass mappings)
@@ -586,28 +590,169 @@ def load_existing_scopes():
     return all_scopes
 
 
+# Patterns indicating plan-specific (parameterized) scope, compiled once into
+# a single alternation; the group name tells callers which pattern fired.
+PARAMETERIZED_PATTERNS = [
+    ("qty_parens", r'\(\d+\)'),               # (5) - quantity in parens
+    ("dimension", r'\d+\s*(?:x|\'|\")'),      # 5x, 5', 5"
+    ("per_plan", r'per\s+plan'),              # per plan
+    ("master_br", r'master\s+br'),            # specific room
+    ("great_room", r'great\s+room'),          # specific room
+    ("cathedral", r'cathedral'),              # specific feature
+    ("if_applicable", r'if\s+applicable'),    # conditional
+    ("where_required", r'where\s+required'),  # conditional
+]
+
+# First characters of the patterns above (matched against lowercased text).
+# The lookahead lets the engine skip most positions without trying every
+# branch, which keeps one alternation faster than eight separate scans.
+_PARAMETERIZED_FIRST = r"[(\dpmgciw]"
+
+PARAMETERIZED_RE = re.compile(
+    f"(?={_PARAMETERIZED_FIRST})(?:"
+    + "|".join(f"(?P<{name}>{pattern})" for name, pattern in PARAMETERIZED_PATTERNS)
+    + ")"
+)
+
+# Joins task texts for batch matching; \s cannot match it, so no pattern
+# can span two tasks
+_TASK_SEP = "\x00"
+
+
+def match_scope(task_text):
+    """Return (classification, pattern name or None) for one scope line"""
+    m = PARAMETERIZED_RE.search(task_text.lower())
+    if m:
+        return "parameterized", m.lastgroup
+    return "standard", None
+
+
 def classify_scope(task_text):
     """Classify scope as standard or parameterized"""
-    task_lower = task_text.lower()
+    return match_scope(task_text)[0]
+
+
+def classify_scopes(task_texts):
+    """Classify many scope lines with one regex scan over the joined text.
+
+    Returns a list of (classification, pattern name or None) in input order.
+    """
+    # Lowercase before measuring: str.lower() can change a text's length
+    # ('İ' becomes two characters), which would shift every later offset
+    lowered = [text.lower() for text in task_texts]
+    results = [("standard", None)] * len(lowered)
+    starts = []
+    offset = 0
+    for text in lowered:
+        starts.append(offset)
+        offset += len(text) + 1
+
+    joined = _TASK_SEP.join(lowered)
+    last = -1
+    for m in PARAMETERIZED_RE.finditer(joined):
+        i = bisect.bisect_right(starts, m.start()) - 1
+        if i != last:
+            # Leftmost match within the task, as search() would find
+            results[i] = ("parameterized", m.lastgroup)
+            last = i
+    return results
 
-    # Patterns indicating plan-specific (parameterized)
-    parameterized_patterns = [
-        r'\(\d+\)',           # (5) - quantity in parens
-        r'\d+\s*(x|\'|\")',   # 5x, 5', 5"
-        r'per\s+plan',        # per plan
-        r'master\s+br',       # specific room
-        r'great\s+room',      # specific room
-        r'cathedral',         # specific feature
-        r'if\s+applicable',   # conditional
-        r'where\s+required',  # conditional
-    ]
 
-    import re
-    for pattern in parameterized_patterns:
-        if re.search(pattern, task_lower):
-            return "parameterized"
+# =============================================================================
+# NEAR-DUPLICATE SCOPE DETECTION (MinHash + LSH)
+# =============================================================================
 
-    return "standard"
+MINHASH_PERMUTATIONS = 64
+LSH_BANDS = 16                  # 16 bands x 4 rows: pairs at 0.8 similarity collide ~99.9%
+NEAR_DUP_THRESHOLD = 0.8        # verified Jaccard similarity to merge two scopes
+MAX_BUCKET_SIZE = 256           # larger LSH buckets are not compared pairwise
+_MERSENNE_PRIME = (1 << 61) - 1
+
+_rng = random.Random(2024)
+_MINHASH_PARAMS = [(_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+                   for _ in range(MINHASH_PERMUTATIONS)]
+
+SCOPE_STOPWORDS = {"a", "an", "the", "and", "or", "of", "to", "for", "in", "on", "at", "with", "all"}
+
+
+def scope_tokens(task_text):
+    """Normalized token set: lowercased words, stopwords dropped, plural 's' stripped"""
+    tokens = set()
+    for word in re.findall(r"[a-z0-9]+", task_text.lower()):
+        if word in SCOPE_STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        tokens.add(word)
+    return tokens
+
+
+def minhash_signature(tokens):
+    """MinHash signature of a token set (stable across runs, unlike hash())"""
+    hashes = [int.from_bytes(hashlib.blake2b(t.encode(), digest_size=8).digest(), "big")
+              for t in tokens]
+    if not hashes:
+        return (0,) * MINHASH_PERMUTATIONS
+    return tuple(min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in _MINHASH_PARAMS)
+
+
+def dedupe_near_duplicates(scopes, threshold=NEAR_DUP_THRESHOLD):
+    """Cluster near-duplicate scopes within each trade.
+
+    Scopes are bucketed by LSH band so only likely pairs are compared, then
+    each pair is verified with exact Jaccard similarity on the token sets.
+    Returns clusters in source order; the first scope of each cluster is
+    the canonical task and the rest are its merged variants.
+    """
+    rows = MINHASH_PERMUTATIONS // LSH_BANDS
+    token_sets = [scope_tokens(s.get("task", "")) for s in scopes]
+
+    parent = list(range(len(scopes)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    buckets = defaultdict(list)
+    for i, (scope, tokens) in enumerate(zip(scopes, token_sets)):
+        if not tokens:
+            continue
+        sig = minhash_signature(tokens)
+        trade = scope.get("trade", "")
+        for band in range(LSH_BANDS):
+            buckets[(trade, band, sig[band * rows:(band + 1) * rows])].append(i)
+
+    # Verify every pair within a bucket; pairs that share several bands are
+    # checked once. Buckets over MAX_BUCKET_SIZE (many scopes with one band
+    # signature) only compare against their first member, so near-duplicates
+    # among the other members can be missed there; they are reported.
+    checked = set()
+    oversized = 0
+    for bucket in buckets.values():
+        if len(bucket) > MAX_BUCKET_SIZE:
+            oversized += 1
+            pairs = ((bucket[0], j) for j in bucket[1:])
+        else:
+            pairs = itertools.combinations(bucket, 2)
+        for i, j in pairs:
+            if (i, j) in checked:
+                continue
+            checked.add((i, j))
+            a, b = token_sets[i], token_sets[j]
+            if len(a & b) / len(a | b) >= threshold:
+                ri, rj = find(i), find(j)
+                if ri != rj:
+                    # Lower index wins so the earliest source stays canonical
+                    parent[max(ri, rj)] = min(ri, rj)
+    if oversized:
+        print(f"  {oversized} LSH bucket(s) over {MAX_BUCKET_SIZE} scopes compared against their first member only")
+
+    clusters = {}
+    for i, scope in enumerate(scopes):
+        clusters.setdefault(find(i), []).append(scope)
+    return list(clusters.values())
 
 
 def build_unified_ontology():
@@ -628,6 +773,9 @@ def build_unified_ontology():
 
     print(f"Unique scopes after dedup: {len(unique_scopes)}")
 
+    clusters = dedupe_near_duplicates(unique_scopes)
+    print(f"Unique scopes after near-duplicate merge: {len(clusters)}")
+
     # Build structured ontology
     ontology = {
         "_meta": {
@@ -654,17 +802,19 @@ def build_unified_ontology():
     # Organize by trade
     by_trade = defaultdict(lambda: defaultdict(list))
 
-    for scope in unique_scopes:
+    scoped = [c for c in clusters if c[0].get('task', '')]
+    classifications = classify_scopes(c[0]['task'] for c in scoped)
+
+    for (scope, *merged), (classification, _) in zip(scoped, classifications):
         trade = scope.get('trade', 'Unknown')
         phase = scope.get('phase') or 'General'
-        task = scope.get('task', '')
-
-        if task:
-            classification = classify_scope(task)
-            by_trade[trade][phase].append({
-                "task": task,
-                "type": classification
-            })
+        entry = {
+            "task": scope['task'],
+            "type": classification
+        }
+        if merged:
+            entry["variants"] = [m['task'] for m in merged]
+        by_trade[trade][phase].append(entry)
 
     # Build final structure
     standard_count = 0
@@ -722,6 +872,7 @@ def main():
 
     # Build unified ontology
     ontology = build_unified_ontology()
+    SCHEMA_DIR.mkdir(exist_ok=True)
 
     # Save task ontology
     ontology_file = SCHEMA_DIR / "task_ontology.json"
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""Streaming reader for candidate and crosswalk JSON files.
+
+Candidate files are large JSON arrays, but most consumers only want a
+handful of records (e.g. A-confidence embedding matches). Instead of
+json.load()-ing the whole file, this module pulls one array element at a
+time from a chunked buffer and yields (source, match) records.
+
+Supported layouts:
+1. Grouped candidates: [{source_id, source_name, matches: [...]}, ...]
+2. Flat candidates (hierarchy propagation): [{source_id, target_id, ...}, ...]
+3. Final crosswalk: {"_meta": ..., "summary": ..., "mappings": [...]}
+
+Filters on confidence, method and table are pushed down: files whose
+method/table cannot match are never opened, and records are rejected
+before any per-record work is done by the caller. The final crosswalk
+carries tiers rather than letters, so a confidence filter selects the
+matching tiers there (A = 1 ... D = 4). File reads run in a
+background thread so parsing overlaps with I/O.
+"""
+
+import json
+import queue
+import threading
+from collections import Counter
+from pathlib import Path
+
+BASE = Path(__file__).parent.parent
+CANDIDATES = BASE / "candidates"
+CROSSWALK = BASE / "crosswalk"
+
+CHUNK_SIZE = 64 * 1024
+PREFETCH = 4
+
+# Confidence letter of each final crosswalk tier
+CONFIDENCE_TIER = {'A': 1, 'B': 2, 'C': 3, 'D': 4}
+
+_WHITESPACE = ' \t\n\r'
+_decoder = json.JSONDecoder()
+
+
+def file_method(path) -> str:
+    """Infer the evidence method from a candidate file name."""
+    name = Path(path).name
+    if 'propagated' in name:
+        return 'hierarchy'
+    elif 'cooccur' in name:
+        return 'cooccurrence'
+    elif 'embedding' in name:
+        return 'embedding'
+    elif 'trigram' in name:
+        return 'trigram'
+    elif 'bm25' in name:
+        return 'bm25'
+    elif 'graph' in name:
+        return 'graph'
+    elif 'crosswalk' in name:
+        return 'crosswalk'
+    return 'linguistic'
+
+
+def file_table(path) -> str:
+    """Infer the Uniclass table (ss, pr, ...) from a candidate file name.
+
+    '' when the name does not carry one (schema_to_uniclass_graph.json
+    spans several tables).
+    """
+    parts = Path(path).stem.split('_')
+    if 'uniclass' in parts:
+        idx = parts.index('uniclass') + 1
+        if idx < len(parts) and len(parts[idx]) == 2 and parts[idx].isalpha():
+            return parts[idx]
+    return ''
+
+
+def target_table(target_id: str) -> str:
+    """Uniclass table of a target id, e.g. 'uc:Ss_25_10' -> 'ss'."""
+    code = target_id.replace('uc:', '')
+    return code.split('_')[0].lower() if '_' in code else ''
+
+
+def _read_chunks(path, chunk_size: int, prefetch: int):
+    """Yield text chunks, reading ahead in a background thread."""
+    chunks = queue.Queue(maxsize=prefetch)
+    stop = threading.Event()
+
+    def reader():
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                while not stop.is_set():
+                    chunk = f.read(chunk_size)
+                    chunks.put(chunk)
+                    if not chunk:
+                        break
+        except Exception as e:
+            chunks.put(e)
+
+    thread = threading.Thread(target=reader, daemon=True)
+    thread.start()
+    try:
+        while True:
+            chunk = chunks.get()
+            if isinstance(chunk, Exception):
+                raise chunk
+            if not chunk:
+                return
+            yield chunk
+    finally:
+        stop.set()
+        # Unblock the reader if it is waiting on a full queue
+        while thread.is_alive():
+            try:
+                chunks.get_nowait()
+            except queue.Empty:
+                thread.join(timeout=0.01)
+
+
+class _PullParser:
+    """Minimal pull parser over a chunked JSON text stream.
+
+    Only the structural characters of the top-level container are tokenized
+    by hand; each element is decoded with json's raw_decode once the buffer
+    holds all of it.
+    """
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        """Append the next chunk to the buffer; False at end of input."""
+        if self.eof:
+            return False
+        chunk = next(self.chunks, None)
+        if chunk is None:
+            self.eof = True
+            return False
+        # Drop consumed text so memory stays bounded by the largest element
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character ('' at end of input)."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char: str):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} at offset {self.pos}, found {found!r}")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                obj, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number at the buffer edge may continue in the next chunk
+            if end == len(self.buf) and not self.eof and self._fill():
+                continue
+            self.pos = end
+            return obj
+
+    def array_items(self):
+        """Yield the elements of the array starting at the cursor."""
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            char = self.peek()
+            self.pos += 1
+            if char == ']':
+                return
+            if char != ',':
+                raise ValueError(f"Expected ',' or ']' in array, found {char!r}")
+
+    def object_field(self, key: str):
+        """Position the cursor at the value of a top-level object key.
+
+        Values of other keys are decoded and discarded; they are small
+        metadata blocks in every layout this module reads.
+        """
+        self.expect('{')
+        while self.peek() not in ('}', ''):
+            name = self.value()
+            self.expect(':')
+            if name == key:
+                return True
+            self.value()
+            if self.peek() == ',':
+                self.pos += 1
+        return False
+
+
+def iter_array(path, key: str = None, chunk_size: int = CHUNK_SIZE, prefetch: int = PREFETCH):
+    """Yield elements of a top-level JSON array (or the array under `key`)."""
+    parser = _PullParser(_read_chunks(path, chunk_size, prefetch))
+    if parser.peek() == '{':
+        if not parser.object_field(key or 'mappings'):
+            return
+    yield from parser.array_items()
+
+
+def read_field(path, key: str, chunk_size: int = CHUNK_SIZE):
+    """Decode one top-level object field (e.g. the crosswalk's '_meta'); None if absent."""
+    parser = _PullParser(_read_chunks(path, chunk_size, 1))
+    if parser.peek() != '{' or not parser.object_field(key):
+        return None
+    return parser.value()
+
+
+def _as_set(values):
+    if values is None:
+        return None
+    if isinstance(values, (str, int)):
+        return {values}
+    return set(values)
+
+
+def stream_file(path, confidence=None, methods=None, tables=None, tiers=None):
+    """Yield (source, match) records from one candidate or crosswalk file.
+
+    source is {'source_id', 'source_name'}; match is the raw match dict
+    (for the final crosswalk, the mapping dict). Filters accept a single
+    value or an iterable:
+      confidence - confidence letters ('A', 'B', ...)
+      methods    - method names (file method, or any of a mapping's methods)
+      tables     - Uniclass tables ('ss', 'pr', ...)
+      tiers      - final crosswalk tiers (1-4); with confidence, both apply
+    """
+    path = Path(path)
+    confidence = _as_set(confidence)
+    methods = _as_set(methods)
+    tables = _as_set(tables)
+    if tables:
+        tables = {t.lower() for t in tables}
+    tiers = _as_set(tiers)
+
+    method = file_method(path)
+    table = file_table(path)
+
+    if method == 'crosswalk':
+        if confidence:
+            letter_tiers = {CONFIDENCE_TIER.get(c) for c in confidence}
+            tiers = tiers & letter_tiers if tiers else letter_tiers
+            if not tiers - {None}:
+                return
+        for m in iter_array(path, 'mappings'):
+            if tiers and m.get('final_tier') not in tiers:
+                continue
+            if methods and not methods.intersection(m.get('methods', [])):
+                continue
+            if tables and target_table(m.get('uniclass_code', '')) not in tables:
+                continue
+            yield {'source_id': m.get('naics_code', ''), 'source_name': m.get('naics_name', '')}, m
+        return
+
+    # Pushdown: skip the whole file when its method/table cannot match
+    if methods and method not in methods:
+        return
+    if tables and table and table not in tables:
+        return
+
+    for item in iter_array(path):
+        if 'matches' not in item:
+            # Flat layout: each element is itself a match
+            if confidence and item.get('confidence') not in confidence:
+                continue
+            if tables and not table and target_table(item.get('target_id', '')) not in tables:
+                continue
+            yield {'source_id': item.get('source_id', ''), 'source_name': item.get('source_name', '')}, item
+            continue
+
+        source = {'source_id': item.get('source_id', ''), 'source_name': item.get('source_name', '')}
+        for m in item['matches']:
+            if confidence and m.get('confidence') not in confidence:
+                continue
+            if tables and not table and target_table(m.get('target_id', '')) not in tables:
+                continue
+            yield source, m
+
+
+def stream_candidates(pattern: str = "naics_to_*.json", confidence=None, methods=None,
+                      tables=None, directory: Path = CANDIDATES):
+    """Yield (source, match) records from every candidate file matching pattern."""
+    for path in sorted(directory.glob(pattern)):
+        yield from stream_file(path, confidence=confidence, methods=methods, tables=tables)
+
+
+def stream_crosswalk(path: Path = CROSSWALK / "final_crosswalk.json", methods=None,
+                     tables=None, tiers=None, confidence=None):
+    """Yield (source, mapping) records from the final crosswalk."""
+    yield from stream_file(path, confidence=confidence, methods=methods, tables=tables, tiers=tiers)
+
+
+def stats():
+    """Print per-file record counts by confidence, streamed."""
+    for path in sorted(CANDIDATES.glob("*.json")):
+        counts = Counter(m.get('confidence', '?') for _, m in stream_file(path))
+        total = sum(counts.values())
+        dist = ', '.join(f"{c}={counts[c]}" for c in sorted(counts))
+        print(f"  {path.name} [{file_method(path)}]: {total} ({dist})")
+
+
+def main():
+    print("Streaming candidate files...\n")
+    stats()
+
+
+if __name__ == "__main__":
+    main()
@@ -13,6 +13,9 @@ import json
 from pathlib import Path
 from collections import defaultdict
 
+import perf
+from crosswalk_store import write_through_candidates
+
 BASE = Path(__file__).parent.parent
 EXTRACTED = BASE / "extracted"
 CANDIDATES = BASE / "candidates"
@@ -21,8 +24,7 @@ def load_extracted(name: str) -> list:
     """Load extracted nodes."""
     path = EXTRACTED / f"{name}.json"
     if path.exists():
-        with open(path) as f:
-            return json.load(f)
+        return perf.load_json(path)
     return []
 
 def get_naics_siblings() -> dict:
@@ -79,8 +81,7 @@ def build_cooccurrence_candidates():
             if not existing_file.exists():
                 continue
 
-            with open(existing_file) as f:
-                existing = json.load(f)
+            existing = perf.load_json(existing_file)
 
             existing_by_source = {c['source_id']: c for c in existing}
 
@@ -156,6 +157,7 @@ def merge_with_existing(new_candidates: dict):
 
         with open(outfile, 'w') as f:
             json.dump(output, f, indent=2)
+        write_through_candidates(outfile, output)
 
         print(f"Co-occurrence {table.upper()}: {len(candidates)} candidates -> {outfile.name}")
 
@@ -172,9 +174,15 @@ def stats():
             print(f"  {table.upper()}: {count} mappings")
     print(f"  Total: {total}")
 
-if __name__ == "__main__":
+@perf.staged('cooccurrence')
+def main():
     print("Building co-occurrence candidates...")
-    candidates = build_cooccurrence_candidates()
-    merge_with_existing(candidates)
+    with perf.span('build'):
+        candidates = build_cooccurrence_candidates()
+    with perf.span('merge'):
+        merge_with_existing(candidates)
     print("\nCo-occurrence stats:")
     stats()
+
+if __name__ == "__main__":
+    main()
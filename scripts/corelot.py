@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Single entry point for the pipeline scripts.
+
+Each subcommand maps to a script in this directory and its entry
+function. The script is imported only when its subcommand runs, so
+`corelot.py --help` and light subcommands pay for nothing but the
+interpreter and this file. Arguments after the subcommand are passed
+through as the script's own sys.argv, so
+
+    corelot.py rules plans.json  ==  rule_engine.py plans.json
+
+Scripts that still use repository-relative paths (data/, schema/,
+crosswalk/) expect to be run from the repository root, as before.
+
+Usage: corelot.py <command> [args...]
+       corelot.py --help
+"""
+
+import sys
+
+# command -> (module, entry function, summary)
+COMMANDS = {
+    # Sources
+    'extract': ('extract_nodes', 'main', "Extract and normalize nodes from source standards"),
+    'enhance': ('enhance_all_methods', 'main', "Build BLS, Brick, WordNet and document enhancements"),
+    'wordnet-table': ('wordnet_table', 'main', "Build (or query [term...]) the offline WordNet table"),
+    'wikidata': ('wikidata_construction', 'main', "Wikidata SPARQL query for construction occupations"),
+    'sparql': ('sparql_client', 'main', "SPARQL cache: stats | purge | serve [port] (stand-in endpoint)"),
+    'onet': ('onet_task_match', 'main', "Match O*NET task statements to Uniclass systems"),
+
+    # Crosswalk stages
+    'linguistic': ('linguistic_match', 'main', "Token / synonym Jaccard matching [--wordnet]"),
+    'embedding': ('embedding_match', 'main', "TF-IDF cosine matching [--approx] (LSH)"),
+    'trigram': ('trigram_match', 'main', "Character trigram Dice matching [--all-naics]"),
+    'bm25': ('bm25_match', 'main', "BM25 top-k matching with early termination [--all-naics]"),
+    'cooccurrence': ('cooccurrence_match', 'main', "Sibling co-occurrence candidates"),
+    'hierarchy': ('hierarchy_propagate', 'main', "Propagate mappings down code hierarchies"),
+    'graph': ('graph_propagate', 'main', "Ss->Pr and schema->Uniclass graph propagation"),
+    'ground-truth': ('export_ground_truth', 'main', "Classify candidates into validation tiers"),
+    'triangulate': ('triangulate_confidence', 'main', "Triangulate confidence across methods"),
+    'ensemble': ('ensemble_score', 'main', "Learned logistic-regression pair scores [--epochs=N]"),
+    'thresholds': ('threshold_sweep', 'main', "PR curves and confidence cut-offs per method [--targets=A,B,C]"),
+    'tune': ('tune_matchers', 'main', "Grid/random search over matcher settings [--random=N] [--workers=N]"),
+    'merge-evidence': ('merge_evidence', 'main', "Merge O*NET evidence into validation tiers"),
+    'final-merge': ('final_merge', 'main', "Combine all evidence into the final crosswalk"),
+    'generate': ('generate_crosswalk', 'main', "Generate crosswalk CSV from reviewed candidates"),
+    'instances': ('generate_instances', 'main', "JSON-LD instances + relationships.csv [--force]"),
+
+    # Crosswalk data
+    'store': ('crosswalk_store', 'main', "Crosswalk database: init | sync | stats"),
+    'features': ('pair_features', 'main', "Pair-feature column cache: sync | stats"),
+    'serve': ('crosswalk_service', 'main', "Serve the crosswalk over HTTP [port] [host]"),
+    'review': ('expert_review', 'main', "Expert review: export | import <table>, stats"),
+    'candidates': ('candidate_stream', 'main', "Stream candidate files and count by confidence"),
+    'triples': ('triple_store', 'main', "Query the combined graph [\"<basic graph pattern>\"]"),
+    'export-rdf': ('export_rdf', 'main', "Stream the graph to N-Quads/N-Triples [out.nq.gz] [--brick]"),
+    'health': ('node_health', 'generate_report', "Node mapping coverage and quality report"),
+    'hypotheses': ('hypothesis_tests', 'run_all_tests', "Run crosswalk hypothesis tests"),
+
+    # Task ontology
+    'ontology': ('build_unified_ontology', 'main', "Build task ontology, cost model, trade definitions"),
+    'scopes': ('generate_scope_templates', 'main', "Scope templates for missing trades from O*NET tasks"),
+    'map-scopes': ('map_seed_scopes', 'main', "Map seed scopes to NAICS, Uniclass and O*NET"),
+    'audit': ('audit_ontology', 'main', "Audit schema layers [--no-cache] [--quiet]"),
+    'tasks': ('task_model', 'main', "Query the task ontology [code] [type]"),
+    'rules': ('rule_engine', 'main', "Evaluate product rules [plans.json]"),
+    'rollup': ('cost_rollup', 'main', "Portfolio cost rollup [num_projects]"),
+    'schedule': ('schedule_engine', 'main', "Schedule critical path [task_id duration]"),
+
+    # Performance
+    'benchmark': ('benchmark', 'main', "Scaling benchmark [scales] [--save-baseline]"),
+    'perf': ('perf', 'main', "Summarize saved perf reports [stage]"),
+}
+
+
+def usage(out=sys.stdout):
+    print("Usage: corelot.py <command> [args...]\n\nCommands:", file=out)
+    for name, (_, _, summary) in COMMANDS.items():
+        print(f"  {name:<16}{summary}", file=out)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ('-h', '--help', 'help'):
+        usage()
+        return 0 if argv else 1
+
+    name, args = argv[0], argv[1:]
+    if name not in COMMANDS:
+        print(f"Unknown command: {name}\n", file=sys.stderr)
+        usage(sys.stderr)
+        return 2
+
+    module_name, func_name, _ = COMMANDS[name]
+    sys.argv = [f"{module_name}.py", *args]
+    module = __import__(module_name)
+    result = getattr(module, func_name)()
+    return result if isinstance(result, int) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""Local lookup service for the crosswalk with in-memory indexes.
+
+Loads the final crosswalk, instance edges and extracted nodes once into
+hash and prefix indexes, then answers lookups over a minimal asyncio
+HTTP/1.1 server (stdlib only). Source files are polled for changes and
+the index is rebuilt and swapped in atomically, so readers never see a
+half-built index.
+
+Endpoints (all GET, JSON responses):
+  /naics/<code>        Uniclass targets for a NAICS code (+ instance edges)
+  /uniclass/<code>     NAICS sources for a Uniclass code (+ instance edges)
+  /subtree/<code>      Nodes under a NAICS or Uniclass code
+  /mappings?tier=1&method=onet_task&table=ss&limit=100
+  /health              Index sizes and load time
+
+Usage: crosswalk_service.py [port] [host]
+"""
+
+import asyncio
+import bisect
+import csv
+import json
+import sys
+import time
+import urllib.parse
+from pathlib import Path
+from collections import defaultdict
+
+from candidate_stream import stream_crosswalk, target_table
+
+BASE = Path(__file__).parent.parent
+EXTRACTED = BASE / "extracted"
+CROSSWALK = BASE / "crosswalk"
+INSTANCES = BASE / "instances"
+
+FINAL_CROSSWALK = CROSSWALK / "final_crosswalk.json"
+RELATIONSHIPS = INSTANCES / "edges" / "relationships.csv"
+NODE_FILES = ["naics", "uniclass_ss", "uniclass_pr", "uniclass_ac", "uniclass_en", "uniclass_co"]
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+RELOAD_INTERVAL = 2.0
+MAX_LIMIT = 1000
+
+
+def normalize_id(code: str) -> str:
+    """Accept '238130', 'naics:238130', 'Ss_25_10' or 'uc:Ss_25_10'."""
+    code = code.strip()
+    if ':' in code:
+        return code
+    return f"naics:{code}" if code.isdigit() else f"uc:{code}"
+
+
+def is_descendant(node_id: str, root_id: str) -> bool:
+    """True if node_id sits under root_id in its code hierarchy."""
+    if node_id == root_id or not node_id.startswith(root_id):
+        return False
+    if root_id.startswith('uc:'):
+        # Uniclass levels are '_'-separated: Ss_25 contains Ss_25_10, not Ss_250
+        return node_id[len(root_id)] == '_'
+    return True
+
+
+class CrosswalkIndex:
+    """Immutable snapshot of the crosswalk with lookup indexes."""
+
+    def __init__(self):
+        self.mappings = []                 # slim mapping records
+        self.by_source = defaultdict(list)  # naics id -> mapping positions
+        self.by_target = defaultdict(list)  # uniclass id -> mapping positions
+        self.by_tier = defaultdict(list)
+        self.by_method = defaultdict(list)
+        self.by_table = defaultdict(list)
+        self.edges_out = defaultdict(list)
+        self.edges_in = defaultdict(list)
+        self.nodes = {}                    # id -> {'id', 'name'}
+        self.sorted_ids = []               # for prefix range scans
+        self.loaded_at = 0.0
+        self.load_ms = 0.0
+
+    @classmethod
+    def load(cls):
+        start = time.perf_counter()
+        index = cls()
+
+        for name in NODE_FILES:
+            path = EXTRACTED / f"{name}.json"
+            if path.exists():
+                with open(path) as f:
+                    for n in json.load(f):
+                        index.nodes[n['id']] = {'id': n['id'], 'name': n['name']}
+        index.sorted_ids = sorted(index.nodes)
+
+        if FINAL_CROSSWALK.exists():
+            for _, m in stream_crosswalk(FINAL_CROSSWALK):
+                pos = len(index.mappings)
+                record = {
+                    'naics_code': m['naics_code'],
+                    'naics_name': m.get('naics_name', ''),
+                    'uniclass_code': m['uniclass_code'],
+                    'uniclass_name': m.get('uniclass_name', ''),
+                    'final_tier': m.get('final_tier'),
+                    'methods': m.get('methods', []),
+                    'confidence_score': m.get('confidence_score', 0),
+                }
+                index.mappings.append(record)
+                index.by_source[record['naics_code']].append(pos)
+                index.by_target[record['uniclass_code']].append(pos)
+                index.by_tier[record['final_tier']].append(pos)
+                index.by_table[target_table(record['uniclass_code'])].append(pos)
+                for method in record['methods']:
+                    index.by_method[method].append(pos)
+
+        if RELATIONSHIPS.exists():
+            with open(RELATIONSHIPS, encoding='utf-8') as f:
+                lines = (line for line in f if not line.startswith('#'))
+                for row in csv.DictReader(lines):
+                    if not row.get('source_id') or not row.get('target_id'):
+                        continue
+                    index.edges_out[row['source_id']].append(row)
+                    index.edges_in[row['target_id']].append(row)
+
+        index.loaded_at = time.time()
+        index.load_ms = (time.perf_counter() - start) * 1000
+        return index
+
+    def _records(self, positions, limit=None):
+        if limit is not None:
+            positions = positions[:limit]
+        return [self.mappings[p] for p in positions]
+
+    def targets(self, naics_id: str) -> dict:
+        return {
+            'source': self.nodes.get(naics_id, {'id': naics_id}),
+            'mappings': self._records(self.by_source.get(naics_id, [])),
+            'edges': self.edges_out.get(naics_id, []),
+        }
+
+    def sources(self, uniclass_id: str) -> dict:
+        return {
+            'target': self.nodes.get(uniclass_id, {'id': uniclass_id}),
+            'mappings': self._records(self.by_target.get(uniclass_id, [])),
+            'edges': self.edges_in.get(uniclass_id, []),
+        }
+
+    def subtree(self, root_id: str, limit: int = MAX_LIMIT) -> dict:
+        """Nodes under root_id via a bisect range scan over sorted ids."""
+        lo = bisect.bisect_left(self.sorted_ids, root_id)
+        hi = bisect.bisect_right(self.sorted_ids, root_id + '\uffff')
+        children = [self.nodes[i] for i in self.sorted_ids[lo:hi] if is_descendant(i, root_id)]
+        return {'root': self.nodes.get(root_id, {'id': root_id}),
+                'count': len(children), 'nodes': children[:limit]}
+
+    def filter(self, tier=None, method=None, table=None, source=None, limit=MAX_LIMIT) -> dict:
+        """Intersect the smallest applicable posting lists."""
+        lists = []
+        if tier is not None:
+            lists.append(self.by_tier.get(tier, []))
+        if method:
+            lists.append(self.by_method.get(method, []))
+        if table:
+            lists.append(self.by_table.get(table.lower(), []))
+        if source:
+            lists.append(self.by_source.get(source, []))
+        if not lists:
+            positions = range(len(self.mappings))
+        else:
+            lists.sort(key=len)
+            rest = [set(l) for l in lists[1:]]
+            positions = [p for p in lists[0] if all(p in s for s in rest)]
+        positions = list(positions)
+        return {'count': len(positions), 'mappings': self._records(positions, limit)}
+
+    def health(self) -> dict:
+        return {
+            'mappings': len(self.mappings),
+            'nodes': len(self.nodes),
+            'edges': sum(len(v) for v in self.edges_out.values()),
+            'loaded_at': self.loaded_at,
+            'load_ms': round(self.load_ms, 1),
+        }
+
+
+def watched_mtimes() -> dict:
+    paths = [FINAL_CROSSWALK, RELATIONSHIPS] + [EXTRACTED / f"{n}.json" for n in NODE_FILES]
+    return {p: p.stat().st_mtime_ns for p in paths if p.exists()}
+
+
+class LookupService:
+    """Holds the current index and routes requests against it."""
+
+    def __init__(self):
+        self.index = CrosswalkIndex.load()
+        self.mtimes = watched_mtimes()
+
+    async def watch(self, interval: float = RELOAD_INTERVAL):
+        """Rebuild the index off the event loop when a source file changes."""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(interval)
+            mtimes = watched_mtimes()
+            if mtimes == self.mtimes:
+                continue
+            try:
+                index = await loop.run_in_executor(None, CrosswalkIndex.load)
+            except (OSError, ValueError) as e:
+                # Likely caught a file mid-write; retry on the next poll
+                print(f"Reload failed ({e}) - keeping previous index")
+                continue
+            except Exception as e:
+                # Malformed data (e.g. a missing field); wait for the next change
+                print(f"Reload failed ({type(e).__name__}: {e}) - keeping previous index")
+                self.mtimes = mtimes
+                continue
+            self.index, self.mtimes = index, mtimes
+            print(f"Reloaded index in {index.load_ms:.0f} ms")
+
+    def route(self, target: str):
+        """Return (status, payload) for a request target."""
+        url = urllib.parse.urlsplit(target)
+        parts = [urllib.parse.unquote(p) for p in url.path.strip('/').split('/') if p]
+        query = dict(urllib.parse.parse_qsl(url.query))
+        index = self.index
+
+        if not parts or parts == ['health']:
+            return 200, index.health()
+        if len(parts) == 2 and parts[0] == 'naics':
+            return 200, index.targets(normalize_id(parts[1]))
+        if len(parts) == 2 and parts[0] == 'uniclass':
+            return 200, index.sources(normalize_id(parts[1]))
+        if len(parts) == 2 and parts[0] == 'subtree':
+            return 200, index.subtree(normalize_id(parts[1]))
+        if parts == ['mappings']:
+            try:
+                tier = int(query['tier']) if 'tier' in query else None
+                limit = min(int(query.get('limit', MAX_LIMIT)), MAX_LIMIT)
+            except ValueError:
+                return 400, {'error': 'tier and limit must be integers'}
+            source = normalize_id(query['source']) if 'source' in query else None
+            return 200, index.filter(tier, query.get('method'), query.get('table'), source, limit)
+        return 404, {'error': f"Unknown path: {url.path}"}
+
+    async def handle(self, reader, writer):
+        """Serve HTTP/1.1 GET requests on one connection (keep-alive)."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    status, payload = 400, {'error': 'Malformed request line'}
+                    method, version = 'GET', 'HTTP/1.0'
+                else:
+                    if method != 'GET':
+                        status, payload = 405, {'error': 'Only GET is supported'}
+                    else:
+                        try:
+                            status, payload = self.route(target)
+                        except Exception as e:
+                            print(f"Error serving {target}: {type(e).__name__}: {e}")
+                            status, payload = 500, {'error': 'Internal server error'}
+
+                body = json.dumps(payload).encode('utf-8')
+                keep_alive = (version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close')
+                reason = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+                          500: 'Internal Server Error'}[status]
+                writer.write(
+                    f"{version} {status} {reason}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + body
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+    service = LookupService()
+    health = service.index.health()
+    print(f"Loaded {health['mappings']} mappings, {health['nodes']} nodes, "
+          f"{health['edges']} edges in {health['load_ms']} ms")
+
+    server = await asyncio.start_server(service.handle, host, port)
+    print(f"Serving crosswalk lookups on http://{host}:{port}/")
+    async with server:
+        await asyncio.gather(server.serve_forever(), service.watch())
+
+
+def main():
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PORT
+    host = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_HOST
+    try:
+        asyncio.run(serve(host, port))
+    except KeyboardInterrupt:
+        print("\nStopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,472 @@
+#!/usr/bin/env python3
+"""Optional SQLite backend for nodes, candidates, evidence, decisions and tiers.
+
+The JSON/CSV files in candidates/ and crosswalk/ remain the source of
+truth. When crosswalk/crosswalk.db exists (create it with `init`), the
+matching stages also write their output through to it, so consumers can
+query just the subset they need instead of loading whole files.
+
+Writes are batched executemany upserts inside one transaction per stage.
+Upserts only touch rows whose values changed, so a rerun that produces
+the same output writes nothing. The database runs in WAL mode, so readers
+keep working while a stage writes.
+
+Usage:
+  crosswalk_store.py init    - Create the database and import everything
+  crosswalk_store.py sync    - Re-import files (only changed rows are written)
+  crosswalk_store.py stats   - Row counts per table
+"""
+
+import json
+import sqlite3
+import sys
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from candidate_stream import (
+    CANDIDATES, file_method, file_table, iter_array, stream_crosswalk, stream_file, target_table
+)
+
+BASE = Path(__file__).parent.parent
+EXTRACTED = BASE / "extracted"
+CROSSWALK = BASE / "crosswalk"
+REVIEWED = BASE / "reviewed"
+
+DB_PATH = CROSSWALK / "crosswalk.db"
+BATCH_SIZE = 5000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS nodes (
+    id TEXT PRIMARY KEY,
+    code TEXT,
+    name TEXT,
+    standard TEXT,
+    tbl TEXT,
+    level INTEGER,
+    parent TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_nodes_parent ON nodes(parent);
+
+CREATE TABLE IF NOT EXISTS candidates (
+    source_id TEXT NOT NULL,
+    target_id TEXT NOT NULL,
+    method TEXT NOT NULL,
+    tbl TEXT,
+    relationship TEXT,
+    confidence TEXT,
+    score REAL,
+    extra TEXT,
+    updated_at TEXT,
+    PRIMARY KEY (source_id, target_id, method)
+);
+CREATE INDEX IF NOT EXISTS idx_candidates_source ON candidates(source_id);
+CREATE INDEX IF NOT EXISTS idx_candidates_target ON candidates(target_id);
+CREATE INDEX IF NOT EXISTS idx_candidates_method ON candidates(method, tbl);
+
+CREATE TABLE IF NOT EXISTS evidence (
+    source_id TEXT NOT NULL,
+    target_id TEXT NOT NULL,
+    evidence_source TEXT NOT NULL,
+    detail TEXT,
+    updated_at TEXT,
+    PRIMARY KEY (source_id, target_id, evidence_source)
+);
+CREATE INDEX IF NOT EXISTS idx_evidence_source ON evidence(source_id);
+CREATE INDEX IF NOT EXISTS idx_evidence_target ON evidence(target_id);
+
+CREATE TABLE IF NOT EXISTS decisions (
+    source_id TEXT NOT NULL,
+    target_id TEXT NOT NULL,
+    action TEXT,
+    confidence TEXT,
+    relationship TEXT,
+    notes TEXT,
+    reviewed_at TEXT,
+    PRIMARY KEY (source_id, target_id)
+);
+CREATE INDEX IF NOT EXISTS idx_decisions_source ON decisions(source_id);
+CREATE INDEX IF NOT EXISTS idx_decisions_target ON decisions(target_id);
+
+CREATE TABLE IF NOT EXISTS tiers (
+    source_id TEXT NOT NULL,
+    target_id TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    tier INTEGER,
+    methods TEXT,
+    score REAL,
+    updated_at TEXT,
+    PRIMARY KEY (source_id, target_id, stage)
+);
+CREATE INDEX IF NOT EXISTS idx_tiers_source ON tiers(source_id);
+CREATE INDEX IF NOT EXISTS idx_tiers_target ON tiers(target_id);
+CREATE INDEX IF NOT EXISTS idx_tiers_tier ON tiers(stage, tier);
+"""
+
+# Upserts skip the write entirely when no column changed (`IS NOT` is NULL-safe)
+UPSERT_NODE = """
+INSERT INTO nodes (id, code, name, standard, tbl, level, parent) VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(id) DO UPDATE SET
+    code = excluded.code, name = excluded.name, standard = excluded.standard,
+    tbl = excluded.tbl, level = excluded.level, parent = excluded.parent
+WHERE code IS NOT excluded.code OR name IS NOT excluded.name OR standard IS NOT excluded.standard
+   OR tbl IS NOT excluded.tbl OR level IS NOT excluded.level OR parent IS NOT excluded.parent
+"""
+
+UPSERT_CANDIDATE = """
+INSERT INTO candidates (source_id, target_id, method, tbl, relationship, confidence, score, extra, updated_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(source_id, target_id, method) DO UPDATE SET
+    tbl = excluded.tbl, relationship = excluded.relationship, confidence = excluded.confidence,
+    score = excluded.score, extra = excluded.extra, updated_at = excluded.updated_at
+WHERE tbl IS NOT excluded.tbl OR relationship IS NOT excluded.relationship
+   OR confidence IS NOT excluded.confidence OR score IS NOT excluded.score OR extra IS NOT excluded.extra
+"""
+
+UPSERT_EVIDENCE = """
+INSERT INTO evidence (source_id, target_id, evidence_source, detail, updated_at) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(source_id, target_id, evidence_source) DO UPDATE SET
+    detail = excluded.detail, updated_at = excluded.updated_at
+WHERE detail IS NOT excluded.detail
+"""
+
+UPSERT_DECISION = """
+INSERT INTO decisions (source_id, target_id, action, confidence, relationship, notes, reviewed_at)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(source_id, target_id) DO UPDATE SET
+    action = excluded.action, confidence = excluded.confidence, relationship = excluded.relationship,
+    notes = excluded.notes, reviewed_at = excluded.reviewed_at
+WHERE action IS NOT excluded.action OR confidence IS NOT excluded.confidence
+   OR relationship IS NOT excluded.relationship OR notes IS NOT excluded.notes
+"""
+
+UPSERT_TIER = """
+INSERT INTO tiers (source_id, target_id, stage, tier, methods, score, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(source_id, target_id, stage) DO UPDATE SET
+    tier = excluded.tier, methods = excluded.methods, score = excluded.score, updated_at = excluded.updated_at
+WHERE tier IS NOT excluded.tier OR methods IS NOT excluded.methods OR score IS NOT excluded.score
+"""
+
+# Match fields stored in their own columns; everything else goes to `extra`
+CANDIDATE_COLUMNS = {'source_id', 'source_name', 'target_id', 'relationship', 'confidence', 'score'}
+
+
+def _dumps(obj) -> str:
+    """Deterministic JSON so unchanged values compare equal."""
+    return json.dumps(obj, sort_keys=True, ensure_ascii=False)
+
+
+def _now() -> str:
+    return datetime.now().isoformat()
+
+
+def _batches(rows, size=BATCH_SIZE):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class CrosswalkStore:
+    """Thin wrapper over a SQLite connection with batched upserts."""
+
+    def __init__(self, path: Path = DB_PATH):
+        self.path = Path(path)
+        self.conn = sqlite3.connect(self.path, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    @contextmanager
+    def transaction(self):
+        """One transaction per stage write; rolled back on error."""
+        try:
+            self.conn.execute("BEGIN")
+            yield self
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def _executemany(self, sql, rows) -> int:
+        """Run batched executemany; returns the number of rows changed."""
+        before = self.conn.total_changes
+        for batch in _batches(rows):
+            self.conn.executemany(sql, batch)
+        return self.conn.total_changes - before
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def upsert_nodes(self, nodes, standard: str) -> int:
+        def rows():
+            for n in nodes:
+                code = n.get('code', n['id'].split(':', 1)[-1])
+                if standard == 'naics':
+                    parent = f"naics:{code[:-1]}" if len(code) > 2 else None
+                    level, tbl = len(code), None
+                else:
+                    parts = code.split('_')
+                    parent = f"uc:{'_'.join(parts[:-1])}" if len(parts) > 2 else None
+                    level, tbl = len(parts), n.get('table', parts[0]).lower()
+                yield (n['id'], code, n.get('name', ''), standard, tbl, level, parent)
+        return self._executemany(UPSERT_NODE, rows())
+
+    def upsert_candidates(self, records, method: str, table: str = '') -> int:
+        """Upsert (source, match) records for one method.
+
+        tbl is the target's table; `table` (from the file name) only fills
+        in for targets that are not Uniclass codes.
+        """
+        now = _now()
+
+        def rows():
+            for source, m in records:
+                extra = {k: v for k, v in m.items() if k not in CANDIDATE_COLUMNS}
+                yield (source['source_id'], m['target_id'], method,
+                       target_table(m['target_id']) or table, m.get('relationship'),
+                       m.get('confidence'), m.get('score'), _dumps(extra), now)
+        return self._executemany(UPSERT_CANDIDATE, rows())
+
+    def replace_candidates(self, records, method: str, table: str, namespace: str = '') -> int:
+        """Upsert a stage's full output and drop its rows that disappeared.
+
+        The output's rows are those of `method` with `table` (when the file
+        name carries one) and sources in `namespace` ('naics', 'schema'), so
+        naics_to_uniclass_pr_graph and schema_to_uniclass_graph do not
+        delete each other's rows.
+        """
+        records = list(records)
+        changed = self.upsert_candidates(records, method, table)
+        self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS _keep (source_id TEXT, target_id TEXT)")
+        self.conn.execute("DELETE FROM _keep")
+        self.conn.executemany("INSERT INTO _keep VALUES (?, ?)",
+                              [(s['source_id'], m['target_id']) for s, m in records])
+        clauses, params = ["method = ?"], [method]
+        if table:
+            clauses.append("tbl = ?")
+            params.append(table)
+        if namespace:
+            clauses.append("source_id LIKE ?")
+            params.append(f"{namespace}:%")
+        before = self.conn.total_changes
+        self.conn.execute(
+            f"""DELETE FROM candidates WHERE {' AND '.join(clauses)} AND NOT EXISTS (
+                   SELECT 1 FROM _keep k WHERE k.source_id = candidates.source_id
+                                            AND k.target_id = candidates.target_id)""",
+            params)
+        return changed + self.conn.total_changes - before
+
+    def upsert_evidence(self, rows) -> int:
+        """rows: (source_id, target_id, evidence_source, detail_dict)."""
+        now = _now()
+        return self._executemany(UPSERT_EVIDENCE, ((s, t, e, _dumps(d), now) for s, t, e, d in rows))
+
+    def upsert_decisions(self, decisions: dict) -> int:
+        """decisions: {'source|target': {...}} as written by expert_review."""
+        def rows():
+            for key, d in decisions.items():
+                source_id, _, target_id = key.partition('|')
+                yield (source_id, target_id, d.get('action'), d.get('confidence'),
+                       d.get('relationship'), d.get('notes'), d.get('reviewed_at'))
+        return self._executemany(UPSERT_DECISION, rows())
+
+    def upsert_tiers(self, rows, stage: str) -> int:
+        """rows: (source_id, target_id, tier, methods, score)."""
+        now = _now()
+        return self._executemany(UPSERT_TIER, (
+            (s, t, stage, tier, _dumps(sorted(methods)), score, now)
+            for s, t, tier, methods, score in rows))
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def candidates(self, source_id=None, target_id=None, method=None, confidence=None, table=None):
+        clauses, params = [], []
+        for column, value in (('source_id', source_id), ('target_id', target_id),
+                              ('method', method), ('tbl', table)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if confidence:
+            confidence = list(confidence)
+            clauses.append(f"confidence IN ({','.join('?' * len(confidence))})")
+            params.extend(confidence)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return self.conn.execute(f"SELECT * FROM candidates {where}", params).fetchall()
+
+    def tier_of(self, source_id: str, target_id: str, stage: str = 'final'):
+        row = self.conn.execute(
+            "SELECT tier FROM tiers WHERE source_id = ? AND target_id = ? AND stage = ?",
+            (source_id, target_id, stage)).fetchone()
+        return row['tier'] if row else None
+
+    def counts(self) -> dict:
+        return {t: self.conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0]
+                for t in ('nodes', 'candidates', 'evidence', 'decisions', 'tiers')}
+
+
+# ----------------------------------------------------------------------
+# Importers / write-through helpers used by the stages
+# ----------------------------------------------------------------------
+
+def open_store(path: Path = DB_PATH):
+    """Return a store if the optional database has been initialized, else None."""
+    if not Path(path).exists():
+        return None
+    return CrosswalkStore(path)
+
+
+def file_namespace(path) -> str:
+    """Source id namespace of a candidate file: 'naics_to_uniclass_ss' -> 'naics'."""
+    stem = Path(path).stem
+    return stem.partition('_to_')[0] if '_to_' in stem else ''
+
+
+def write_through_candidates(outfile: Path, candidates: list):
+    """Mirror a candidate file a stage just wrote into the store, if enabled."""
+    store = open_store()
+    if store is None:
+        return
+    method, table, namespace = file_method(outfile), file_table(outfile), file_namespace(outfile)
+    records = []
+    for item in candidates:
+        if 'matches' in item:
+            source = {'source_id': item['source_id']}
+            records.extend((source, m) for m in item['matches'])
+        else:
+            records.append(({'source_id': item['source_id']}, item))
+    try:
+        with store.transaction():
+            changed = store.replace_candidates(records, method, table, namespace)
+        print(f"  Store: {changed} rows changed ({method}/{table})")
+    finally:
+        store.close()
+
+
+def import_nodes(store: CrosswalkStore) -> int:
+    changed = 0
+    naics = EXTRACTED / "naics.json"
+    if naics.exists():
+        changed += store.upsert_nodes(iter_array(naics), 'naics')
+    for table in ['ss', 'pr', 'ac', 'en', 'co']:
+        path = EXTRACTED / f"uniclass_{table}.json"
+        if path.exists():
+            changed += store.upsert_nodes(iter_array(path), 'uniclass')
+    return changed
+
+
+def import_candidates(store: CrosswalkStore) -> int:
+    changed = 0
+    for path in sorted(CANDIDATES.glob("*.json")):
+        changed += store.replace_candidates(stream_file(path), file_method(path), file_table(path),
+                                            file_namespace(path))
+    return changed
+
+
+def import_final_crosswalk(store: CrosswalkStore) -> int:
+    path = CROSSWALK / "final_crosswalk.json"
+    if not path.exists():
+        return 0
+    tier_rows, evidence_rows = [], []
+    for _, m in stream_crosswalk(path):
+        s, t = m['naics_code'], m['uniclass_code']
+        tier_rows.append((s, t, m.get('final_tier'), m.get('methods', []), m.get('confidence_score')))
+        for ev in m.get('evidence', []):
+            # One row per evidence source; repeated sources are kept as a list
+            evidence_rows.append((s, t, ev.get('source', 'unknown'), ev))
+    grouped = {}
+    for s, t, src, ev in evidence_rows:
+        grouped.setdefault((s, t, src), []).append(ev)
+    return (store.upsert_tiers(tier_rows, 'final') +
+            store.upsert_evidence((s, t, src, evs) for (s, t, src), evs in grouped.items()))
+
+
+def import_validation_tiers(store: CrosswalkStore) -> int:
+    path = CROSSWALK / "validation_tiers.json"
+    if not path.exists():
+        return 0
+    with open(path) as f:
+        data = json.load(f)
+    rows = []
+    for tier_name, mappings in data.get('tiers', {}).items():
+        tier_num = int(tier_name.split('tier')[1].split('_')[0])
+        for m in mappings:
+            rows.append((m['source_id'], m['target_id'], tier_num, m.get('methods', []), m.get('avg_score')))
+    return store.upsert_tiers(rows, 'validation')
+
+
+def import_decisions(store: CrosswalkStore) -> int:
+    path = REVIEWED / "decisions.json"
+    if not path.exists():
+        return 0
+    with open(path) as f:
+        return store.upsert_decisions(json.load(f))
+
+
+def sync(path: Path = DB_PATH):
+    """Import all files; only rows whose values changed are written."""
+    store = CrosswalkStore(path)
+    try:
+        with store.transaction():
+            steps = [
+                ('nodes', import_nodes),
+                ('candidates', import_candidates),
+                ('validation tiers', import_validation_tiers),
+                ('final crosswalk', import_final_crosswalk),
+                ('decisions', import_decisions),
+            ]
+            for name, step in steps:
+                print(f"  {name}: {step(store)} rows changed")
+        for table, count in store.counts().items():
+            print(f"  {table}: {count} rows")
+    finally:
+        store.close()
+
+
+def stats():
+    store = open_store()
+    if store is None:
+        print(f"No store at {DB_PATH} (run: crosswalk_store.py init)")
+        return
+    try:
+        for table, count in store.counts().items():
+            print(f"  {table}: {count}")
+        for row in store.conn.execute(
+                "SELECT method, tbl, COUNT(*) AS n FROM candidates GROUP BY method, tbl ORDER BY method, tbl"):
+            print(f"    {row['method']}/{row['tbl']}: {row['n']}")
+    finally:
+        store.close()
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: crosswalk_store.py <command>")
+        print("Commands:")
+        print("  init   - Create the database and import all files")
+        print("  sync   - Re-import files (only changed rows are written)")
+        print("  stats  - Show row counts")
+        sys.exit(1)
+
+    cmd = sys.argv[1]
+    if cmd in ('init', 'sync'):
+        print(f"Syncing {DB_PATH}...")
+        sync()
+    elif cmd == 'stats':
+        stats()
+    else:
+        print(f"Unknown command: {cmd}")
+
+
+if __name__ == "__main__":
+    main()
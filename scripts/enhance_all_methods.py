@@ -12,23 +12,29 @@ import urllib.request
 from pathlib import Path
 from collections import defaultdict
 
-# WordNet is optional - skip if not available
-WORDNET_AVAILABLE = False
-try:
-    from nltk.corpus import wordnet
-    import nltk
-    try:
-        wordnet.synsets('test')
-        WORDNET_AVAILABLE = True
-    except LookupError:
-        nltk.download('wordnet', quiet=True)
-        nltk.download('omw-1.4', quiet=True)
-        WORDNET_AVAILABLE = True
-except Exception as e:
-    print(f"WordNet not available ({e}) - using manual synonyms instead")
+import perf
 
 OUTPUT_DIR = Path("data/enhanced")
-OUTPUT_DIR.mkdir(exist_ok=True)
+
+
+def load_wordnet():
+    """WordNet corpus reader, or None if nltk is unavailable.
+
+    WordNet is optional - skip if not available. Imported (and the corpus
+    downloaded, if missing) only when the WordNet step actually runs.
+    """
+    try:
+        from nltk.corpus import wordnet
+        import nltk
+        try:
+            wordnet.synsets('test')
+        except LookupError:
+            nltk.download('wordnet', quiet=True)
+            nltk.download('omw-1.4', quiet=True)
+        return wordnet
+    except Exception as e:
+        print(f"WordNet not available ({e}) - using manual synonyms instead")
+        return None
 
 # ============================================
 # 1. BLS INDUSTRY-OCCUPATION MATRIX
@@ -242,7 +248,8 @@ def expand_with_wordnet():
         "excavation": {"synonyms": ["earthwork", "digging", "groundwork"], "hypernyms": ["site work"]}
     }
 
-    if WORDNET_AVAILABLE:
+    wordnet = load_wordnet()
+    if wordnet is not None:
         expansions = {}
         for term in CONSTRUCTION_TERMS:
             synonyms = set()
@@ -361,22 +368,28 @@ def compile_document_sources():
 # MAIN
 # ============================================
 
+@perf.staged('enhance')
 def main():
     print("=" * 50)
     print("COMPREHENSIVE ENHANCEMENT - ALL METHODS")
     print("=" * 50)
+    OUTPUT_DIR.mkdir(exist_ok=True)
 
     print("\n1. BLS Industry-Occupation Matrix...")
-    bls = save_bls_matrix()
+    with perf.span('bls'):
+        bls = save_bls_matrix()
 
     print("\n2. Brick Schema Parsing...")
-    brick = parse_brick_schema()
+    with perf.span('brick'):
+        brick = parse_brick_schema()
 
     print("\n3. WordNet Synonym Expansion...")
-    wordnet_data = expand_with_wordnet()
+    with perf.span('wordnet'):
+        wordnet_data = expand_with_wordnet()
 
     print("\n4. Public Document References...")
-    docs = compile_document_sources()
+    with perf.span('documents'):
+        docs = compile_document_sources()
 
     # Summary
     print("\n" + "=" * 50)
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""Learned ensemble scorer for NAICS -> Uniclass candidate pairs.
+
+triangulate_confidence and final_merge assign tiers with hand-written
+rules over method counts and average scores. This stage learns the
+weighting instead: one logistic regression over a per-pair feature
+matrix, fitted by batch gradient descent and applied to every candidate
+pair in a single matrix-vector product.
+
+Features are read from the pair-feature columns (pair_features.py), one
+row per candidate pair:
+  jaccard        token-set Jaccard of the two names (extracted tokens)
+  cosine         best TF-IDF embedding score for the pair, 0 if none
+  hierarchy_gap  |NAICS depth - Uniclass depth|, both scaled to 0..1
+  onet           pair has an O*NET task match
+  bls            NAICS code has BLS occupation-matrix evidence
+  brick          Uniclass code falls under a Brick-aligned system
+  propagated     pair came from hierarchy propagation
+
+Labels: crosswalk/ground_truth.csv pairs and expert-approved mappings
+are positive. Expert-rejected mappings and all other candidates are
+negative (unlabeled pairs are treated as negatives, with class weights
+balancing the two sides). Ground truth is itself linguistic + embedding
+agreement, so those features dominate until more expert labels exist.
+
+Features are standardized, and the model is kept in standardized space
+(mean, std, weights and bias are saved with the scores). Probabilities
+are also written back as the 'ensemble' pair-feature column.
+
+Arrays are NumPy when NumPy is installed, plain lists otherwise.
+
+Usage: ensemble_score.py [--epochs=N]
+"""
+
+import csv
+import json
+import math
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+import perf
+from export_ground_truth import load_names
+from pair_features import open_features
+
+BASE = Path(__file__).parent.parent
+CROSSWALK = BASE / "crosswalk"
+GROUND_TRUTH = CROSSWALK / "ground_truth.csv"
+EXPERT_VALIDATIONS = BASE / "reviewed" / "expert_validations.json"
+OUTPUT = CROSSWALK / "ensemble_scores.json"
+
+FEATURES = ['jaccard', 'cosine', 'hierarchy_gap', 'onet', 'bls', 'brick', 'propagated']
+
+EPOCHS = 150
+LEARNING_RATE = 0.5
+L2 = 1e-3
+
+# Probability -> tier (same 1-4 scale as final_merge)
+TIER_THRESHOLDS = [(0.8, 1), (0.5, 2), (0.2, 3)]
+
+
+# =============================================================================
+# EVIDENCE
+# =============================================================================
+
+def _load(path: Path):
+    return perf.load_json(path) if path.exists() else None
+
+
+def load_ground_truth() -> set:
+    if not GROUND_TRUTH.exists():
+        return set()
+    with open(GROUND_TRUTH, encoding='utf-8') as f:
+        return {(r['source_id'], r['target_id']) for r in csv.DictReader(f)}
+
+
+def load_expert_labels() -> list:
+    """[(trade stem, target name, label)] from 'Siding -> Cladding systems' mappings."""
+    expert = _load(EXPERT_VALIDATIONS) or {}
+    labels = []
+    for v in expert.get('validations', []):
+        trade, _, target = v.get('mapping', '').partition(' -> ')
+        if v.get('decision') in ('Y', 'N') and trade and target:
+            labels.append((trade.split()[0].lower()[:5], target.strip().lower(), v['decision'] == 'Y'))
+    return labels
+
+
+def _present(col) -> list:
+    """1.0 where a score column has a value (NaN = method did not match)."""
+    return [float(v == v) for v in col]
+
+
+def label_pairs(features, ids: list) -> list:
+    """1.0 / 0.0 label per pair id (ground truth and expert Y positive)."""
+    names = load_names()
+    truth = {features.find(*key) for key in load_ground_truth()}
+    expert = load_expert_labels()
+    labels = []
+    for pid in ids:
+        source, target = features.key(pid)
+        label = pid in truth
+        source_words = names.get(source, '').lower().split()
+        target_name = names.get(target, '').lower()
+        for stem, name, approved in expert:
+            if target_name == name and any(w.startswith(stem) for w in source_words):
+                label = approved
+        labels.append(1.0 if label else 0.0)
+    return labels
+
+
+def build_features(features) -> tuple:
+    """(pair ids, feature rows, labels) for every candidate pair."""
+    truth = {features.find(*key) for key in load_ground_truth()} - {None}
+
+    # Candidate pairs: any method except O*NET (task matches are evidence only)
+    matched = [features.column(f"score.{m}") for m in features.methods() if m != 'onet']
+    ids = [pid for pid in range(len(features)) if pid in truth or any(col[pid] == col[pid] for col in matched)]
+
+    columns = {
+        'jaccard': features.column('jaccard'),
+        'cosine': [v if v == v else 0.0 for v in features.column('score.embedding')],
+        'hierarchy_gap': features.column('depth_gap'),
+        'onet': _present(features.column('score.onet')),
+        'bls': features.column('bls'),
+        'brick': features.column('brick'),
+        'propagated': _present(features.column('score.hierarchy')),
+    }
+    columns = [columns[name] for name in FEATURES]
+
+    rows = [[float(col[pid]) for col in columns] for pid in ids]
+    perf.count('pairs', len(ids))
+    return ids, rows, label_pairs(features, ids)
+
+
+# =============================================================================
+# MODEL (NumPy or list backend)
+# =============================================================================
+
+def _sigmoid(z: float) -> float:
+    return 1 / (1 + math.exp(-z)) if z >= 0 else math.exp(z) / (1 + math.exp(z))
+
+
+if NUMPY_AVAILABLE:
+    def _matrix(rows):
+        return np.asarray(rows, dtype=float)
+
+    def _standardize(X):
+        mean = X.mean(axis=0)
+        std = X.std(axis=0)
+        std[std == 0] = 1.0
+        return (X - mean) / std, mean.tolist(), std.tolist()
+
+    def _apply_scaling(X, mean, std):
+        return (X - np.asarray(mean)) / np.asarray(std)
+
+    def _fit(Z, y, sample_weight, epochs, lr, l2):
+        y, sw = np.asarray(y), np.asarray(sample_weight)
+        w, b = np.zeros(Z.shape[1]), 0.0
+        total = sw.sum()
+        for _ in range(epochs):
+            p = 1 / (1 + np.exp(-(Z @ w + b)))
+            g = sw * (p - y)
+            w -= lr * (Z.T @ g / total + l2 * w)
+            b -= lr * g.sum() / total
+        return w.tolist(), float(b)
+
+    def _predict(Z, w, b):
+        return (1 / (1 + np.exp(-(Z @ np.asarray(w) + b)))).tolist()
+else:
+    def _matrix(rows):
+        return [list(map(float, r)) for r in rows]
+
+    def _standardize(X):
+        n, d = len(X), len(X[0])
+        mean = [sum(r[j] for r in X) / n for j in range(d)]
+        std = [math.sqrt(sum((r[j] - mean[j]) ** 2 for r in X) / n) or 1.0 for j in range(d)]
+        return _apply_scaling(X, mean, std), mean, std
+
+    def _apply_scaling(X, mean, std):
+        return [[(v - m) / s for v, m, s in zip(r, mean, std)] for r in X]
+
+    def _fit(Z, y, sample_weight, epochs, lr, l2):
+        cols = [list(c) for c in zip(*Z)]    # column-major: one pass per feature
+        w, b = [0.0] * len(cols), 0.0
+        total = sum(sample_weight)
+        for _ in range(epochs):
+            z = [b] * len(y)
+            for wj, col in zip(w, cols):
+                z = [zi + wj * v for zi, v in zip(z, col)]
+            g = [s * (_sigmoid(zi) - t) for zi, t, s in zip(z, y, sample_weight)]
+            w = [wj - lr * (sum(gi * v for gi, v in zip(g, col)) / total + l2 * wj)
+                 for wj, col in zip(w, cols)]
+            b -= lr * sum(g) / total
+        return w, b
+
+    def _predict(Z, w, b):
+        return [_sigmoid(sum(wj * v for wj, v in zip(w, r)) + b) for r in Z]
+
+
+def train(rows: list, labels: list, epochs: int = EPOCHS) -> dict:
+    """Fit the scorer; returns {'mean', 'std', 'weights', 'bias'}."""
+    Z, mean, std = _standardize(_matrix(rows))
+    positives = sum(labels)
+    negatives = len(labels) - positives
+    # Balanced class weights: each class carries half the total weight
+    pos_w = len(labels) / (2 * positives) if positives else 0.0
+    neg_w = len(labels) / (2 * negatives) if negatives else 0.0
+    weights = [pos_w if y else neg_w for y in labels]
+    w, b = _fit(Z, labels, weights, epochs, LEARNING_RATE, L2)
+    return {'mean': mean, 'std': std, 'weights': w, 'bias': b}
+
+
+def score(rows: list, model: dict) -> list:
+    """Probability for every row in one pass."""
+    Z = _apply_scaling(_matrix(rows), model['mean'], model['std'])
+    return _predict(Z, model['weights'], model['bias'])
+
+
+def tier_for(probability: float) -> int:
+    for threshold, tier in TIER_THRESHOLDS:
+        if probability >= threshold:
+            return tier
+    return 4
+
+
+def ranking_auc(scores: list, labels: list) -> float:
+    """Probability that a positive outranks a negative (ties count half)."""
+    order = sorted(range(len(scores)), key=lambda i: scores[i])
+    rank_sum, i = 0.0, 0
+    while i < len(order):
+        j = i
+        while j + 1 < len(order) and scores[order[j + 1]] == scores[order[i]]:
+            j += 1
+        avg_rank = (i + j) / 2 + 1
+        rank_sum += sum(avg_rank for k in order[i:j + 1] if labels[k])
+        i = j + 1
+    positives = sum(labels)
+    negatives = len(labels) - positives
+    if not positives or not negatives:
+        return 0.0
+    return (rank_sum - positives * (positives + 1) / 2) / (positives * negatives)
+
+
+@perf.staged('ensemble')
+def main():
+    flags = dict(a[2:].partition('=')[::2] for a in sys.argv[1:] if a.startswith('--'))
+    epochs = int(flags.get('epochs') or EPOCHS)
+    print(f"Ensemble scorer ({'NumPy' if NUMPY_AVAILABLE else 'pure Python'} backend)\n")
+
+    with perf.span('features'):
+        features = open_features()
+        ids, rows, labels = build_features(features)
+    print(f"Pairs: {len(ids)} ({int(sum(labels))} positive)")
+
+    with perf.span('train'):
+        start = time.perf_counter()
+        model = train(rows, labels, epochs)
+        train_s = time.perf_counter() - start
+
+    with perf.span('score'):
+        start = time.perf_counter()
+        probabilities = score(rows, model)
+        score_ms = (time.perf_counter() - start) * 1000
+
+    auc = ranking_auc(probabilities, labels)
+    print(f"Trained in {train_s:.3f}s ({epochs} epochs), scored in {score_ms:.1f} ms, training AUC {auc:.3f}")
+    print("\nWeights (standardized features):")
+    for name, w in zip(FEATURES, model['weights']):
+        print(f"  {name:<14} {w:+.3f}")
+
+    tier_counts = {1: 0, 2: 0, 3: 0, 4: 0}
+    pairs = []
+    for pid, row, p in zip(ids, rows, probabilities):
+        source, target = features.key(pid)
+        tier = tier_for(p)
+        tier_counts[tier] += 1
+        pairs.append({'source_id': source, 'target_id': target, 'probability': round(p, 4),
+                      'tier': tier, 'features': dict(zip(FEATURES, (round(v, 4) for v in row)))})
+    pairs.sort(key=lambda x: -x['probability'])
+
+    output = {
+        "_meta": {
+            "generated_at": datetime.now().isoformat(),
+            "description": "Logistic-regression ensemble scores for candidate pairs",
+            "backend": "numpy" if NUMPY_AVAILABLE else "python",
+            "features": FEATURES,
+            "model": model,
+            "epochs": epochs,
+            "positives": int(sum(labels)),
+            "pairs": len(pairs),
+            "training_auc": round(auc, 4),
+            "tier_thresholds": TIER_THRESHOLDS,
+        },
+        "summary": {f"tier_{t}": c for t, c in tier_counts.items()},
+        "pairs": pairs,
+    }
+    with perf.span('save'):
+        with open(OUTPUT, 'w', encoding='utf-8') as f:
+            json.dump(output, f, indent=1)
+        features.write_values('ensemble', dict(zip(ids, probabilities)))
+        features.save()
+
+    print("\nBy tier:")
+    for tier, count in tier_counts.items():
+        print(f"  Tier {tier}: {count}")
+    print(f"\nSaved to {OUTPUT}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@
 """Expert review interface for candidate mappings."""
 
 import json
+import sys
 import csv
 from pathlib import Path
 from datetime import datetime
@@ -150,9 +151,7 @@ def stats():
     print(f"  Rejected: {rejected}")
     print(f"  Modified: {modified}")
 
-if __name__ == "__main__":
-    import sys
-
+def main():
     if len(sys.argv) < 2:
         print("Usage: expert_review.py <command> [args]")
         print("Commands:")
@@ -170,3 +169,6 @@ if __name__ == "__main__":
         stats()
     else:
         print(f"Unknown command: {cmd}")
+
+if __name__ == "__main__":
+    main()
@@ -10,14 +10,21 @@ Exports mappings to:
 import json
 import csv
 from pathlib import Path
-from collections import defaultdict
 from datetime import datetime
 
+import perf
+from pair_features import CONF_LETTERS, open_features
+
 BASE = Path(__file__).parent.parent
 CANDIDATES = BASE / "candidates"
 EXTRACTED = BASE / "extracted"
 CROSSWALK = BASE / "crosswalk"
 
+# Propagated pairs restate other methods' matches at child codes, and
+# O*NET evidence is merged later by final_merge
+UNTIERED_METHODS = {'hierarchy', 'onet'}
+GENERIC_RELATIONSHIPS = {'semantically_similar', 'lexically_similar', 'related_to', 'relatedTo'}
+
 def load_names():
     """Load all node names."""
     names = {}
@@ -40,42 +47,10 @@ def load_names():
     return names
 
 def load_all_mappings():
-    """Load all mappings grouped by source-target pair."""
-    mappings = defaultdict(lambda: {'methods': [], 'confidences': [], 'scores': []})
-
-    for f in CANDIDATES.glob("*.json"):
-        # Determine method
-        if 'propagated' in f.name:
-            method = 'hierarchy'
-        elif 'cooccur' in f.name:
-            method = 'cooccurrence'
-        elif 'embedding' in f.name:
-            method = 'embedding'
-        elif 'graph' in f.name:
-            method = 'graph'
-        else:
-            method = 'linguistic'
-
-        with open(f) as fp:
-            try:
-                data = json.load(fp)
-            except:
-                continue
-
-        for item in data:
-            source_id = item.get('source_id', '')
-            for match in item.get('matches', []):
-                target_id = match.get('target_id', '')
-                key = (source_id, target_id)
-
-                mappings[key]['methods'].append(method)
-                mappings[key]['confidences'].append(match.get('confidence', 'D'))
-                mappings[key]['scores'].append(match.get('score', 0))
-                mappings[key]['relationship'] = match.get('relationship', 'related_to')
+    """Pair-feature columns for every candidate pair, synced to candidates/."""
+    return open_features(CROSSWALK / "pair_features", CANDIDATES)
 
-    return dict(mappings)
-
-def classify_tiers(mappings):
+def classify_tiers(features):
     """Classify mappings into validation tiers."""
     tiers = {
         'tier1_ground_truth': [],  # Both linguistic and embedding agree A/B
@@ -87,23 +62,33 @@ def classify_tiers(mappings):
     conf_rank = {'A': 0, 'B': 1, 'C': 2, 'D': 3}
     names = load_names()
 
-    for (source_id, target_id), data in mappings.items():
-        methods = set(data['methods'])
-        confs = data['confidences']
-        scores = data['scores']
+    columns = [(m, features.column(f"score.{m}"), features.column(f"conf.{m}"), features.column(f"rel.{m}"))
+               for m in features.methods() if m not in UNTIERED_METHODS]
+
+    for pid, (source_id, target_id) in enumerate(features.keys()):
+        found = [(m, scores[pid], CONF_LETTERS[confs[pid]], rels[pid])
+                 for m, scores, confs, rels in columns if confs[pid]]
+        if not found:
+            continue
+        methods = [m for m, _, _, _ in found]
+        confs = [c for _, _, c, _ in found]
+        scores = [s for _, s, _, _ in found]
+        relationships = [features.label(r) for _, _, _, r in found]
 
         best_conf = min(confs, key=lambda c: conf_rank.get(c, 3))
         worst_conf = max(confs, key=lambda c: conf_rank.get(c, 3))
         avg_score = sum(scores) / len(scores) if scores else 0
+        # A typed relationship (produces, uses, ...) beats plain similarity
+        typed = [r for r in relationships if r not in GENERIC_RELATIONSHIPS]
 
         record = {
             'source_id': source_id,
             'source_name': names.get(source_id, source_id),
             'target_id': target_id,
             'target_name': names.get(target_id, target_id),
-            'relationship': data.get('relationship', 'related_to'),
+            'relationship': (typed or relationships)[0],
             'best_confidence': best_conf,
-            'methods': list(methods),
+            'methods': methods,
             'method_count': len(methods),
             'avg_score': round(avg_score, 3),
         }
@@ -111,8 +96,8 @@ def classify_tiers(mappings):
         # Classify
         has_linguistic = 'linguistic' in methods
         has_embedding = 'embedding' in methods
-        ling_high = any(c in ['A', 'B'] for c, m in zip(confs, data['methods']) if m == 'linguistic')
-        emb_high = any(c in ['A', 'B'] for c, m in zip(confs, data['methods']) if m == 'embedding')
+        ling_high = any(c in ['A', 'B'] for m, _, c, _ in found if m == 'linguistic')
+        emb_high = any(c in ['A', 'B'] for m, _, c, _ in found if m == 'embedding')
 
         conf_spread = conf_rank.get(worst_conf, 3) - conf_rank.get(best_conf, 0)
 
@@ -131,14 +116,26 @@ def classify_tiers(mappings):
 
     return tiers
 
+def save_tier_column(features, tiers):
+    """Write each pair's tier (1-4) to the pair-feature 'tier' column."""
+    values = {}
+    for number, records in enumerate(tiers.values(), 1):
+        for r in records:
+            values[features.find(r['source_id'], r['target_id'])] = number
+    features.write_values('tier', values)
+    features.save()
+
 def export_ground_truth():
     """Export ground truth to CSV and JSON."""
     print("Loading mappings...")
-    mappings = load_all_mappings()
-    print(f"Loaded {len(mappings)} unique source-target pairs")
+    with perf.span('load'):
+        features = load_all_mappings()
+    print(f"Loaded {len(features)} unique source-target pairs")
 
     print("\nClassifying into tiers...")
-    tiers = classify_tiers(mappings)
+    with perf.span('classify'):
+        tiers = classify_tiers(features)
+        save_tier_column(features, tiers)
 
     for name, items in tiers.items():
         print(f"  {name}: {len(items)}")
@@ -168,7 +165,7 @@ def export_ground_truth():
             'tier2_high_single': len(tiers['tier2_high_single']),
             'tier3_conflicts': len(tiers['tier3_conflicts']),
             'tier4_low_confidence': len(tiers['tier4_low_confidence']),
-            'total': len(mappings),
+            'total': sum(len(t) for t in tiers.values()),
         },
         'tiers': tiers
     }
@@ -200,5 +197,9 @@ Tier 4 - Low Confidence (C/D only): {len(tiers['tier4_low_confidence'])}
 
     return tiers
 
-if __name__ == "__main__":
+@perf.staged('ground_truth')
+def main():
     export_ground_truth()
+
+if __name__ == "__main__":
+    main()
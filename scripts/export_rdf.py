@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""Stream the ontology graph to N-Triples / N-Quads for bulk loading.
+
+Writes the same sources triple_store.py loads, one line at a time, so
+memory stays flat however large the crosswalk grows:
+
+  extracted    extracted/*.json nodes (types, names, codes, partOf)
+  instances    instances/nodes/**/*.jsonld and relationships.csv
+  crosswalk    one edge per final crosswalk mapping, plus a reified
+               rdf:Statement carrying its tier, methods and confidence
+  provenance   one description per graph above: source file, modified
+               time and triple count (written last)
+  brick        data/Brick.ttl, only with --brick (parsed in memory)
+
+The format follows the output name: .nq writes N-Quads with each source
+in its own named graph (GRAPH_BASE + name), .nt writes N-Triples. Add
+.gz for gzip. Lines are not de-duplicated: a triple stated by two sources
+appears twice, which bulk loaders (and TripleStore.load_nquads) collapse.
+
+Reified crosswalk mappings use stable IRIs, MAPPING_BASE<naics>/<uniclass>,
+so reloading a newer export replaces rather than duplicates them:
+
+  <.../mapping/238130/Ss_25_10_30> rdf:type rdf:Statement ;
+      rdf:subject naics:238130 ; rdf:predicate corelot:produces ;
+      rdf:object uc:Ss_25_10_30 ; corelot:tier 1 ;
+      corelot:method "linguistic", "embedding" ; corelot:confidenceScore 0.91 .
+
+Usage: export_rdf.py [output.{nq,nt}[.gz]] [--brick]
+"""
+
+import gzip
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+import perf
+from triple_store import (BRICK_FILE, EXTRACTED, FINAL_CROSSWALK, GRAPH_BASE, INSTANCES, PREFIXES,
+                          RDF_TYPE, RELATIONSHIPS, crosswalk_mappings, extracted_triples,
+                          jsonld_triples, literal, parse_turtle, relationship_triples, to_nt)
+
+BASE = Path(__file__).parent.parent
+RDF_DIR = BASE / "data" / "rdf"
+DEFAULT_OUTPUT = RDF_DIR / "corelot.nq.gz"
+
+MAPPING_BASE = "https://corelot.io/mapping/"
+BATCH_LINES = 10000
+
+
+def crosswalk_statements(path: Path = FINAL_CROSSWALK):
+    """Edge triples and their reified statements, streamed from the crosswalk."""
+    for _, m in crosswalk_mappings(path):
+        s, p, o = m['naics_code'], m['predicate'], m['uniclass_code']
+        yield s, p, o
+        stmt = f"<{MAPPING_BASE}{s.split(':', 1)[1]}/{o.split(':', 1)[1]}>"
+        yield stmt, RDF_TYPE, "rdf:Statement"
+        yield stmt, "rdf:subject", s
+        yield stmt, "rdf:predicate", p
+        yield stmt, "rdf:object", o
+        yield stmt, "corelot:tier", literal(str(m.get('final_tier', 4)), datatype="xsd:integer")
+        for method in m.get('methods', []):
+            yield stmt, "corelot:method", literal(method)
+        if m.get('confidence_score') is not None:
+            yield stmt, "corelot:confidenceScore", literal(str(m['confidence_score']), datatype="xsd:decimal")
+
+
+def provenance(graph: str, sources: list, count: int):
+    """Description of one exported graph."""
+    node = f"<{GRAPH_BASE}{graph}>"
+    yield node, RDF_TYPE, "prov:Entity"
+    for path in sources:
+        yield node, "prov:wasDerivedFrom", literal(str(path.relative_to(BASE)))
+        modified = datetime.fromtimestamp(path.stat().st_mtime, timezone.utc)
+        yield node, "dcterms:modified", literal(modified.strftime("%Y-%m-%dT%H:%M:%SZ"), datatype="xsd:dateTime")
+    yield node, "corelot:tripleCount", literal(str(count), datatype="xsd:integer")
+
+
+class RdfWriter:
+    """Buffered N-Triples / N-Quads lines to a plain or gzip file."""
+
+    def __init__(self, path: Path, prefixes: dict = PREFIXES):
+        name = path.name[:-3] if path.name.endswith('.gz') else path.name
+        self.quads = name.endswith('.nq')
+        self.prefixes = prefixes
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.f = (gzip.open(path, 'wt', encoding='utf-8', compresslevel=6) if path.name.endswith('.gz')
+                  else open(path, 'w', encoding='utf-8'))
+        self.lines = []
+        self.written = 0
+
+    def write(self, triples, graph: str) -> int:
+        """Write a triple stream into a graph; returns the number of triples."""
+        suffix = f" <{GRAPH_BASE}{graph}> .\n" if self.quads else " .\n"
+        prefixes = self.prefixes
+        count = 0
+        for s, p, o in triples:
+            self.lines.append(f"{to_nt(s, prefixes)} {to_nt(p, prefixes)} {to_nt(o, prefixes)}{suffix}")
+            count += 1
+            if len(self.lines) >= BATCH_LINES:
+                self.flush()
+        self.written += count
+        return count
+
+    def flush(self):
+        self.f.write("".join(self.lines))
+        self.lines = []
+
+    def close(self):
+        self.flush()
+        self.f.close()
+
+
+@perf.staged('export_rdf')
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    output = Path(args[0]) if args else DEFAULT_OUTPUT
+    # (graph, source file or directory for provenance, triple stream)
+    sources = [
+        ("extracted", EXTRACTED, extracted_triples),
+        ("instances", INSTANCES / "nodes", jsonld_triples),
+        ("instances", RELATIONSHIPS, relationship_triples),
+        ("crosswalk", FINAL_CROSSWALK, crosswalk_statements),
+    ]
+    prefixes = dict(PREFIXES)
+    if '--brick' in sys.argv and BRICK_FILE.exists():
+        brick_prefixes, brick_triples = parse_turtle(BRICK_FILE.read_text(encoding='utf-8'), bnode_prefix="t")
+        prefixes = {**brick_prefixes, **prefixes}
+        sources.append(("brick", BRICK_FILE, lambda: brick_triples))
+
+    writer = RdfWriter(output, prefixes)
+    counts, files = {}, {}
+    try:
+        for graph, path, triples in sources:
+            if not path.exists():
+                continue
+            with perf.span(graph):
+                n = writer.write(triples(), graph)
+            counts[graph] = counts.get(graph, 0) + n
+            files.setdefault(graph, []).append(path)
+        with perf.span('provenance'):
+            for graph, count in counts.items():
+                writer.write(provenance(graph, files[graph], count), "provenance")
+                print(f"  {graph:<10} {count:>8} triples")
+    finally:
+        writer.close()
+    perf.count('triples_written', writer.written)
+
+    kind = "N-Quads" if writer.quads else "N-Triples"
+    print(f"Wrote {writer.written} {kind} lines ({output.stat().st_size / 1e6:.1f} MB) to {output}")
+
+
+if __name__ == "__main__":
+    main()
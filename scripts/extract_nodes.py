@@ -6,6 +6,8 @@ import json
 import re
 from pathlib import Path
 
+import perf
+
 BASE = Path(__file__).parent.parent
 SOURCES = BASE / "sources"
 OUTPUT = BASE / "extracted"
@@ -85,27 +87,34 @@ def extract_schemaorg():
                 })
     return nodes
 
+@perf.staged('extract')
 def main():
     OUTPUT.mkdir(exist_ok=True)
 
     # Extract all sources
     print("Extracting NAICS...")
-    naics = extract_naics()
-    with open(OUTPUT / "naics.json", 'w') as f:
-        json.dump(naics, f, indent=2)
+    with perf.span('extract', source='naics'):
+        naics = extract_naics()
+        with open(OUTPUT / "naics.json", 'w') as f:
+            json.dump(naics, f, indent=2)
+    perf.count('nodes_extracted', len(naics))
     print(f"  {len(naics)} nodes")
 
     for table in ['Ss', 'Pr', 'Ac', 'En', 'Co']:
         print(f"Extracting Uniclass {table}...")
-        uc = extract_uniclass(table)
-        with open(OUTPUT / f"uniclass_{table.lower()}.json", 'w') as f:
-            json.dump(uc, f, indent=2)
+        with perf.span('extract', source=f"uniclass_{table.lower()}"):
+            uc = extract_uniclass(table)
+            with open(OUTPUT / f"uniclass_{table.lower()}.json", 'w') as f:
+                json.dump(uc, f, indent=2)
+        perf.count('nodes_extracted', len(uc))
         print(f"  {len(uc)} nodes")
 
     print("Extracting Schema.org...")
-    schema = extract_schemaorg()
-    with open(OUTPUT / "schemaorg.json", 'w') as f:
-        json.dump(schema, f, indent=2)
+    with perf.span('extract', source='schemaorg'):
+        schema = extract_schemaorg()
+        with open(OUTPUT / "schemaorg.json", 'w') as f:
+            json.dump(schema, f, indent=2)
+    perf.count('nodes_extracted', len(schema))
     print(f"  {len(schema)} nodes")
 
     print("\nDone. Output in extracted/")
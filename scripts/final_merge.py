@@ -7,6 +7,9 @@ from pathlib import Path
 from collections import defaultdict
 from datetime import datetime
 
+import perf
+from pair_features import FEATURES_DIR, PairFeatures
+
 # Input files
 VALIDATION_TIERS = Path("crosswalk/validation_tiers.json")
 ONET_MATCHES = Path("crosswalk/onet_task_matches.json")
@@ -15,16 +18,17 @@ BLS_MATRIX = Path("data/enhanced/bls_naics_soc_matrix.json")
 BRICK_SYSTEMS = Path("data/enhanced/brick_systems.json")
 SYNONYMS = Path("data/enhanced/wordnet_expansions.json")
 UK_US_SYNONYMS = Path("data/ukus_synonyms.json")
+FEATURES = FEATURES_DIR
 
 # Output
 OUTPUT = Path("crosswalk/final_crosswalk.json")
 
 def load_json(path):
     if path.exists():
-        with open(path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return perf.load_json(path)
     return None
 
+@perf.staged('final_merge')
 def main():
     print("=" * 60)
     print("FINAL MERGE - ALL EVIDENCE SOURCES")
@@ -104,12 +108,22 @@ def main():
 
     print(f"  O*NET evidence added to {onet_additions} mappings")
 
+    # BLS / Brick flags come from the pair-feature columns; the per-code
+    # details are only looked up for flagged pairs
+    features = PairFeatures(FEATURES)
+    pair_ids = {key: features.pair_id(*key) for key in master_mappings}
+    bls_flags = features.column('bls')
+    brick_flags = features.column('brick')
+    features.save()
+
     # Add BLS bridge evidence
     bls_additions = 0
     if bls:
-        for naics_code, data in bls.get('matrix', {}).items():
-            # Find mappings with this NAICS
-            for key, mapping in master_mappings.items():
+        matrix = bls.get('matrix', {})
+        for key, mapping in master_mappings.items():
+            if not bls_flags[pair_ids[key]]:
+                continue
+            for naics_code, data in matrix.items():
                 if naics_code in key[0]:
                     mapping['evidence'].append({
                         'source': 'bls_matrix',
@@ -126,8 +140,10 @@ def main():
     brick_additions = 0
     if brick:
         brick_to_uc = brick.get('brick_to_uniclass', {})
-        for brick_sys, uc_code in brick_to_uc.items():
-            for key, mapping in master_mappings.items():
+        for key, mapping in master_mappings.items():
+            if not brick_flags[pair_ids[key]]:
+                continue
+            for brick_sys, uc_code in brick_to_uc.items():
                 if uc_code in key[1]:
                     mapping['evidence'].append({
                         'source': 'brick_schema',
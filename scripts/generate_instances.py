@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""Generate JSON-LD instances and relationships.csv from the crosswalk.
+
+Streams crosswalk/final_crosswalk.json and combines it with the extracted
+NAICS / Uniclass nodes and the curated rows of
+instances/edges/relationships.csv, then writes (in one pass):
+
+  instances/nodes/trades/naics-<code>.jsonld    one per NAICS trade
+  instances/nodes/systems/uc-<code>.jsonld      one per Uniclass Ss system
+  instances/chunks/chunk_NNN.jsonld             the same nodes, 1000 per chunk
+  instances/edges/relationships.csv             curated + crosswalk edges
+
+Documents follow the hand-written examples and schemas/corelot-context.jsonld
+(edge terms per Uniclass table as inferred by linguistic_match).
+
+Curated data is kept: relationships.csv rows whose notes do not start
+with 'crosswalk' are never rewritten and win over crosswalk edges, and
+properties the generator does not produce (e.g. sicCorrelations) are
+carried over from existing documents. So is the name of a document
+written or edited outside the generator (CURATED_KEYS); generated
+documents take the extracted name. Documents are always rewritten with
+indent=2, so a hand-authored layout is not preserved.
+
+Incremental: instances/.manifest.json records a hash of every generated
+document's content. Only documents whose inputs changed are rewritten
+(through a thread pool); documents for nodes that dropped out of the
+crosswalk are removed. A document the manifest does not know (e.g. in a
+fresh checkout) is left alone when its content already matches. Edge
+timestamps come from the crosswalk's _meta.generated_at, so a run over
+an unchanged crosswalk leaves the tracked files as they are; generated
+node documents and chunks are gitignored. --force rewrites everything.
+
+Usage: generate_instances.py [--force] [--workers=N]
+"""
+
+import csv
+import hashlib
+import io
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+import perf
+from candidate_stream import read_field, stream_crosswalk, target_table
+from linguistic_match import infer_relationship
+
+BASE = Path(__file__).parent.parent
+EXTRACTED = BASE / "extracted"
+CROSSWALK = BASE / "crosswalk"
+INSTANCES = BASE / "instances"
+NODES = INSTANCES / "nodes"
+CHUNKS = INSTANCES / "chunks"
+RELATIONSHIPS = INSTANCES / "edges" / "relationships.csv"
+MANIFEST = INSTANCES / ".manifest.json"
+FINAL_CROSSWALK = CROSSWALK / "final_crosswalk.json"
+
+CONTEXT_REF = "../../schemas/corelot-context.jsonld"
+GENERATOR_VERSION = 1
+CHUNK_SIZE = 1000
+WORKERS = 8
+
+EDGE_FIELDS = ["source_id", "relationship", "target_id", "uniclass_table", "confidence",
+               "cardinality", "notes", "timestamp"]
+EDGE_TERMS = ["produces", "uses", "performs", "manages", "coordinates", "relatedTo", "requires"]
+GENERATED_NOTE = "crosswalk"
+TIER_CONFIDENCE = {1: "A", 2: "B", 3: "C", 4: "D"}
+
+# Properties the generator owns; anything else in an existing document is carried over
+GENERATED_KEYS = {"@context", "@id", "@type", "name", "naicsCode", "uniclassCode", "partOf",
+                  "derivedFrom", "created", "modified", *EDGE_TERMS}
+# Generated properties a hand-written or hand-edited document overrides
+CURATED_KEYS = {"name"}
+
+
+def _iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def node_path(node_id: str) -> Path:
+    """'naics:238130' -> nodes/trades/naics-238130.jsonld (uc:Ss_* -> systems/)."""
+    kind = "trades" if node_id.startswith("naics:") else "systems"
+    return NODES / kind / f"{node_id.replace(':', '-')}.jsonld"
+
+
+def load_nodes() -> dict:
+    nodes = {}
+    for name in ["naics", "uniclass_ss"]:
+        path = EXTRACTED / f"{name}.json"
+        if path.exists():
+            for n in perf.load_json(path):
+                nodes[n['id']] = n
+    return nodes
+
+
+# =============================================================================
+# EDGES
+# =============================================================================
+
+def read_relationships(path: Path = RELATIONSHIPS):
+    """(comment lines, curated rows) from relationships.csv."""
+    if not path.exists():
+        return [], []
+    with open(path, newline='') as f:
+        lines = f.read().splitlines()
+    comments = [line for line in lines[1:] if line.startswith('#')]
+    rows = csv.DictReader([lines[0]] + [line for line in lines[1:] if line and not line.startswith('#')])
+    curated = [r for r in rows if not (r.get('notes') or '').startswith(GENERATED_NOTE)]
+    return comments, curated
+
+
+def crosswalk_timestamp(path: Path = FINAL_CROSSWALK) -> str:
+    """When the crosswalk was generated (its _meta), else its mtime."""
+    generated = (read_field(path, '_meta') or {}).get('generated_at')
+    if generated:
+        return datetime.fromisoformat(generated).strftime("%Y-%m-%dT%H:%M:%SZ")
+    return _iso(path.stat().st_mtime)
+
+
+def crosswalk_edges(path: Path = FINAL_CROSSWALK) -> list:
+    """Edge rows for every crosswalk mapping, streamed."""
+    timestamp = crosswalk_timestamp(path)
+    edges = []
+    for source, m in stream_crosswalk(path):
+        target = m.get('uniclass_code', '')
+        table = target_table(target).capitalize()
+        if not source['source_id'] or not table:
+            continue
+        tier = m.get('final_tier', 4)
+        edges.append({
+            "source_id": source['source_id'],
+            "relationship": infer_relationship(source['source_id'].replace('naics:', ''), table),
+            "target_id": target,
+            "uniclass_table": table,
+            "confidence": TIER_CONFIDENCE.get(tier, "D"),
+            "cardinality": "N:M",
+            "notes": f"{GENERATED_NOTE} tier {tier} ({'+'.join(m.get('methods', []))})",
+            "timestamp": timestamp,
+        })
+    perf.count('mappings_read', len(edges))
+    return edges
+
+
+def merge_edges(curated: list, generated: list) -> list:
+    """Curated rows first (they win), then new crosswalk edges sorted."""
+    seen = {(r['source_id'], r['relationship'], r['target_id']) for r in curated}
+    extra = []
+    for r in generated:
+        key = (r['source_id'], r['relationship'], r['target_id'])
+        if key not in seen:
+            seen.add(key)
+            extra.append(r)
+    extra.sort(key=lambda r: (r['source_id'], r['relationship'], r['target_id']))
+    return curated + extra
+
+
+def render_relationships(comments: list, edges: list) -> str:
+    out = io.StringIO()
+    out.write(",".join(EDGE_FIELDS) + "\n")
+    for line in comments:
+        out.write(line + "\n")
+    writer = csv.DictWriter(out, fieldnames=EDGE_FIELDS, extrasaction='ignore', lineterminator="\n")
+    writer.writerows(edges)
+    return out.getvalue()
+
+
+# =============================================================================
+# DOCUMENTS
+# =============================================================================
+
+def build_documents(nodes: dict, edges: list, extras: dict) -> dict:
+    """node id -> JSON-LD document (without created/modified)."""
+    out_edges = defaultdict(lambda: defaultdict(set))
+    for e in edges:
+        out_edges[e['source_id']][e['relationship']].add(e['target_id'])
+
+    ids = {e['source_id'] for e in edges if e['source_id'].startswith('naics:')}
+    ids |= {i for e in edges for i in (e['source_id'], e['target_id']) if i.startswith('uc:Ss_')}
+
+    docs = {}
+    for node_id in sorted(ids):
+        node = nodes.get(node_id, {})
+        if node_id.startswith('naics:'):
+            code = node_id.split(':', 1)[1]
+            doc = {"@context": CONTEXT_REF, "@id": node_id, "@type": "Trade",
+                   "name": node.get('name', ''), "naicsCode": code}
+            url = f"https://www.census.gov/naics/?input={code}"
+        else:
+            code = node_id.split(':', 1)[1]
+            doc = {"@context": CONTEXT_REF, "@id": node_id, "@type": "WorkResult",
+                   "name": node.get('name', ''), "uniclassCode": code}
+            parent = code.rsplit('_', 1)[0]
+            if parent != code and '_' in parent:
+                doc["partOf"] = {"@id": f"uc:{parent}"}
+            url = f"https://uniclass.thenbs.com/taxon/{code}"
+        doc.update(extras.get(node_id, {}))
+        for term in EDGE_TERMS:
+            targets = out_edges[node_id].get(term)
+            if targets:
+                doc[term] = [{"@id": t} for t in sorted(targets)]
+        doc["derivedFrom"] = url
+        docs[node_id] = doc
+    return docs
+
+
+def content_hash(doc: dict) -> str:
+    payload = json.dumps([GENERATOR_VERSION, doc], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def read_extras(path: Path) -> tuple:
+    """(carried-over properties, created, content hash) from an existing document.
+
+    Only called for documents the manifest does not know or that changed
+    on disk, i.e. written or edited by hand, so CURATED_KEYS are kept too.
+    """
+    try:
+        with open(path, encoding='utf-8') as f:
+            doc = json.load(f)
+    except (OSError, ValueError):
+        return {}, None, None
+    perf.count('files_read')
+    return ({k: v for k, v in doc.items() if k not in GENERATED_KEYS or k in CURATED_KEYS},
+            doc.get('created'),
+            content_hash({k: v for k, v in doc.items() if k not in ("created", "modified")}))
+
+
+def _write(path: Path, doc: dict):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(doc, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+    os.replace(tmp, path)
+
+
+def load_manifest() -> dict:
+    if MANIFEST.exists():
+        with open(MANIFEST) as f:
+            manifest = json.load(f)
+        if manifest.get('version') == GENERATOR_VERSION:
+            return manifest
+    return {'version': GENERATOR_VERSION, 'nodes': {}, 'chunks': {}}
+
+
+@perf.staged('instances')
+def main():
+    flags = dict(a[2:].partition('=')[::2] for a in sys.argv[1:] if a.startswith('--'))
+    force = 'force' in flags
+    workers = int(flags.get('workers') or WORKERS)
+    now = _iso(time.time())
+
+    print("Loading nodes and edges...")
+    with perf.span('load'):
+        nodes = load_nodes()
+        comments, curated = read_relationships()
+        edges = merge_edges(curated, crosswalk_edges())
+    print(f"  {len(curated)} curated + {len(edges) - len(curated)} crosswalk edges")
+
+    manifest = load_manifest()
+    previous = manifest['nodes']
+
+    # Carried-over properties: from the manifest, unless the file changed on disk
+    extras, created, on_disk = {}, {}, {}
+    ids = {e['source_id'] for e in edges} | {e['target_id'] for e in edges}
+    with perf.span('extras'):
+        for node_id in ids:
+            path = node_path(node_id)
+            entry = previous.get(node_id)
+            mtime = path.stat().st_mtime_ns if path.exists() else None
+            if entry and entry.get('mtime_ns') == mtime:
+                extras[node_id], created[node_id] = entry.get('extra', {}), entry.get('created')
+            elif mtime is not None:
+                extras[node_id], created[node_id], on_disk[node_id] = read_extras(path)
+
+    with perf.span('build'):
+        docs = build_documents(nodes, edges, extras)
+
+    writes, entries = [], {}
+    for node_id, doc in docs.items():
+        h = content_hash(doc)
+        path = node_path(node_id)
+        entry = previous.get(node_id)
+        unchanged = (entry and entry['hash'] == h and path.exists()
+                     and entry.get('mtime_ns') == path.stat().st_mtime_ns)
+        full = dict(doc, created=created.get(node_id) or now)
+        if not force and unchanged:
+            entries[node_id] = entry
+            continue
+        if not force and on_disk.get(node_id) == h and created.get(node_id):
+            # Already up to date on disk (e.g. a fresh checkout): adopt it
+            entries[node_id] = {'hash': h, 'mtime_ns': path.stat().st_mtime_ns,
+                                'created': created[node_id], 'extra': extras.get(node_id, {})}
+            continue
+        if path.exists() and created.get(node_id):
+            full["modified"] = now
+        writes.append((node_id, path, full, h))
+
+    removed = [node_id for node_id in previous if node_id not in docs]
+
+    print(f"Writing {len(writes)} of {len(docs)} documents ({workers} workers)...")
+    with perf.span('write', documents=len(writes)):
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(lambda w: _write(w[1], w[2]), writes))
+        for node_id, path, full, h in writes:
+            entries[node_id] = {'hash': h, 'mtime_ns': path.stat().st_mtime_ns,
+                                'created': full['created'], 'extra': extras.get(node_id, {})}
+        for node_id in removed:
+            node_path(node_id).unlink(missing_ok=True)
+    perf.count('documents_written', len(writes))
+
+    # Chunks: bundles of CHUNK_SIZE nodes, rewritten only when a member changed
+    with perf.span('chunks'):
+        chunk_hashes, chunk_writes = {}, 0
+        ordered = sorted(docs)
+        for n, start in enumerate(range(0, len(ordered), CHUNK_SIZE), 1):
+            members = ordered[start:start + CHUNK_SIZE]
+            name = f"chunk_{n:03d}.jsonld"
+            h = hashlib.sha1("".join(entries[i]['hash'] for i in members).encode()).hexdigest()
+            chunk_hashes[name] = h
+            if force or manifest['chunks'].get(name) != h or not (CHUNKS / name).exists():
+                graph = [{k: v for k, v in dict(docs[i], created=entries[i]['created']).items()
+                          if k != "@context"} for i in members]
+                _write(CHUNKS / name, {"@context": CONTEXT_REF, "@graph": graph,
+                                       "meta": {"chunk": n, "count": len(members), "created": now}})
+                chunk_writes += 1
+        for name in manifest['chunks']:
+            if name not in chunk_hashes:
+                (CHUNKS / name).unlink(missing_ok=True)
+
+    with perf.span('relationships'):
+        text = render_relationships(comments, edges)
+        current = RELATIONSHIPS.read_text() if RELATIONSHIPS.exists() else None
+        if text != current:
+            RELATIONSHIPS.parent.mkdir(parents=True, exist_ok=True)
+            RELATIONSHIPS.write_text(text)
+
+    manifest = {'version': GENERATOR_VERSION, 'nodes': dict(sorted(entries.items())), 'chunks': chunk_hashes}
+    with open(MANIFEST, "w") as f:
+        json.dump(manifest, f, indent=1)
+
+    trades = sum(1 for i in docs if i.startswith('naics:'))
+    print(f"  {trades} trades, {len(docs) - trades} systems; "
+          f"{len(writes)} written, {len(docs) - len(writes)} unchanged, {len(removed)} removed")
+    print(f"  {chunk_writes} of {len(chunk_hashes)} chunks written")
+    print(f"  relationships.csv: {len(edges)} edges{' (unchanged)' if text == current else ''}")
+
+
+if __name__ == "__main__":
+    main()
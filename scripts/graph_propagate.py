@@ -15,6 +15,9 @@ import json
 from pathlib import Path
 from collections import defaultdict
 
+import perf
+from crosswalk_store import write_through_candidates
+
 BASE = Path(__file__).parent.parent
 EXTRACTED = BASE / "extracted"
 CANDIDATES = BASE / "candidates"
@@ -25,8 +28,7 @@ def load_candidates(pattern: str) -> dict:
     results = {}
     for path in CANDIDATES.glob(pattern):
         table = path.stem.split('_')[-1]  # Get table name
-        with open(path) as f:
-            results[table] = json.load(f)
+        results[table] = perf.load_json(path)
     return results
 
 def load_uniclass_hierarchy(table: str) -> dict:
@@ -35,8 +37,7 @@ def load_uniclass_hierarchy(table: str) -> dict:
     if not path.exists():
         return {}
 
-    with open(path) as f:
-        nodes = json.load(f)
+    nodes = perf.load_json(path)
 
     hierarchy = {}
     for node in nodes:
@@ -206,20 +207,24 @@ def propagate_schema_to_uniclass():
 def save_propagated():
     """Run all propagations and save results."""
     # Ss -> Pr propagation
-    ss_to_pr = propagate_ss_to_pr()
+    with perf.span('ss_to_pr'):
+        ss_to_pr = propagate_ss_to_pr()
     if ss_to_pr:
         outfile = CANDIDATES / "naics_to_uniclass_pr_graph.json"
         with open(outfile, 'w') as f:
             json.dump(ss_to_pr, f, indent=2)
+        write_through_candidates(outfile, ss_to_pr)
         count = sum(len(c.get('matches', [])) for c in ss_to_pr)
         print(f"Ss->Pr propagation: {len(ss_to_pr)} sources, {count} mappings")
 
     # Schema -> Uniclass propagation
-    schema_to_uc = propagate_schema_to_uniclass()
+    with perf.span('schema_to_uniclass'):
+        schema_to_uc = propagate_schema_to_uniclass()
     if schema_to_uc:
         outfile = CANDIDATES / "schema_to_uniclass_graph.json"
         with open(outfile, 'w') as f:
             json.dump(schema_to_uc, f, indent=2)
+        write_through_candidates(outfile, schema_to_uc)
         count = sum(len(c.get('matches', [])) for c in schema_to_uc)
         print(f"Schema->Uniclass propagation: {len(schema_to_uc)} sources, {count} mappings")
 
@@ -233,8 +238,12 @@ def stats():
             count = sum(len(c.get('matches', [])) for c in data)
             print(f"  {name}: {count} mappings")
 
-if __name__ == "__main__":
+@perf.staged('graph')
+def main():
     print("Running graph propagation...\n")
     save_propagated()
     print("\nGraph propagation stats:")
     stats()
+
+if __name__ == "__main__":
+    main()
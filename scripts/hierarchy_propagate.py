@@ -5,6 +5,9 @@ import json
 from pathlib import Path
 from collections import defaultdict
 
+import perf
+from crosswalk_store import write_through_candidates
+
 BASE = Path(__file__).parent.parent
 EXTRACTED = BASE / "extracted"
 CANDIDATES = BASE / "candidates"
@@ -81,17 +84,16 @@ def propagate_mappings(candidates, naics_hier, uniclass_hier):
 
     return propagated
 
+@perf.staged('hierarchy')
 def main():
     print("Loading data...")
-    with open(EXTRACTED / "naics.json") as f:
-        naics = json.load(f)
+    naics = perf.load_json(EXTRACTED / "naics.json")
 
     naics_hier = build_naics_hierarchy(naics)
     print(f"  NAICS hierarchy: {len(naics_hier)} parent nodes")
 
     for table in ['Ss', 'Pr']:
-        with open(EXTRACTED / f"uniclass_{table.lower()}.json") as f:
-            uniclass = json.load(f)
+        uniclass = perf.load_json(EXTRACTED / f"uniclass_{table.lower()}.json")
 
         uniclass_hier = build_uniclass_hierarchy(uniclass)
         print(f"  Uniclass {table} hierarchy: {len(uniclass_hier)} parent nodes")
@@ -99,16 +101,17 @@ def main():
         # Load existing candidates
         cand_file = CANDIDATES / f"naics_to_uniclass_{table.lower()}.json"
         if cand_file.exists():
-            with open(cand_file) as f:
-                candidates = json.load(f)
+            candidates = perf.load_json(cand_file)
 
-            propagated = propagate_mappings(candidates, naics_hier, uniclass_hier)
+            with perf.span('propagate', table=table):
+                propagated = propagate_mappings(candidates, naics_hier, uniclass_hier)
             print(f"  Propagated {len(propagated)} new mappings for {table}")
 
             # Save propagated
             outfile = CANDIDATES / f"naics_to_uniclass_{table.lower()}_propagated.json"
             with open(outfile, 'w') as f:
                 json.dump(propagated, f, indent=2)
+            write_through_candidates(outfile, propagated)
 
 if __name__ == "__main__":
     main()
@@ -14,6 +14,8 @@ from pathlib import Path
 from collections import defaultdict
 import statistics
 
+from candidate_stream import stream_candidates
+
 BASE = Path(__file__).parent.parent
 CANDIDATES = BASE / "candidates"
 EXTRACTED = BASE / "extracted"
@@ -90,31 +92,22 @@ def h2_embedding_overfit_test():
     # Load embedding-only high confidence
     emb_only_high = []
 
-    # Get linguistic mappings
+    # Get linguistic mappings (streamed; only A/B records are materialized)
     ling_map = set()
-    for f in CANDIDATES.glob("naics_to_uniclass_*.json"):
-        if 'embedding' in f.name or 'cooccur' in f.name or 'propagated' in f.name:
-            continue
-        with open(f) as fp:
-            for item in json.load(fp):
-                for m in item.get('matches', []):
-                    if m['confidence'] in ['A', 'B']:
-                        ling_map.add((item['source_id'], m['target_id']))
+    for source, m in stream_candidates("naics_to_uniclass_*.json", confidence=['A', 'B'],
+                                       methods=['linguistic', 'graph']):
+        ling_map.add((source['source_id'], m['target_id']))
 
     # Find embedding A that linguistic didn't find as A/B
-    for f in CANDIDATES.glob("*_embedding.json"):
-        with open(f) as fp:
-            for item in json.load(fp):
-                for m in item.get('matches', []):
-                    if m['confidence'] == 'A':
-                        key = (item['source_id'], m['target_id'])
-                        if key not in ling_map:
-                            emb_only_high.append({
-                                'source': item['source_id'],
-                                'target': m['target_id'],
-                                'target_name': m.get('target_name', ''),
-                                'score': m['score']
-                            })
+    for source, m in stream_candidates("*_embedding.json", confidence='A', methods='embedding'):
+        key = (source['source_id'], m['target_id'])
+        if key not in ling_map:
+            emb_only_high.append({
+                'source': source['source_id'],
+                'target': m['target_id'],
+                'target_name': m.get('target_name', ''),
+                'score': m['score']
+            })
 
     print(f"\nEmbedding-only A-confidence mappings: {len(emb_only_high)}")
 
@@ -1,10 +1,24 @@
 #!/usr/bin/env python3
-"""Deterministic linguistic matching between standards."""
+"""Deterministic linguistic matching between standards.
+
+Usage: linguistic_match.py [--wordnet] [--check]
+       --wordnet: also expand tokens with synonyms from
+                  data/enhanced/wordnet_table.json (exits if it has not
+                  been built: wordnet_table.py build)
+       --check:   match without writing and compare against the candidate
+                  files on disk (token lists compared as sets); exit 1 if
+                  any table differs
+"""
 
 import json
+import sys
 from pathlib import Path
 from collections import defaultdict
 
+import perf
+from crosswalk_store import write_through_candidates
+from wordnet_table import TABLE_FILE, load_table
+
 BASE = Path(__file__).parent.parent
 EXTRACTED = BASE / "extracted"
 OUTPUT = BASE / "candidates"
@@ -36,14 +50,16 @@ SYNONYMS = {
     'industrial': ['factory', 'manufacturing', 'warehouse'],
 }
 
-def expand_synonyms(tokens: set) -> set:
-    """Expand token set with synonyms."""
+def expand_synonyms(tokens: set, table=None) -> set:
+    """Expand token set with synonyms (and WordNet synonyms, given a table)."""
     expanded = set(tokens)
     for token in tokens:
         for root, syns in SYNONYMS.items():
             if token == root or token in syns:
                 expanded.add(root)
                 expanded.update(syns)
+    if table is not None:
+        expanded = table.expand_tokens(expanded)
     return expanded
 
 def jaccard(set1: set, set2: set) -> float:
@@ -54,18 +70,18 @@ def jaccard(set1: set, set2: set) -> float:
     union = len(set1 | set2)
     return intersection / union if union > 0 else 0.0
 
-def match_naics_to_uniclass(naics_nodes, uniclass_nodes, min_score=0.15):
+def match_naics_to_uniclass(naics_nodes, uniclass_nodes, min_score=0.15, table=None):
     """Find linguistic matches between NAICS and Uniclass."""
     candidates = []
 
     for n in naics_nodes:
-        n_tokens = expand_synonyms(set(n['tokens']))
+        n_tokens = expand_synonyms(set(n['tokens']), table)
         if not n_tokens:
             continue
 
         matches = []
         for u in uniclass_nodes:
-            u_tokens = expand_synonyms(set(u['tokens']))
+            u_tokens = expand_synonyms(set(u['tokens']), table)
             score = jaccard(n_tokens, u_tokens)
             if score >= min_score:
                 matches.append({
@@ -74,6 +90,8 @@ def match_naics_to_uniclass(naics_nodes, uniclass_nodes, min_score=0.15):
                     'score': round(score, 3),
                     'shared_tokens': list(n_tokens & u_tokens)
                 })
+        perf.count('pairs_scored', len(uniclass_nodes))
+        perf.count('pairs_pruned', len(uniclass_nodes) - len(matches))
 
         if matches:
             matches.sort(key=lambda x: -x['score'])
@@ -86,6 +104,12 @@ def match_naics_to_uniclass(naics_nodes, uniclass_nodes, min_score=0.15):
 
     return candidates
 
+def normalized(candidates: list) -> list:
+    """Candidates with token lists as sorted lists (they are built from sets)."""
+    return [{**c, 'source_tokens': sorted(c['source_tokens']),
+             'matches': [{**m, 'shared_tokens': sorted(m['shared_tokens'])} for m in c['matches']]}
+            for c in candidates]
+
 def infer_relationship(naics_code: str, uniclass_table: str) -> str:
     """Infer relationship type from code patterns."""
     # NAICS 236 = GCs (manages), 237 = Heavy (produces), 238 = Trades (produces)
@@ -113,25 +137,36 @@ def score_to_confidence(score: float) -> str:
         return 'C'
     return 'D'
 
+@perf.staged('linguistic')
 def main():
+    flags = dict(a[2:].partition('=')[::2] for a in sys.argv[1:] if a.startswith('--'))
+    check = 'check' in flags
     OUTPUT.mkdir(exist_ok=True)
 
     # Load extracted nodes
     print("Loading extracted nodes...")
-    with open(EXTRACTED / "naics.json") as f:
-        naics = json.load(f)
+    naics = perf.load_json(EXTRACTED / "naics.json")
 
     # Filter to construction sector only (23*)
     naics_construction = [n for n in naics if n['code'].startswith('23')]
     print(f"  NAICS construction: {len(naics_construction)}")
 
+    wordnet_table = None
+    if 'wordnet' in flags:
+        wordnet_table = load_table()
+        if wordnet_table is None:
+            sys.exit(f"No WordNet table at {TABLE_FILE.relative_to(BASE)} (run: wordnet_table.py build)")
+        print(f"  WordNet table: {len(wordnet_table)} terms")
+
+    mismatched = []
+
     for table in ['Ss', 'Pr', 'Ac', 'En', 'Co']:
-        with open(EXTRACTED / f"uniclass_{table.lower()}.json") as f:
-            uniclass = json.load(f)
+        uniclass = perf.load_json(EXTRACTED / f"uniclass_{table.lower()}.json")
         print(f"  Uniclass {table}: {len(uniclass)}")
 
         print(f"\nMatching NAICS -> Uniclass {table}...")
-        candidates = match_naics_to_uniclass(naics_construction, uniclass)
+        with perf.span('match', table=table):
+            candidates = match_naics_to_uniclass(naics_construction, uniclass, table=wordnet_table)
         print(f"  Found {len(candidates)} NAICS codes with matches")
 
         # Enrich with relationship inference
@@ -142,10 +177,25 @@ def main():
                 m['confidence'] = score_to_confidence(m['score'])
 
         outfile = OUTPUT / f"naics_to_uniclass_{table.lower()}.json"
-        with open(outfile, 'w') as f:
-            json.dump(candidates, f, indent=2)
+        if check:
+            with open(outfile) as f:
+                same = normalized(json.load(f)) == normalized(candidates)
+            print(f"  {outfile.name}: {'unchanged' if same else 'DIFFERS'}")
+            if not same:
+                mismatched.append(outfile.name)
+            continue
+        with perf.span('save', table=table):
+            with open(outfile, 'w') as f:
+                json.dump(candidates, f, indent=2)
+            write_through_candidates(outfile, candidates)
         print(f"  Saved to {outfile.name}")
 
+    if check:
+        if mismatched:
+            sys.exit(f"\nCandidate files differ: {', '.join(mismatched)}")
+        print("\nAll candidate files match")
+        return
+
     # Summary stats
     print("\n=== CANDIDATE SUMMARY ===")
     total_candidates = 0
@@ -156,6 +206,7 @@ def main():
         total_candidates += count
         print(f"  NAICS -> Uniclass {table}: {count} candidate mappings")
     print(f"  TOTAL: {total_candidates}")
+    perf.count('candidates_kept', total_candidates)
 
 if __name__ == "__main__":
     main()
@@ -7,6 +7,8 @@ import json
 from pathlib import Path
 from collections import defaultdict
 
+import perf
+
 SEED_SCOPES = Path("data/seed_scopes.json")
 OUTPUT = Path("crosswalk/scope_mappings.json")
 
@@ -101,10 +103,10 @@ def extract_products_from_task(task_text):
 def map_scopes():
     """Map all seed scopes to ontology"""
 
-    with open(SEED_SCOPES, 'r') as f:
-        data = json.load(f)
+    data = perf.load_json(SEED_SCOPES)
 
     scopes = data['scopes']
+    perf.count('scopes_read', len(scopes))
 
     # Group by trade
     by_trade = defaultdict(list)
@@ -186,8 +188,9 @@ def map_scopes():
         results["trade_mappings"].append(mapping)
 
     # Save
-    with open(OUTPUT, 'w') as f:
-        json.dump(results, f, indent=2)
+    with perf.span('save'):
+        with open(OUTPUT, 'w') as f:
+            json.dump(results, f, indent=2)
 
     return results
 
@@ -230,6 +233,11 @@ def print_summary(results):
 
     print(f"\nSaved to: {OUTPUT}")
 
-if __name__ == "__main__":
-    results = map_scopes()
+@perf.staged('map_scopes')
+def main():
+    with perf.span('map'):
+        results = map_scopes()
     print_summary(results)
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,8 @@ import json
 from pathlib import Path
 from collections import defaultdict
 
+import perf
+
 VALIDATION_TIERS = Path("crosswalk/validation_tiers.json")
 ONET_MATCHES = Path("crosswalk/onet_task_matches.json")
 OUTPUT = Path("crosswalk/enhanced_mappings.json")
@@ -40,6 +42,7 @@ def load_onet_by_naics():
 
     return naics_to_systems
 
+@perf.staged('merge_evidence')
 def main():
     print("Loading existing validation tiers...")
     with open(VALIDATION_TIERS, 'r') as f:
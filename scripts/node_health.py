@@ -39,6 +39,10 @@ def load_all_candidates() -> dict:
             method = 'cooccurrence'
         elif 'embedding' in path.name:
             method = 'embedding'
+        elif 'trigram' in path.name:
+            method = 'trigram'
+        elif 'bm25' in path.name:
+            method = 'bm25'
         elif 'graph' in path.name:
             method = 'graph_propagation'
         else:
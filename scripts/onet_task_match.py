@@ -10,6 +10,8 @@ import re
 from pathlib import Path
 from collections import defaultdict
 
+import perf
+
 # Paths
 ONET_DIR = Path("data/onet/db_30_1_text")
 UNICLASS_SS = Path("data/uniclass_ss.csv")
@@ -98,18 +100,22 @@ def create_soc_to_naics_map():
         "47-2061.00": "238910",  # Construction Laborers -> Site Preparation
     }
 
+@perf.staged('onet')
 def main():
     print("Loading O*NET construction occupations...")
     occupations = load_onet_occupations()
     print(f"  Found {len(occupations)} construction occupations")
 
     print("Loading task statements...")
-    occupations = load_onet_tasks(occupations)
+    with perf.span('load_tasks'):
+        occupations = load_onet_tasks(occupations)
     total_tasks = sum(len(o["tasks"]) for o in occupations.values())
     print(f"  Loaded {total_tasks} task statements")
 
     print("Matching tasks to Uniclass systems...")
-    matches = match_tasks_to_systems(occupations)
+    with perf.span('match'):
+        matches = match_tasks_to_systems(occupations)
+    perf.count('pairs_scored', len(occupations) * len(SYSTEM_KEYWORDS))
 
     # Build output
     soc_to_naics = create_soc_to_naics_map()
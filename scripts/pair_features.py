@@ -0,0 +1,439 @@
+#!/usr/bin/env python3
+"""Columnar pair-feature cache shared by the scoring and tiering stages.
+
+Every (source, target) pair any method has produced gets a stable
+integer pair id (its row), and each feature is one column file under
+crosswalk/pair_features/, so a stage reads only the columns it needs:
+
+  score.<method>   best score the method gave the pair (NaN = no match)
+  conf.<method>    best confidence, 1-4 for A-D (0 = no match)
+  rel.<method>     relationship label the method assigned
+  jaccard          token-set Jaccard of the two names
+  depth_gap        |source depth - target depth|, both scaled to 0..1
+  bls              source NAICS code has BLS occupation-matrix evidence
+  brick            target Uniclass code falls under a Brick-aligned system
+  tier             validation tier written by export_ground_truth (0 = none)
+  ensemble         pair probability written by ensemble_score
+
+Method columns come from candidates/*.json (method from the file name)
+and from onet_task_matches.json (method 'onet', score only). sync()
+rebuilds a method's columns only when that method's files changed, so
+adding an evidence method adds one column set and leaves the others and
+every downstream join alone. Derived columns (jaccard ... brick) are
+computed on first read, extended only over pairs appended since, and
+recomputed when one of their input files changes.
+
+Pair ids are append-only; pairs whose method files disappear keep their
+row with empty method columns. Delete the directory to compact it.
+
+Columns are raw array dumps in native byte order next to a JSON manifest
+(node ids, row count, labels, per-column input signatures). A cache
+written with the other byte order or an older layout is discarded.
+
+Usage: pair_features.py [sync | stats]
+"""
+
+import json
+import os
+import sys
+from array import array
+from pathlib import Path
+
+import perf
+from candidate_stream import CANDIDATES, file_method, stream_file
+
+BASE = Path(__file__).parent.parent
+EXTRACTED = BASE / "extracted"
+CROSSWALK = BASE / "crosswalk"
+FEATURES_DIR = CROSSWALK / "pair_features"
+ONET_MATCHES = CROSSWALK / "onet_task_matches.json"
+BLS_MATRIX = BASE / "data" / "enhanced" / "bls_naics_soc_matrix.json"
+BRICK_SYSTEMS = BASE / "data" / "enhanced" / "brick_systems.json"
+
+LAYOUT_VERSION = 1
+MISSING = float('nan')
+CONF_LETTERS = ' ABCD'      # conf.<method> value -> letter (0 = no match)
+UNICLASS_TABLES = ['ss', 'pr', 'ac', 'en', 'co']
+FLAG_COLUMNS = {'bls', 'brick', 'tier'}
+
+
+def _typecode(name: str) -> str:
+    if name.startswith('conf.') or name in FLAG_COLUMNS:
+        return 'B'
+    if name.startswith('rel.'):
+        return 'H'
+    return 'd'
+
+
+def _empty(typecode: str, n: int) -> array:
+    """Column of n missing values (NaN for floats, 0 otherwise)."""
+    if typecode == 'd':
+        return array('d', [MISSING]) * n
+    return array(typecode, bytes(array(typecode).itemsize * n))
+
+
+def file_signature(paths) -> list:
+    """[[name, size, mtime_ns]] for the paths that exist."""
+    signature = []
+    for path in sorted(Path(p) for p in paths):
+        if path.exists():
+            st = path.stat()
+            signature.append([path.name, st.st_size, st.st_mtime_ns])
+    return signature
+
+
+class PairFeatures:
+    """Pair ids plus lazily loaded feature columns for one cache directory."""
+
+    def __init__(self, directory: Path = FEATURES_DIR):
+        self.directory = Path(directory)
+        self.nodes = []             # node index -> node id
+        self.labels = ['']          # label code -> text (0 = none)
+        self.source = array('I')    # pair id -> source node index
+        self.target = array('I')    # pair id -> target node index
+        self.meta = {}              # column name -> {'signature': ...}
+        self.columns = {}           # column name -> loaded array
+        self.dirty = set()
+        self.appended = False
+
+        manifest = self._read_manifest()
+        if manifest:
+            self.nodes = manifest['nodes']
+            self.labels = manifest['labels']
+            self.meta = manifest['columns']
+            self.source = self._read_array('_source', 'I')
+            self.target = self._read_array('_target', 'I')
+        self.node_index = {n: i for i, n in enumerate(self.nodes)}
+        self.label_index = {l: i for i, l in enumerate(self.labels)}
+        self.ids = {pair: i for i, pair in enumerate(zip(self.source, self.target))}
+
+    def __len__(self):
+        return len(self.source)
+
+    # -- pairs ---------------------------------------------------------------
+
+    def _node(self, node_id: str) -> int:
+        index = self.node_index.get(node_id)
+        if index is None:
+            index = self.node_index[node_id] = len(self.nodes)
+            self.nodes.append(node_id)
+        return index
+
+    def find(self, source: str, target: str):
+        """Pair id of (source, target), or None if the pair is unknown."""
+        s, t = self.node_index.get(source), self.node_index.get(target)
+        if s is None or t is None:
+            return None
+        return self.ids.get((s, t))
+
+    def pair_id(self, source: str, target: str) -> int:
+        """Pair id of (source, target), appending the pair if it is new."""
+        pair = (self._node(source), self._node(target))
+        pid = self.ids.get(pair)
+        if pid is None:
+            pid = self.ids[pair] = len(self.source)
+            self.source.append(pair[0])
+            self.target.append(pair[1])
+            self.appended = True
+        return pid
+
+    def key(self, pid: int) -> tuple:
+        return self.nodes[self.source[pid]], self.nodes[self.target[pid]]
+
+    def keys(self, start: int = 0):
+        """Yield (source, target) for every pair id from start on."""
+        nodes = self.nodes
+        for s, t in zip(self.source[start:], self.target[start:]):
+            yield nodes[s], nodes[t]
+
+    def label(self, code: int) -> str:
+        return self.labels[code]
+
+    def label_code(self, text: str) -> int:
+        code = self.label_index.get(text)
+        if code is None:
+            code = self.label_index[text] = len(self.labels)
+            self.labels.append(text)
+        return code
+
+    # -- columns -------------------------------------------------------------
+
+    def methods(self) -> list:
+        """Evidence methods that currently have columns."""
+        return sorted(n[len('score.'):] for n in self.meta if n.startswith('score.'))
+
+    def signature(self, name: str):
+        return self.meta.get(name, {}).get('signature')
+
+    def column(self, name: str) -> array:
+        """Full-length column; rows it does not cover read as missing."""
+        if name in DERIVED:
+            self._refresh_derived(name)
+        col = self._load(name)
+        if len(col) < len(self):
+            col.extend(_empty(col.typecode, len(self) - len(col)))
+        return col
+
+    def write_column(self, name: str, values, signature=None):
+        """Replace a whole column (values in pair id order)."""
+        self.columns[name] = array(_typecode(name), values)
+        self.meta[name] = {'signature': signature}
+        self.dirty.add(name)
+
+    def write_values(self, name: str, values: dict, signature=None):
+        """Replace a column from {pair id: value}; other rows become missing."""
+        col = _empty(_typecode(name), len(self))
+        for pid, value in values.items():
+            col[pid] = value
+        self.write_column(name, col, signature)
+
+    def drop_column(self, name: str):
+        self.meta.pop(name, None)
+        self.columns.pop(name, None)
+        self.dirty.add(name)
+
+    def _load(self, name: str) -> array:
+        if name not in self.columns:
+            self.columns[name] = (self._read_array(name, _typecode(name)) if name in self.meta
+                                  else array(_typecode(name)))
+        return self.columns[name]
+
+    def _refresh_derived(self, name: str):
+        inputs, compute = DERIVED[name]
+        signature = file_signature(inputs())
+        col = self._load(name)
+        start = len(col) if self.signature(name) == signature else 0
+        if start >= len(self) and name in self.meta:
+            return
+        with perf.span('derive', column=name):
+            values = compute(self, start)
+        col = col[:start]
+        col.extend(array(col.typecode, values))
+        self.write_column(name, col, signature)
+        perf.count(f'derived_{name}', len(values))
+
+    # -- files ---------------------------------------------------------------
+
+    def _path(self, name: str) -> Path:
+        return self.directory / f"{name}.bin"
+
+    def _read_manifest(self):
+        path = self.directory / "manifest.json"
+        if not path.exists():
+            return None
+        with open(path, encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('version') != LAYOUT_VERSION or manifest.get('byteorder') != sys.byteorder:
+            return None
+        return manifest
+
+    def _read_array(self, name: str, typecode: str) -> array:
+        col = array(typecode)
+        path = self._path(name)
+        if path.exists():
+            col.frombytes(path.read_bytes())
+        return col
+
+    def _write(self, path: Path, data: bytes):
+        tmp = path.with_suffix('.tmp')
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def save(self):
+        """Write changed columns, then the manifest (so readers never see a
+        manifest that refers to columns not yet written)."""
+        if not self.dirty and not self.appended:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if self.appended:
+            self._write(self._path('_source'), self.source.tobytes())
+            self._write(self._path('_target'), self.target.tobytes())
+        for name in self.dirty:
+            if name in self.meta:
+                self._write(self._path(name), self.columns[name].tobytes())
+            elif self._path(name).exists():
+                self._path(name).unlink()
+        manifest = {
+            'version': LAYOUT_VERSION,
+            'byteorder': sys.byteorder,
+            'rows': len(self),
+            'nodes': self.nodes,
+            'labels': self.labels,
+            'columns': self.meta,
+        }
+        self._write(self.directory / "manifest.json", json.dumps(manifest).encode('utf-8'))
+        self.dirty.clear()
+        self.appended = False
+
+
+# =============================================================================
+# METHOD COLUMNS
+# =============================================================================
+
+def method_sources(candidates: Path = CANDIDATES) -> dict:
+    """method -> input files (candidate files by name, plus 'onet')."""
+    sources = {}
+    for path in sorted(Path(candidates).glob("*.json")):
+        sources.setdefault(file_method(path), []).append(path)
+    sources['onet'] = [ONET_MATCHES]
+    return sources
+
+
+def _onet_records(path: Path):
+    """(source id, target id, score, confidence, relationship) from O*NET task matches."""
+    if not path.exists():
+        return
+    for m in perf.load_json(path).get('mappings', []):
+        naics, uniclass = m.get('naics_code', ''), m.get('uniclass_ss', '')
+        if naics and naics != 'unknown' and uniclass:
+            yield (f"naics:{naics.replace('naics:', '')}", f"uc:{uniclass.replace('uc:', '')}",
+                   float(m.get('confidence', 0) or 0), None, None)
+
+
+def _candidate_records(paths: list):
+    for path in paths:
+        for source, m in stream_file(path):
+            if source['source_id'] and m.get('target_id'):
+                yield (source['source_id'], m['target_id'], float(m.get('score', 0) or 0),
+                       m.get('confidence', 'D'), m.get('relationship', 'related_to'))
+
+
+def _conf_code(letter: str) -> int:
+    """'A'..'D' -> 1..4; anything else ranks as D."""
+    return CONF_LETTERS.index(letter) if letter in ('A', 'B', 'C', 'D') else 4
+
+
+def update_method(store: PairFeatures, method: str, paths: list):
+    """Rebuild one method's score/conf/rel columns from its input files."""
+    records = _onet_records(paths[0]) if method == 'onet' else _candidate_records(paths)
+    best = {}   # pid -> [score, conf, rel]
+    for source, target, score, confidence, relationship in records:
+        pid = store.pair_id(source, target)
+        conf = 0 if confidence is None else _conf_code(confidence)
+        entry = best.get(pid)
+        if entry is None:
+            best[pid] = [score, conf, store.label_code(relationship) if relationship else 0]
+        else:
+            entry[0] = max(entry[0], score)
+            entry[1] = min(entry[1], conf)
+    perf.count(f'pairs_{method}', len(best))
+
+    signature = file_signature(paths)
+    store.write_values(f"score.{method}", {pid: e[0] for pid, e in best.items()}, signature)
+    if method != 'onet':
+        store.write_values(f"conf.{method}", {pid: e[1] for pid, e in best.items()}, signature)
+        store.write_values(f"rel.{method}", {pid: e[2] for pid, e in best.items()}, signature)
+
+
+def sync(store: PairFeatures, candidates: Path = CANDIDATES) -> list:
+    """Rebuild the method columns whose input files changed; returns those methods."""
+    sources = method_sources(candidates)
+    changed = []
+    for method, paths in sources.items():
+        if store.signature(f"score.{method}") != file_signature(paths):
+            with perf.span('method', method=method):
+                update_method(store, method, paths)
+            changed.append(method)
+    for method in store.methods():
+        if method not in sources:
+            for prefix in ('score', 'conf', 'rel'):
+                store.drop_column(f"{prefix}.{method}")
+            changed.append(method)
+    return changed
+
+
+def open_features(directory: Path = FEATURES_DIR, candidates: Path = CANDIDATES) -> PairFeatures:
+    """Open the cache with its method columns synced to the current files."""
+    store = PairFeatures(directory)
+    with perf.span('sync_features'):
+        changed = sync(store, candidates)
+    store.save()
+    if changed:
+        print(f"  Pair features: rebuilt {', '.join(changed)} ({len(store)} pairs)")
+    return store
+
+
+# =============================================================================
+# DERIVED COLUMNS
+# =============================================================================
+
+def _depth(node_id: str) -> float:
+    """Code depth scaled to 0..1 (NAICS 2-6 digits, Uniclass 1-4 segments)."""
+    code = node_id.partition(':')[2]
+    if node_id.startswith('naics:'):
+        return (len(code) - 2) / 4
+    return (code.count('_') - 1) / 3
+
+
+def _extracted_files() -> list:
+    return [EXTRACTED / "naics.json"] + [EXTRACTED / f"uniclass_{t}.json" for t in UNICLASS_TABLES]
+
+
+def _jaccard(store: PairFeatures, start: int) -> list:
+    tokens = {}
+    for path in _extracted_files():
+        if path.exists():
+            for n in perf.load_json(path):
+                tokens[n['id']] = set(n.get('tokens', []))
+    values = []
+    for source, target in store.keys(start):
+        a, b = tokens.get(source), tokens.get(target)
+        values.append(len(a & b) / len(a | b) if a and b else 0.0)
+    return values
+
+
+def _depth_gap(store: PairFeatures, start: int) -> list:
+    return [abs(_depth(source) - _depth(target)) for source, target in store.keys(start)]
+
+
+def _bls(store: PairFeatures, start: int) -> list:
+    codes = list(perf.load_json(BLS_MATRIX).get('matrix', {})) if BLS_MATRIX.exists() else []
+    hits = {}
+    for source, _ in store.keys(start):
+        if source not in hits:
+            hits[source] = int(any(code in source for code in codes))
+    return [hits[source] for source, _ in store.keys(start)]
+
+
+def _brick(store: PairFeatures, start: int) -> list:
+    brick = perf.load_json(BRICK_SYSTEMS) if BRICK_SYSTEMS.exists() else {}
+    codes = list(brick.get('brick_to_uniclass', {}).values())
+    hits = {}
+    for _, target in store.keys(start):
+        if target not in hits:
+            hits[target] = int(any(code in target for code in codes))
+    return [hits[target] for _, target in store.keys(start)]
+
+
+# column -> (input files, compute(store, first pair id) -> values)
+DERIVED = {
+    'jaccard': (_extracted_files, _jaccard),
+    'depth_gap': (lambda: [], _depth_gap),
+    'bls': (lambda: [BLS_MATRIX], _bls),
+    'brick': (lambda: [BRICK_SYSTEMS], _brick),
+}
+
+
+def stats(store: PairFeatures):
+    print(f"Pairs: {len(store)} ({len(store.nodes)} nodes)")
+    for method in store.methods():
+        scores = store.column(f"score.{method}")
+        print(f"  {method:<14} {sum(1 for s in scores if s == s):>6} pairs")
+    for name in sorted(n for n in store.meta if '.' not in n):
+        size = store._path(name).stat().st_size if store._path(name).exists() else 0
+        print(f"  [{name}] {size / 1024:.1f} KB")
+
+
+@perf.staged('pair_features')
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 and not sys.argv[1].startswith('--') else 'stats'
+    store = open_features()
+    if command == 'sync':
+        for name in DERIVED:
+            store.column(name)
+        store.save()
+    stats(store)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""Lightweight instrumentation for pipeline stages.
+
+    import perf
+
+    with perf.stage("linguistic"):
+        data = perf.load_json(path)              # counts files_read, bytes_parsed
+        with perf.span("match", table="Ss"):
+            ...
+            perf.count("pairs_scored", n)
+
+A stage collects nested spans (wall time per call path, call counts,
+optional tracemalloc peak) and named counters, then writes
+reports/perf_<stage>.json. Outside a stage, span() and count() are
+no-ops, so library functions can be instrumented unconditionally.
+
+Command-line switches, honoured by any instrumented stage script (off
+by default, both add overhead):
+  --tracemalloc   sample the tracemalloc peak per span
+  --trace         also write reports/perf_<stage>.trace.json in Chrome
+                  trace format (chrome://tracing, Perfetto)
+
+Usage: perf.py [stage]   (summarize the saved perf reports)
+"""
+
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from pathlib import Path
+
+BASE = Path(__file__).parent.parent
+REPORTS = BASE / "reports"
+
+MEMORY = "--tracemalloc" in sys.argv
+TRACE = "--trace" in sys.argv
+
+_current = None
+
+
+class Recorder:
+    """Spans and counters for one stage run."""
+
+    def __init__(self, name: str, memory: bool = MEMORY, trace: bool = TRACE):
+        self.name = name
+        self.memory = memory
+        self.trace = trace
+        self.counters = Counter()
+        self.totals = {}    # span path -> [calls, total_s, peak_bytes]
+        self.events = []    # Chrome trace events
+        self.stack = []     # open spans: [path, peak_bytes]
+        self.origin = time.perf_counter()
+        self.started_at = datetime.now().isoformat()
+        self.wall_s = 0.0
+        self.peak_bytes = 0
+
+    @contextmanager
+    def span(self, name: str, **args):
+        path = f"{self.stack[-1][0]}/{name}" if self.stack else name
+        if self.memory:
+            # Fold the parent's peak so far in before resetting for the child
+            if self.stack:
+                self.stack[-1][1] = max(self.stack[-1][1], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        frame = [path, 0]
+        self.stack.append(frame)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.stack.pop()
+            peak = max(frame[1], tracemalloc.get_traced_memory()[1]) if self.memory else 0
+            if self.memory and self.stack:
+                self.stack[-1][1] = max(self.stack[-1][1], peak)
+
+            entry = self.totals.setdefault(path, [0, 0.0, 0])
+            entry[0] += 1
+            entry[1] += elapsed
+            entry[2] = max(entry[2], peak)
+            if self.trace:
+                self.events.append({
+                    "name": name, "ph": "X", "pid": os.getpid(), "tid": threading.get_ident(),
+                    "ts": (start - self.origin) * 1e6, "dur": elapsed * 1e6,
+                    "args": dict(args, path=path),
+                })
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] += n
+
+    def report(self) -> dict:
+        spans = [{
+            "path": path,
+            "calls": calls,
+            "total_s": round(total, 6),
+            "peak_kb": round(peak / 1024, 1) if self.memory else None,
+        } for path, (calls, total, peak) in self.totals.items()]
+        spans.sort(key=lambda s: s["path"])
+        return {
+            "stage": self.name,
+            "started_at": self.started_at,
+            "wall_s": round(self.wall_s, 6),
+            "peak_kb": round(self.peak_bytes / 1024, 1) if self.memory else None,
+            "counters": dict(sorted(self.counters.items())),
+            "spans": spans,
+        }
+
+    def chrome_trace(self) -> dict:
+        end_us = self.wall_s * 1e6
+        counters = [{"name": name, "ph": "C", "pid": os.getpid(), "ts": end_us, "args": {"value": value}}
+                    for name, value in sorted(self.counters.items())]
+        return {"traceEvents": self.events + counters, "displayTimeUnit": "ms"}
+
+
+@contextmanager
+def stage(name: str, memory: bool = MEMORY, trace: bool = TRACE, reports: Path = None):
+    """Instrument one stage run and write its perf report on exit."""
+    global _current
+    reports = reports or REPORTS
+    previous = _current
+    recorder = Recorder(name, memory, trace)
+    started_tracemalloc = memory and not tracemalloc.is_tracing()
+    if started_tracemalloc:
+        tracemalloc.start()
+    _current = recorder
+    try:
+        with recorder.span(name):
+            yield recorder
+    finally:
+        recorder.wall_s = time.perf_counter() - recorder.origin
+        if memory:
+            recorder.peak_bytes = recorder.totals[name][2]
+        if started_tracemalloc:
+            tracemalloc.stop()
+        _current = previous
+
+        reports.mkdir(exist_ok=True)
+        out = reports / f"perf_{name}.json"
+        with open(out, "w") as f:
+            json.dump(recorder.report(), f, indent=2)
+        if trace:
+            with open(reports / f"perf_{name}.trace.json", "w") as f:
+                json.dump(recorder.chrome_trace(), f)
+        print(f"[perf] {name}: {recorder.wall_s:.2f}s -> {out.relative_to(BASE) if out.is_relative_to(BASE) else out}")
+
+
+def staged(name: str):
+    """Decorator form of stage() for a script's main()."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def span(name: str, **args):
+    """Time a block under the current stage (no-op outside a stage)."""
+    return _current.span(name, **args) if _current is not None else nullcontext()
+
+
+def count(name: str, n: int = 1):
+    """Add to a named counter of the current stage (no-op outside a stage)."""
+    if _current is not None:
+        _current.counters[name] += n
+
+
+def load_json(path):
+    """json.load that counts files_read and bytes_parsed."""
+    with open(path, "rb") as f:
+        raw = f.read()
+    count("files_read")
+    count("bytes_parsed", len(raw))
+    return json.loads(raw)
+
+
+def summarize(name: str = None):
+    """Print the saved perf reports (all stages, or one)."""
+    pattern = f"perf_{name}.json" if name else "perf_*.json"
+    for path in sorted(REPORTS.glob(pattern)):
+        if path.name.endswith(".trace.json"):
+            continue
+        with open(path) as f:
+            report = json.load(f)
+        peak = f", peak {report['peak_kb'] / 1024:.1f} MB" if report.get("peak_kb") else ""
+        print(f"\n{report['stage']}: {report['wall_s']:.3f}s{peak}")
+        for s in report["spans"]:
+            depth = s["path"].count("/")
+            label = s["path"].rsplit("/", 1)[-1]
+            print(f"  {'  ' * depth}{label:<{40 - 2 * depth}} {s['calls']:>6}x {s['total_s']:>9.3f}s")
+        for key, value in report["counters"].items():
+            print(f"  # {key}: {value:,}")
+
+
+def main():
+    summarize(sys.argv[1] if len(sys.argv) > 1 else None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,626 @@
+#!/usr/bin/env python3
+"""Compiled evaluator for schema/product_rules.json.
+
+Rule conditions ("room.type IN ['bathroom', 'kitchen']",
+"sqft >= 2500 OR stories >= 2", ...) and quantity expressions
+("room.sqft / 25", "roof_area / 100") are parsed once into an AST and
+compiled to Python bytecode (one lambda per expression), so evaluating a
+rule is a single function call over a flat variable dict.
+
+Rules are indexed by the variables they reference. A plan only checks
+rules for tasks whose variables it binds, and entity-scoped rules
+(room.*, window.*, ...) run once per entity instead of once per plan.
+
+Evaluation semantics:
+- Missing variables read as None; a comparison that cannot be made
+  (None >= 2500, and None != 'slab' too) is false rather than an error,
+  so AND / OR / NOT combine real booleans: 'sqft >= 2500 OR stories >= 2'
+  holds for a plan with stories = 3 and no sqft. Arithmetic on a missing
+  operand yields None.
+- 'always' and 'default' conditions are constant true; within a task the
+  first matching rule wins and 'default' only applies when nothing else
+  matched.
+- A rule is applicable when at least one variable it references is bound.
+- A matched rule's size_rule ("bedrooms <= 3 ? PLMB-WH-001 : PLMB-WH-002")
+  picks one of its products; if it cannot be evaluated (bedrooms unbound)
+  the rule's full product list is returned.
+
+Usage: rule_engine.py [plans.json]   (evaluates a sample plan if omitted)
+"""
+
+import json
+import operator
+import re
+import sys
+import time
+from pathlib import Path
+from collections import defaultdict
+
+BASE = Path(__file__).parent.parent
+SCHEMA = BASE / "schema"
+PRODUCT_RULES = SCHEMA / "product_rules.json"
+
+# Plan keys holding lists of entities, and the prefix their fields bind to
+ENTITY_LISTS = {'rooms': 'room', 'windows': 'window', 'walls': 'wall', 'bathrooms': 'bathroom'}
+
+CONSTANT_CONDITIONS = {'always', 'default'}
+
+TOKEN_PATTERN = re.compile(r"""
+    \s*(?:
+      (?P<string>'[^']*'|"[^"]*")
+    | (?P<product>[A-Z][A-Z0-9]*(?:-[A-Z0-9]+)+)
+    | (?P<number>\d+(?:\.\d+)?)
+    | (?P<name>[A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z_][A-Za-z0-9_]*)*)
+    | (?P<op>==|!=|>=|<=|[<>+\-*/()\[\],?:])
+    )""", re.VERBOSE)
+
+KEYWORDS = {'AND', 'OR', 'NOT', 'IN'}
+COMPARISONS = {'==', '!=', '>=', '<=', '>', '<'}
+
+
+class RuleSyntaxError(ValueError):
+    pass
+
+
+def tokenize(text: str) -> list:
+    tokens = []
+    pos = 0
+    text = text.rstrip()
+    while pos < len(text):
+        match = TOKEN_PATTERN.match(text, pos)
+        if not match or match.end() == pos:
+            raise RuleSyntaxError(f"Unexpected input at {pos} in {text!r}")
+        pos = match.end()
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == 'name' and value.upper() in KEYWORDS:
+            kind, value = 'op', value.upper()
+        tokens.append((kind, value))
+    return tokens
+
+
+class _Parser:
+    """Recursive-descent parser producing tuple ASTs.
+
+    expr    := or ['?' expr ':' expr]
+    or      := and ('OR' and)*
+    and     := not ('AND' not)*
+    not     := 'NOT' not | compare
+    compare := arith [(== | != | >= | <= | > | <) arith | 'IN' list]
+    arith   := term (('+' | '-') term)*
+    term    := factor (('*' | '/') factor)*
+    factor  := number | string | product | true | false | name | '(' expr ')' | list
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.tokens = tokenize(text)
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def accept(self, value):
+        if self.peek()[1] == value and self.peek()[0] == 'op':
+            self.pos += 1
+            return True
+        return False
+
+    def expect(self, value):
+        if not self.accept(value):
+            raise RuleSyntaxError(f"Expected {value!r} in {self.text!r}")
+
+    def parse(self, allow_unit: bool = False):
+        node = self.expr()
+        unit = None
+        if allow_unit and self.peek()[0] == 'name' and self.pos == len(self.tokens) - 1:
+            # Trailing unit label, e.g. "sqft * 25 BTU"
+            unit = self.tokens[self.pos][1]
+            self.pos += 1
+        if self.pos != len(self.tokens):
+            raise RuleSyntaxError(f"Unexpected {self.peek()[1]!r} in {self.text!r}")
+        return node, unit
+
+    def expr(self):
+        node = self.or_()
+        if self.accept('?'):
+            then = self.expr()
+            self.expect(':')
+            return ('if', node, then, self.expr())
+        return node
+
+    def or_(self):
+        node = self.and_()
+        while self.accept('OR'):
+            node = ('or', node, self.and_())
+        return node
+
+    def and_(self):
+        node = self.not_()
+        while self.accept('AND'):
+            node = ('and', node, self.not_())
+        return node
+
+    def not_(self):
+        if self.accept('NOT'):
+            return ('not', self.not_())
+        return self.compare()
+
+    def compare(self):
+        node = self.arith()
+        kind, value = self.peek()
+        if kind == 'op' and value in COMPARISONS:
+            self.pos += 1
+            return ('cmp', value, node, self.arith())
+        if self.accept('IN'):
+            return ('in', node, self.factor())
+        return node
+
+    def arith(self):
+        node = self.term()
+        while self.peek() in (('op', '+'), ('op', '-')):
+            op = self.tokens[self.pos][1]
+            self.pos += 1
+            node = ('arith', op, node, self.term())
+        return node
+
+    def term(self):
+        node = self.factor()
+        while self.peek() in (('op', '*'), ('op', '/')):
+            op = self.tokens[self.pos][1]
+            self.pos += 1
+            node = ('arith', op, node, self.factor())
+        return node
+
+    def factor(self):
+        kind, value = self.peek()
+        if kind is None:
+            raise RuleSyntaxError(f"Unexpected end of {self.text!r}")
+        self.pos += 1
+        if kind == 'number':
+            return ('const', float(value) if '.' in value else int(value))
+        if kind == 'string':
+            return ('const', value[1:-1])
+        if kind == 'product':
+            return ('const', value)
+        if kind == 'name':
+            if value in ('true', 'false'):
+                return ('const', value == 'true')
+            return ('var', value)
+        if value == '(':
+            node = self.expr()
+            self.expect(')')
+            return node
+        if value == '[':
+            items = []
+            if not self.accept(']'):
+                while True:
+                    item = self.factor()
+                    if item[0] != 'const':
+                        raise RuleSyntaxError(f"List items must be literals in {self.text!r}")
+                    items.append(item[1])
+                    if self.accept(']'):
+                        break
+                    self.expect(',')
+            return ('list', tuple(items))
+        raise RuleSyntaxError(f"Unexpected {value!r} in {self.text!r}")
+
+
+_OPERATORS = {'==': operator.eq, '!=': operator.ne, '>=': operator.ge, '<=': operator.le,
+              '>': operator.gt, '<': operator.lt,
+              '+': operator.add, '-': operator.sub, '*': operator.mul, '/': operator.truediv}
+
+
+def _cmp(op: str, a, b) -> bool:
+    """A comparison that cannot be made (missing operand, mixed types) is false."""
+    if a is None or b is None:
+        return False
+    try:
+        return bool(_OPERATORS[op](a, b))
+    except TypeError:
+        return False
+
+
+def _arith(op: str, a, b):
+    """Arithmetic on a missing operand (or dividing by zero) yields None."""
+    if a is None or b is None:
+        return None
+    try:
+        return _OPERATORS[op](a, b)
+    except (TypeError, ZeroDivisionError):
+        return None
+
+
+def _codegen(node, variables: set) -> str:
+    """Translate an AST into a Python expression over the dict `v`."""
+    kind = node[0]
+    if kind == 'const':
+        return repr(node[1])
+    if kind == 'var':
+        variables.add(node[1])
+        return f"v.get({node[1]!r})"
+    if kind == 'list':
+        # A set display used as an `in` operand compiles to a frozenset constant
+        return '{' + ', '.join(repr(i) for i in node[1]) + '}' if node[1] else '()'
+    if kind == 'not':
+        return f"(not {_codegen(node[1], variables)})"
+    if kind in ('and', 'or'):
+        return f"({_codegen(node[1], variables)} {kind} {_codegen(node[2], variables)})"
+    if kind == 'cmp':
+        return f"_cmp({node[1]!r}, {_codegen(node[2], variables)}, {_codegen(node[3], variables)})"
+    if kind == 'in':
+        return f"({_codegen(node[1], variables)} in {_codegen(node[2], variables)})"
+    if kind == 'arith':
+        return f"_arith({node[1]!r}, {_codegen(node[2], variables)}, {_codegen(node[3], variables)})"
+    if kind == 'if':
+        cond, then, other = (_codegen(n, variables) for n in node[1:])
+        return f"({then} if {cond} else {other})"
+    raise RuleSyntaxError(f"Unknown node {kind}")
+
+
+class CompiledExpr:
+    """A parsed and compiled rule expression.
+
+    Calling it with a flat variable dict returns the expression value, or
+    `default` when the expression cannot be evaluated (missing operands).
+    """
+
+    __slots__ = ('source', 'variables', 'unit', 'constant', '_fn', '_default')
+
+    def __init__(self, source: str, allow_unit: bool = False, default=None):
+        self.source = source
+        self.unit = None
+        self._default = default
+        if source.strip() in CONSTANT_CONDITIONS:
+            self.variables = frozenset()
+            self.constant = source.strip()
+            self._fn = lambda v: True
+            return
+        self.constant = None
+        ast, self.unit = _Parser(source).parse(allow_unit)
+        variables = set()
+        code = _codegen(ast, variables)
+        self.variables = frozenset(variables)
+        self._fn = eval(compile(f"lambda v: {code}", f"<rule {source!r}>", 'eval'),
+                        {'__builtins__': {}, '_cmp': _cmp, '_arith': _arith})
+
+    def __call__(self, v: dict):
+        try:
+            return self._fn(v)
+        except (TypeError, ZeroDivisionError):
+            return self._default
+
+    def __repr__(self):
+        return f"CompiledExpr({self.source!r})"
+
+
+def compile_condition(text: str) -> CompiledExpr:
+    return CompiledExpr(text, default=False)
+
+
+def compile_expression(text: str) -> CompiledExpr:
+    return CompiledExpr(text, allow_unit=True, default=None)
+
+
+def scope_of(variables) -> str:
+    """Entity prefix an expression iterates over ('room', 'window', ...) or ''."""
+    prefixes = {name.split('.', 1)[0] for name in variables if '.' in name}
+    entities = prefixes & set(ENTITY_LISTS.values())
+    return sorted(entities)[0] if entities else ''
+
+
+# ----------------------------------------------------------------------
+# Rule book
+# ----------------------------------------------------------------------
+
+class QuantityRule:
+    """Compiled quantity_rule: source/fallback expressions and waste factors."""
+
+    def __init__(self, spec: dict):
+        self.method = spec.get('method', '')
+        self.source = self._compile(spec.get('source'))
+        fallback = spec.get('fallback')
+        if isinstance(fallback, dict):
+            self.fallback = {k: self._compile(e) for k, e in fallback.items()}
+        else:
+            self.fallback = self._compile(fallback)
+        self.waste_factor = spec.get('waste_factor', 1)
+        self.per_room = spec.get('per_room')
+        exprs = [e for e in [self.source, self.fallback] if isinstance(e, CompiledExpr)]
+        if isinstance(self.fallback, dict):
+            exprs.extend(self.fallback.values())
+        self.variables = frozenset().union(*(e.variables for e in exprs)) if exprs else frozenset()
+
+    @staticmethod
+    def _compile(text):
+        if not isinstance(text, str):
+            return None
+        try:
+            return compile_expression(text)
+        except RuleSyntaxError:
+            # Free-text sources ("24 inches OC") are documentation, not formulas
+            return None
+
+    def _waste(self, v: dict) -> float:
+        if isinstance(self.waste_factor, dict):
+            return self.waste_factor.get(v.get('room.flooring_selection'), 1)
+        return self.waste_factor
+
+    def _eval(self, expr, plan_vars: dict, entities: dict):
+        """Evaluate once per plan, or summed over entities for scoped expressions."""
+        scope = scope_of(expr.variables)
+        if not scope:
+            value = expr(plan_vars)
+            return None if value is None else value * self._waste(plan_vars)
+        total, found = 0, False
+        for v in entities.get(scope, []):
+            value = expr(v)
+            if value is not None:
+                total += value * self._waste(v)
+                found = True
+        return total if found else None
+
+    def evaluate(self, plan_vars: dict, entities: dict):
+        if self.per_room is not None:
+            return sum(self.per_room.get(v.get('room.type'), 0) for v in entities.get('room', []))
+        if self.method == 'room_sqft':
+            return sum((v.get('room.sqft') or 0) * self._waste(v) for v in entities.get('room', []))
+        if self.source is not None:
+            value = self._eval(self.source, plan_vars, entities)
+            if value is not None:
+                return round(value, 3)
+        if isinstance(self.fallback, dict):
+            values = {k: self._eval(e, plan_vars, entities) for k, e in self.fallback.items() if e}
+            return {k: round(val, 3) for k, val in values.items() if val is not None} or None
+        if self.fallback is not None:
+            value = self._eval(self.fallback, plan_vars, entities)
+            return None if value is None else round(value, 3)
+        return None
+
+
+class TaskRules:
+    """All compiled rules for one scope task."""
+
+    def __init__(self, trade: str, task: str, spec: dict):
+        self.trade = trade
+        self.task = task
+        self.products = spec.get('products', [])
+        include = spec.get('conditional_include')
+        self.include = compile_condition(include) if include else None
+        self.rules = []
+        self.default_rule = None
+        self.size_rules = {}    # id(rule) -> compiled size_rule
+        for rule in spec.get('rules', []):
+            compiled = compile_condition(rule.get('condition', 'always'))
+            if 'size_rule' in rule:
+                self.size_rules[id(rule)] = compile_expression(rule['size_rule'])
+            if compiled.constant == 'default':
+                self.default_rule = rule
+            else:
+                self.rules.append((compiled, rule))
+        self.quantity_rule = QuantityRule(spec['quantity_rule']) if 'quantity_rule' in spec else None
+        self.quantity = spec.get('quantity')
+
+        variables = set()
+        for compiled, _ in self.rules:
+            variables |= compiled.variables
+        if self.include:
+            variables |= self.include.variables
+        self.variables = frozenset(variables)
+        # Selection rules run per entity when they reference one (room, window...)
+        self.scope = scope_of(variables - (self.include.variables if self.include else set()))
+
+    def select(self, v: dict):
+        """First matching rule for a variable binding, else the default rule."""
+        for compiled, rule in self.rules:
+            if compiled.variables and not any(name in v for name in compiled.variables):
+                continue
+            if compiled(v):
+                return rule
+        return self.default_rule
+
+    def rule_products(self, rule: dict, v: dict) -> list:
+        """Products a matched rule selects for a binding, applying its size_rule."""
+        size = self.size_rules.get(id(rule))
+        if size is not None and all(v.get(name) is not None for name in size.variables):
+            product = size(v)
+            if product is not None:
+                return [product]
+        return _rule_products(rule, self.products)
+
+    def evaluate(self, plan_vars: dict, entities: dict):
+        if self.include is not None and not self.include(plan_vars):
+            return None
+        result = {'trade': self.trade, 'task': self.task}
+        if self.rules or self.default_rule:
+            if self.scope:
+                selections = []
+                for i, v in enumerate(entities.get(self.scope, [])):
+                    rule = self.select(v)
+                    if rule is not None:
+                        selections.append({'index': i, 'products': self.rule_products(rule, v)})
+                result['selections'] = selections
+            else:
+                rule = self.select(plan_vars)
+                result['products'] = self.rule_products(rule, plan_vars) if rule else []
+        if self.quantity_rule is not None:
+            result['quantity'] = self.quantity_rule.evaluate(plan_vars, entities)
+        elif self.quantity is not None:
+            result['quantity'] = self.quantity
+        return result
+
+
+def _rule_products(rule: dict, task_products: list) -> list:
+    """Products a matched rule selects; rules without one ('required') select the task's."""
+    if 'product' in rule:
+        return [rule['product']]
+    if 'default' in rule:
+        return [rule['default']]
+    return list(rule.get('products', task_products))
+
+
+class RuleBook:
+    """Compiled product rules with a variable -> task index."""
+
+    def __init__(self, data: dict):
+        self.tasks = []
+        for trade, tasks in data.get('task_product_rules', {}).items():
+            if not isinstance(tasks, dict):
+                continue
+            for task, spec in tasks.items():
+                if isinstance(spec, dict):
+                    self.tasks.append(TaskRules(trade, task, spec))
+
+        self.constraints = [(rule, compile_condition(rule['condition']))
+                            for rule in data.get('constraint_rules', {}).get('rules', [])]
+
+        # Derived plan variables (sqft <- plan.total_sqft, has_basement <- ...)
+        self.derived = []
+        for group in data.get('condition_variables', {}).values():
+            if not isinstance(group, list):
+                continue
+            for var in group:
+                if var.get('source'):
+                    try:
+                        self.derived.append((var['var'], compile_expression(var['source'])))
+                    except RuleSyntaxError:
+                        pass
+
+        # Index: variable name -> task positions; unindexed tasks always run
+        self.by_variable = defaultdict(set)
+        self.always = set()
+        for i, task in enumerate(self.tasks):
+            if not task.variables:
+                self.always.add(i)
+            for name in task.variables:
+                self.by_variable[name].add(i)
+
+    @classmethod
+    def load(cls, path: Path = PRODUCT_RULES):
+        with open(path) as f:
+            return cls(json.load(f))
+
+    def bind(self, plan: dict):
+        """Flatten a plan into plan-level variables and per-entity bindings."""
+        plan_vars = {}
+        entity_lists = {}
+        for key, value in plan.items():
+            if key in ENTITY_LISTS and isinstance(value, list):
+                entity_lists[ENTITY_LISTS[key]] = value
+            elif key in ENTITY_LISTS.values() and isinstance(value, list):
+                entity_lists[key] = value
+            else:
+                _flatten(key, value, plan_vars)
+        for name, expr in self.derived:
+            if name not in plan_vars:
+                value = expr(plan_vars)
+                if value is not None:
+                    plan_vars[name] = value
+
+        entities = {}
+        for prefix, items in entity_lists.items():
+            bound = []
+            for item in items:
+                v = dict(plan_vars)
+                for k, val in item.items():
+                    _flatten(f"{prefix}.{k}", val, v)
+                bound.append(v)
+            entities[prefix] = bound
+        return plan_vars, entities
+
+    def applicable(self, plan_vars: dict, entities: dict) -> list:
+        """Task positions whose referenced variables the plan binds."""
+        names = set(plan_vars)
+        for bound in entities.values():
+            for v in bound:
+                names.update(v)
+        hits = set(self.always)
+        for name in names:
+            hits |= self.by_variable.get(name, set())
+        return sorted(hits)
+
+    def evaluate_plan(self, plan: dict) -> dict:
+        plan_vars, entities = self.bind(plan)
+        tasks = []
+        for i in self.applicable(plan_vars, entities):
+            result = self.tasks[i].evaluate(plan_vars, entities)
+            if result is not None:
+                tasks.append(result)
+
+        constraints = []
+        for rule, cond in self.constraints:
+            scope = scope_of(cond.variables)
+            bindings = entities.get(scope, []) if scope else [plan_vars]
+            hits = [i for i, v in enumerate(bindings) if cond(v)]
+            if hits:
+                constraints.append({'id': rule['id'], 'requirement': rule['requirement'],
+                                    'entities': hits if scope else None})
+        return {'tasks': tasks, 'constraints': constraints}
+
+    def evaluate_batch(self, plans: list) -> list:
+        return [self.evaluate_plan(plan) for plan in plans]
+
+
+def _flatten(prefix: str, value, out: dict):
+    if isinstance(value, dict):
+        for k, v in value.items():
+            _flatten(f"{prefix}.{k}", v, out)
+    else:
+        out[prefix] = value
+
+
+SAMPLE_PLAN = {
+    "plan": {"total_sqft": 2800, "story_count": 2, "bedroom_count": 4, "foundation_type": "basement",
+             "has_ceiling_fan_locations": True},
+    "site": {"gas_available": True, "water_table": "normal"},
+    "selection": {"hvac_type": "gas_furnace", "efficiency": "high", "water_heater": "tank_gas",
+                  "roofing": "architectural", "countertop": "quartz", "insulation_type": "blown"},
+    "roof_area": 2400,
+    "rooms": [
+        {"type": "kitchen", "ceiling_type": "flat", "sqft": 220, "flooring_selection": "tile"},
+        {"type": "living", "ceiling_type": "cathedral", "sqft": 400, "flooring_selection": "hardwood"},
+        {"type": "bathroom", "ceiling_type": "flat", "sqft": 80, "area": "wet", "flooring_selection": "tile"},
+        {"type": "garage", "ceiling_type": "flat", "sqft": 480, "attached": True},
+    ],
+}
+
+
+def main():
+    book = RuleBook.load()
+    print(f"Compiled {len(book.tasks)} task rule sets, {len(book.constraints)} constraints, "
+          f"{len(book.by_variable)} indexed variables")
+
+    if len(sys.argv) > 1:
+        with open(sys.argv[1]) as f:
+            plans = json.load(f)
+        plans = plans if isinstance(plans, list) else [plans]
+    else:
+        plans = [SAMPLE_PLAN]
+
+    start = time.perf_counter()
+    results = book.evaluate_batch(plans)
+    elapsed = time.perf_counter() - start
+    print(f"Evaluated {len(plans)} plan(s) in {elapsed * 1000:.2f} ms "
+          f"({elapsed / len(plans) * 1e6:.0f} us/plan)\n")
+
+    if len(sys.argv) > 1:
+        print(json.dumps(results, indent=2))
+        return
+
+    for task in results[0]['tasks']:
+        products = task.get('products') or [s['products'] for s in task.get('selections', [])]
+        print(f"  {task['trade']} / {task['task']}: {products} qty={task.get('quantity')}")
+    print("\nConstraints triggered:")
+    for c in results[0]['constraints']:
+        print(f"  {c['id']}: {c['requirement']}")
+
+    print("\nWater heater size rule:")
+    for bedrooms in (2, 5):
+        plan = {**SAMPLE_PLAN, 'plan': {**SAMPLE_PLAN['plan'], 'bedroom_count': bedrooms}}
+        tasks = book.evaluate_plan(plan)['tasks']
+        heater = next(t for t in tasks if t['task'] == 'Furnish & Install water heater')
+        print(f"  {bedrooms} bedrooms: {heater['products']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""Critical-path scheduling over the schedule ontology.
+
+Builds the task DAG from schema/schedule_ontology.json (task id, trade,
+predecessor links), rejects cycles, and computes earliest start, latest
+start, total float and the critical path with one topological sort.
+
+Schedules are kept live for interactive re-planning: changing one
+duration or one link only re-propagates the tasks it can affect.
+
+- Earliest starts are pushed forward to descendants in topological order
+  and stop as soon as a value does not change.
+- Latest starts are derived from each task's "tail" (longest path from
+  its start to the end of the project), which only changes for ancestors
+  of the edit. LS = project finish - tail, so a moved finish date does not
+  force a full backward pass.
+- Adding a link repairs the topological order locally (Pearce-Kelly) and
+  raises CycleError instead of corrupting the schedule.
+
+The ontology has no durations yet, so tasks use their `duration` field
+when present and DEFAULT_DURATION working days otherwise (milestones,
+gates and draws take zero days).
+
+Usage: schedule_engine.py [task_id duration]
+"""
+
+import heapq
+import json
+import sys
+import time
+from pathlib import Path
+
+BASE = Path(__file__).parent.parent
+SCHEMA_DIR = BASE / "schema"
+SCHEDULE = SCHEMA_DIR / "schedule_ontology.json"
+
+DEFAULT_DURATION = 1
+MILESTONE_DURATION = 0
+
+
+class CycleError(ValueError):
+    """Raised when predecessor links form a cycle."""
+
+    def __init__(self, cycle):
+        self.cycle = cycle
+        super().__init__("Predecessor cycle: " + " -> ".join(cycle))
+
+
+def _predecessors(task) -> list:
+    pred = task.get('predecessor')
+    if not pred:
+        return []
+    return list(pred) if isinstance(pred, list) else [pred]
+
+
+def load_tasks(path: Path = SCHEDULE) -> list:
+    """Flatten schedule_tasks into task dicts with phase, subphase and preds.
+
+    Draws are included as zero-day tasks that follow their milestone.
+    """
+    with open(path) as f:
+        sched = json.load(f)
+
+    tasks = []
+
+    def add(t, phase, subphase):
+        milestone = t.get('milestone') is True or 'gate' in t
+        tasks.append({
+            'id': t['id'],
+            'name': t.get('name', ''),
+            'trade': t.get('trade'),
+            'phase': phase,
+            'subphase': subphase,
+            'predecessors': _predecessors(t),
+            'duration': t.get('duration', MILESTONE_DURATION if milestone else DEFAULT_DURATION),
+        })
+
+    for phase, subphases in sched.get('schedule_tasks', {}).items():
+        if not isinstance(subphases, dict):
+            continue
+        if 'draws' in subphases:
+            for d in subphases['draws']:
+                tasks.append({
+                    'id': d['id'], 'name': d.get('name', ''), 'trade': None,
+                    'phase': phase, 'subphase': None,
+                    'predecessors': [d['milestone']] if d.get('milestone') else [],
+                    'duration': MILESTONE_DURATION,
+                })
+        elif 'tasks' in subphases:
+            for t in subphases['tasks']:
+                add(t, phase, None)
+        else:
+            for subphase, data in subphases.items():
+                if isinstance(data, dict):
+                    for t in data.get('tasks', []):
+                        add(t, phase, subphase)
+    return tasks
+
+
+class Schedule:
+    """Task DAG with incrementally maintained CPM values.
+
+    Tasks are addressed by id externally and by dense int index internally;
+    preds/succs are adjacency lists of indexes.
+    """
+
+    def __init__(self, tasks: list):
+        self.ids = [t['id'] for t in tasks]
+        self.index = {tid: i for i, tid in enumerate(self.ids)}
+        if len(self.index) != len(self.ids):
+            seen = set()
+            dupes = sorted({tid for tid in self.ids if tid in seen or seen.add(tid)})
+            raise ValueError(f"Duplicate task ids: {', '.join(dupes)}")
+
+        self.tasks = tasks
+        self.duration = [t.get('duration', DEFAULT_DURATION) for t in tasks]
+        self.preds = [[] for _ in tasks]
+        self.succs = [[] for _ in tasks]
+        self.dangling = []   # (task_id, unknown predecessor id)
+        for i, t in enumerate(tasks):
+            for p in t.get('predecessors', []):
+                j = self.index.get(p)
+                if j is None:
+                    self.dangling.append((t['id'], p))
+                elif j not in self.preds[i]:
+                    self.preds[i].append(j)
+                    self.succs[j].append(i)
+
+        self.order = self._topological_order()
+        self.ord = [0] * len(tasks)
+        for pos, i in enumerate(self.order):
+            self.ord[i] = pos
+        self.es = [0] * len(tasks)
+        self.tail = [0] * len(tasks)
+        self.recompute()
+
+    # -- Full passes -------------------------------------------------------
+
+    def _topological_order(self) -> list:
+        """Kahn's algorithm; raises CycleError with one offending cycle."""
+        indegree = [len(p) for p in self.preds]
+        ready = [i for i, d in enumerate(indegree) if d == 0]
+        order = []
+        while ready:
+            i = ready.pop()
+            order.append(i)
+            for s in self.succs[i]:
+                indegree[s] -= 1
+                if indegree[s] == 0:
+                    ready.append(s)
+        if len(order) < len(self.ids):
+            raise CycleError(self._find_cycle({i for i, d in enumerate(indegree) if d > 0}))
+        return order
+
+    def _find_cycle(self, nodes: set) -> list:
+        """Walk predecessors inside the unsorted remainder until one repeats."""
+        i = next(iter(nodes))
+        seen = {}
+        path = []
+        while i not in seen:
+            seen[i] = len(path)
+            path.append(i)
+            i = next(p for p in self.preds[i] if p in nodes)
+        cycle = path[seen[i]:] + [i]
+        return [self.ids[j] for j in reversed(cycle)]
+
+    def recompute(self):
+        """Forward and backward pass over the whole DAG (O(V + E))."""
+        for i in self.order:
+            self.es[i] = max((self.es[p] + self.duration[p] for p in self.preds[i]), default=0)
+        for i in reversed(self.order):
+            self.tail[i] = self.duration[i] + max((self.tail[s] for s in self.succs[i]), default=0)
+
+    # -- Incremental propagation ------------------------------------------
+
+    def _push_forward(self, starts):
+        """Re-derive earliest starts downstream of `starts` in topo order."""
+        heap = [(self.ord[i], i) for i in set(starts)]
+        heapq.heapify(heap)
+        queued = set(starts)
+        touched = 0
+        while heap:
+            _, i = heapq.heappop(heap)
+            queued.discard(i)
+            touched += 1
+            es = max((self.es[p] + self.duration[p] for p in self.preds[i]), default=0)
+            if es == self.es[i] and i not in starts:
+                continue
+            self.es[i] = es
+            for s in self.succs[i]:
+                if s not in queued:
+                    queued.add(s)
+                    heapq.heappush(heap, (self.ord[s], s))
+        return touched
+
+    def _push_backward(self, starts):
+        """Re-derive tails upstream of `starts` in reverse topo order."""
+        heap = [(-self.ord[i], i) for i in set(starts)]
+        heapq.heapify(heap)
+        queued = set(starts)
+        touched = 0
+        while heap:
+            _, i = heapq.heappop(heap)
+            queued.discard(i)
+            touched += 1
+            tail = self.duration[i] + max((self.tail[s] for s in self.succs[i]), default=0)
+            if tail == self.tail[i] and i not in starts:
+                continue
+            self.tail[i] = tail
+            for p in self.preds[i]:
+                if p not in queued:
+                    queued.add(p)
+                    heapq.heappush(heap, (-self.ord[p], p))
+        return touched
+
+    def set_duration(self, task_id: str, duration) -> int:
+        """Change one duration; returns the number of tasks re-evaluated."""
+        i = self.index[task_id]
+        if duration == self.duration[i]:
+            return 0
+        self.duration[i] = duration
+        # A task's own ES does not depend on its duration; its successors' do
+        return self._push_forward(self.succs[i]) + self._push_backward([i])
+
+    def add_link(self, pred_id: str, task_id: str) -> int:
+        """Add pred_id -> task_id; raises CycleError and leaves the DAG intact."""
+        p, i = self.index[pred_id], self.index[task_id]
+        if p in self.preds[i]:
+            return 0
+        if p == i:
+            raise CycleError([pred_id, task_id])
+        if self.ord[p] > self.ord[i]:
+            self._reorder(p, i)
+        self.preds[i].append(p)
+        self.succs[p].append(i)
+        return self._push_forward([i]) + self._push_backward([p])
+
+    def remove_link(self, pred_id: str, task_id: str) -> int:
+        """Remove pred_id -> task_id; the topological order stays valid."""
+        p, i = self.index[pred_id], self.index[task_id]
+        if p not in self.preds[i]:
+            return 0
+        self.preds[i].remove(p)
+        self.succs[p].remove(i)
+        return self._push_forward([i]) + self._push_backward([p])
+
+    def _reorder(self, p: int, i: int):
+        """Pearce-Kelly repair for a new edge p -> i with ord[p] > ord[i].
+
+        Only tasks whose positions lie between ord[i] and ord[p] can move.
+        """
+        lo, hi = self.ord[i], self.ord[p]
+
+        forward, stack = [], [i]
+        seen = {i}
+        while stack:
+            n = stack.pop()
+            forward.append(n)
+            for s in self.succs[n]:
+                if s == p:
+                    path = self._path(i, p)
+                    raise CycleError([self.ids[j] for j in path + [i]])
+                if s not in seen and self.ord[s] < hi:
+                    seen.add(s)
+                    stack.append(s)
+
+        backward, stack = [], [p]
+        seen = {p}
+        while stack:
+            n = stack.pop()
+            backward.append(n)
+            for q in self.preds[n]:
+                if q not in seen and self.ord[q] > lo:
+                    seen.add(q)
+                    stack.append(q)
+
+        # Ancestors of p keep their relative order and move ahead of i's descendants
+        backward.sort(key=self.ord.__getitem__)
+        forward.sort(key=self.ord.__getitem__)
+        slots = sorted(self.ord[n] for n in backward + forward)
+        for n, pos in zip(backward + forward, slots):
+            self.ord[n] = pos
+            self.order[pos] = n
+
+    def _path(self, start: int, goal: int) -> list:
+        """Any successor path start -> goal (used to report cycles)."""
+        parent = {start: None}
+        stack = [start]
+        while stack:
+            n = stack.pop()
+            if n == goal:
+                break
+            for s in self.succs[n]:
+                if s not in parent:
+                    parent[s] = n
+                    stack.append(s)
+        path = []
+        while goal is not None:
+            path.append(goal)
+            goal = parent[goal]
+        return path[::-1]
+
+    # -- Results -----------------------------------------------------------
+
+    @property
+    def finish(self):
+        return max((self.es[i] + self.tail[i] for i, p in enumerate(self.preds) if not p), default=0)
+
+    def float_of(self, i: int, finish=None):
+        finish = self.finish if finish is None else finish
+        return finish - self.tail[i] - self.es[i]
+
+    def task(self, task_id: str) -> dict:
+        i = self.index[task_id]
+        finish = self.finish
+        ls = finish - self.tail[i]
+        return {
+            'id': task_id,
+            'duration': self.duration[i],
+            'es': self.es[i],
+            'ef': self.es[i] + self.duration[i],
+            'ls': ls,
+            'lf': ls + self.duration[i],
+            'float': ls - self.es[i],
+        }
+
+    def critical_path(self) -> list:
+        """Longest chain of zero-float tasks from a project start to the finish."""
+        finish = self.finish
+        i = next((i for i in self.order if not self.preds[i] and self.tail[i] == finish), None)
+        path = []
+        while i is not None:
+            path.append(self.ids[i])
+            ef = self.es[i] + self.duration[i]
+            i = next((s for s in self.succs[i]
+                      if self.es[s] == ef and self.tail[s] == self.tail[i] - self.duration[i]), None)
+        return path
+
+    def critical_tasks(self) -> list:
+        finish = self.finish
+        return [self.ids[i] for i in self.order if self.float_of(i, finish) == 0]
+
+    def copy(self):
+        """Independent schedule for another build sharing this template."""
+        other = object.__new__(Schedule)
+        other.ids = self.ids
+        other.index = self.index
+        other.tasks = self.tasks
+        other.dangling = self.dangling
+        other.duration = list(self.duration)
+        other.preds = [list(p) for p in self.preds]
+        other.succs = [list(s) for s in self.succs]
+        other.order = list(self.order)
+        other.ord = list(self.ord)
+        other.es = list(self.es)
+        other.tail = list(self.tail)
+        return other
+
+
+def main():
+    print("Building schedule DAG...")
+    tasks = load_tasks()
+    start = time.perf_counter()
+    try:
+        sched = Schedule(tasks)
+    except CycleError as e:
+        print(f"  {e}")
+        sys.exit(1)
+    build_ms = (time.perf_counter() - start) * 1000
+    edges = sum(len(p) for p in sched.preds)
+    print(f"  {len(tasks)} tasks, {edges} links, built in {build_ms:.2f} ms")
+    for tid, pred in sched.dangling:
+        print(f"  WARNING: {tid} references unknown predecessor {pred}")
+
+    if len(sys.argv) > 2:
+        touched = sched.set_duration(sys.argv[1], float(sys.argv[2]))
+        print(f"  Set {sys.argv[1]} duration to {sys.argv[2]} ({touched} tasks re-evaluated)")
+
+    path = sched.critical_path()
+    print(f"\nProject finish: day {sched.finish}")
+    print(f"Critical path ({len(path)} tasks):")
+    for tid in path:
+        t = sched.tasks[sched.index[tid]]
+        info = sched.task(tid)
+        print(f"  {tid:8} ES {info['es']:>4}  {t['name'][:50]}")
+    print(f"Zero-float tasks: {len(sched.critical_tasks())}")
+
+    # Incremental edit vs full recompute on the longest chain's midpoint
+    if path:
+        mid = path[len(path) // 2]
+        trial = sched.copy()
+        start = time.perf_counter()
+        touched = trial.set_duration(mid, trial.duration[trial.index[mid]] + 5)
+        inc_us = (time.perf_counter() - start) * 1e6
+        start = time.perf_counter()
+        trial.recompute()
+        full_us = (time.perf_counter() - start) * 1e6
+        print(f"\nWhat-if: +5 days on {mid} -> finish day {trial.finish} "
+              f"({touched} tasks, {inc_us:.0f} us incremental vs {full_us:.0f} us full)")
+
+
+if __name__ == "__main__":
+    main()
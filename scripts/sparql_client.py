@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""Caching, paging SPARQL client (Wikidata by default).
+
+  client = SparqlClient()
+  result = client.query_paged(QUERY, page_size=500, max_rows=10000)
+
+- Paging: the query's own LIMIT/OFFSET is replaced by LIMIT page_size
+  OFFSET k. Pages are fetched `workers` at a time until a short page
+  comes back. Queries should ORDER BY, or the endpoint may return pages
+  from different orderings.
+- Rate limiting: request starts are spaced at least 1/rate seconds apart
+  across all worker threads. 429 and 5xx responses are retried with
+  exponential backoff, honouring Retry-After.
+- Disk cache: every page response is stored under data/sparql_cache/,
+  keyed by a hash of the whitespace-normalized query text (the endpoint
+  is not part of the key). Entries older than the TTL are refetched. If
+  the refetch fails, the stale entry is used.
+- Offline: offline=True answers from the cache only, ignoring TTL, and
+  misses raise SparqlError.
+- Stand-in endpoint: `sparql_client.py serve` serves the cached
+  responses over HTTP as a local SPARQL endpoint, so other tools (or a
+  machine without the cache) can replay a recorded run.
+
+Usage: sparql_client.py serve [port] [host]
+       sparql_client.py stats
+       sparql_client.py purge   (drop entries older than the TTL)
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+BASE = Path(__file__).parent.parent
+CACHE_DIR = BASE / "data" / "sparql_cache"
+
+WIKIDATA_ENDPOINT = "https://query.wikidata.org/sparql"
+USER_AGENT = "OntologyCrosswalk/1.0 (research project)"
+
+DEFAULT_TTL = 7 * 24 * 3600     # seconds
+DEFAULT_RATE = 2.0              # request starts per second
+DEFAULT_WORKERS = 4             # Wikidata allows 5 concurrent queries per client
+DEFAULT_PAGE_SIZE = 500
+TIMEOUT = 60
+RETRIES = 4
+BACKOFF = 2.0                   # seconds, doubled per attempt
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8890
+
+_LIMIT_OFFSET_RE = re.compile(r"\s+(?:LIMIT|OFFSET)\s+\d+\s*$", re.IGNORECASE)
+
+
+class SparqlError(RuntimeError):
+    """Query failed (after retries), or was not cached in offline mode."""
+
+
+def cache_key(query: str) -> str:
+    return hashlib.sha256(" ".join(query.split()).encode("utf-8")).hexdigest()
+
+
+def page_query(query: str, limit: int, offset: int) -> str:
+    """The query with its trailing LIMIT/OFFSET replaced."""
+    body = query.rstrip()
+    while True:
+        stripped = _LIMIT_OFFSET_RE.sub("", body)
+        if stripped == body:
+            break
+        body = stripped
+    return f"{body}\nLIMIT {limit}\nOFFSET {offset}\n"
+
+
+def bindings(result: dict) -> list:
+    return result.get("results", {}).get("bindings", []) if result else []
+
+
+class RateLimiter:
+    """Spaces request starts at least 1/rate seconds apart (thread-safe)."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.lock = threading.Lock()
+        self.next_start = 0.0
+
+    def acquire(self):
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_start)
+            self.next_start = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+class SparqlCache:
+    """One JSON file per query: {query, endpoint, fetched_at, response}."""
+
+    def __init__(self, cache_dir: Path = CACHE_DIR, ttl: float = DEFAULT_TTL):
+        self.dir = Path(cache_dir)
+        self.ttl = ttl
+
+    def path(self, query: str) -> Path:
+        return self.dir / f"{cache_key(query)}.json"
+
+    def get(self, query: str, max_age: float = None):
+        """(response, fresh) or (None, False) on a miss."""
+        path = self.path(query)
+        if not path.exists():
+            return None, False
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None, False
+        age = time.time() - entry.get("fetched_at", 0)
+        return entry["response"], age <= (self.ttl if max_age is None else max_age)
+
+    def put(self, query: str, endpoint: str, response: dict):
+        self.dir.mkdir(parents=True, exist_ok=True)
+        path = self.path(query)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"query": query, "endpoint": endpoint, "fetched_at": time.time(),
+                       "response": response}, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def entries(self):
+        for path in sorted(self.dir.glob("*.json")):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    yield path, json.load(f)
+            except (OSError, ValueError):
+                continue
+
+    def purge(self) -> int:
+        removed = 0
+        for path, entry in self.entries():
+            if time.time() - entry.get("fetched_at", 0) > self.ttl:
+                path.unlink()
+                removed += 1
+        return removed
+
+
+class SparqlClient:
+    """SPARQL over HTTP GET with caching, retries and rate limiting."""
+
+    def __init__(self, endpoint: str = WIKIDATA_ENDPOINT, cache_dir: Path = CACHE_DIR,
+                 ttl: float = DEFAULT_TTL, rate: float = DEFAULT_RATE,
+                 workers: int = DEFAULT_WORKERS, offline: bool = False, refresh: bool = False):
+        self.endpoint = endpoint
+        self.cache = SparqlCache(cache_dir, ttl)
+        self.limiter = RateLimiter(rate)
+        self.workers = workers
+        self.offline = offline
+        self.refresh = refresh
+        self.stats = {"requests": 0, "cache_hits": 0, "stale_hits": 0, "retries": 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, key: str):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def _fetch(self, query: str) -> dict:
+        url = f"{self.endpoint}?{urllib.parse.urlencode({'query': query, 'format': 'json'})}"
+        req = urllib.request.Request(url)
+        req.add_header("User-Agent", USER_AGENT)
+        req.add_header("Accept", "application/sparql-results+json, application/json")
+
+        for attempt in range(RETRIES + 1):
+            self.limiter.acquire()
+            self._count("requests")
+            try:
+                with urllib.request.urlopen(req, timeout=TIMEOUT) as response:
+                    return json.loads(response.read().decode("utf-8"))
+            except urllib.error.HTTPError as e:
+                if e.code not in RETRY_STATUS or attempt == RETRIES:
+                    raise SparqlError(f"HTTP {e.code} from {self.endpoint}") from e
+                retry_after = e.headers.get("Retry-After", "")
+                delay = float(retry_after) if retry_after.isdigit() else BACKOFF * 2 ** attempt
+            except (urllib.error.URLError, TimeoutError, ConnectionError) as e:
+                if attempt == RETRIES:
+                    raise SparqlError(f"{self.endpoint}: {e}") from e
+                delay = BACKOFF * 2 ** attempt
+            self._count("retries")
+            time.sleep(delay)
+
+    def query(self, query: str) -> dict:
+        """SPARQL JSON results for one query, from cache when fresh."""
+        cached, fresh = self.cache.get(query, max_age=float("inf") if self.offline else None)
+        if cached is not None and (fresh and not self.refresh or self.offline):
+            self._count("cache_hits")
+            return cached
+        if self.offline:
+            raise SparqlError("Query not in cache (offline mode)")
+        try:
+            response = self._fetch(query)
+        except SparqlError:
+            if cached is None:
+                raise
+            self._count("stale_hits")
+            return cached
+        self.cache.put(query, self.endpoint, response)
+        return response
+
+    def query_paged(self, query: str, page_size: int = DEFAULT_PAGE_SIZE, max_rows: int = None) -> dict:
+        """All result rows of a query, fetched LIMIT/OFFSET page by page."""
+        head, rows = None, []
+        offset = 0
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while max_rows is None or offset < max_rows:
+                offsets = [offset + i * page_size for i in range(self.workers)]
+                if max_rows is not None:
+                    offsets = [o for o in offsets if o < max_rows]
+                pages = list(pool.map(lambda o: self.query(page_query(query, page_size, o)), offsets))
+                done = False
+                for page in pages:
+                    head = head or page.get("head")
+                    page_rows = bindings(page)
+                    rows.extend(page_rows)
+                    if len(page_rows) < page_size:
+                        done = True
+                        break
+                if done:
+                    break
+                offset = offsets[-1] + page_size
+        if max_rows is not None:
+            rows = rows[:max_rows]
+        return {"head": head or {}, "results": {"bindings": rows}}
+
+
+# =============================================================================
+# LOCAL STAND-IN ENDPOINT
+# =============================================================================
+
+def make_handler(cache: SparqlCache):
+    class RecordingHandler(BaseHTTPRequestHandler):
+        """Answers GET ?query=... from cached responses, regardless of age."""
+
+        def do_GET(self):
+            params = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
+            query = params.get("query", [""])[0]
+            response, _ = cache.get(query) if query else (None, False)
+            if response is None:
+                status, payload = 404, {"error": "No recorded response for this query"}
+            else:
+                status, payload = 200, response
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/sparql-results+json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, fmt, *args):
+            pass
+
+    return RecordingHandler
+
+
+def serve_recordings(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, cache_dir: Path = CACHE_DIR):
+    cache = SparqlCache(cache_dir)
+    server = ThreadingHTTPServer((host, port), make_handler(cache))
+    print(f"Serving {sum(1 for _ in cache.entries())} recorded responses on http://{host}:{port}/sparql")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopped")
+    finally:
+        server.server_close()
+
+
+def main():
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "stats"
+    cache = SparqlCache()
+    if cmd == "serve":
+        port = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_PORT
+        host = sys.argv[3] if len(sys.argv) > 3 else DEFAULT_HOST
+        serve_recordings(host, port)
+    elif cmd == "stats":
+        entries = list(cache.entries())
+        now = time.time()
+        stale = sum(1 for _, e in entries if now - e.get("fetched_at", 0) > cache.ttl)
+        rows = sum(len(bindings(e["response"])) for _, e in entries)
+        print(f"{cache.dir}: {len(entries)} responses ({stale} stale), {rows} rows")
+    elif cmd == "purge":
+        print(f"Removed {cache.purge()} expired responses")
+    else:
+        print(f"Unknown command: {cmd}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""Typed, indexed model of schema/task_ontology.json.
+
+The JSON is a nested trades -> phases -> tasks dict. This module flattens
+it into three arrays of __slots__ records with dense integer ids:
+
+  Trade  id, name, naics, naics_name, uniclass (tuple), cost_category,
+         description, task range [task_start, task_end)
+  Phase  id, trade, name, task range
+  Task   id, trade, phase, text, type, variants
+
+Tasks of a trade are contiguous, so "tasks of these trades" is a set of
+ranges. Secondary indexes map to trade ids (NAICS code, Uniclass code,
+cost category) or task ids (task type). NAICS and Uniclass codes are
+indexed under every ancestor as well, so 'Ss_25' finds trades mapped to
+Ss_25_13 and '238' finds trades under 238130.
+
+The model round-trips through a pickle-free binary cache (string table +
+packed int records) that is reused while the JSON's size and mtime match.
+
+Usage: task_model.py [uniclass_or_naics_code] [task_type]
+"""
+
+import json
+import struct
+import sys
+import time
+from array import array
+from collections import Counter, defaultdict
+from pathlib import Path
+
+BASE = Path(__file__).parent.parent
+SCHEMA_DIR = BASE / "schema"
+TASK_ONTOLOGY = SCHEMA_DIR / "task_ontology.json"
+CACHE_FILE = SCHEMA_DIR / "task_ontology.bin"
+
+CACHE_MAGIC = b"CLTO"
+CACHE_VERSION = 1
+_HEADER = '<4sIqqIIIIqQ'
+
+
+class Trade:
+    __slots__ = ('id', 'name', 'naics', 'naics_name', 'uniclass', 'cost_category',
+                 'description', 'task_start', 'task_end')
+
+    def __init__(self, id, name, naics, naics_name, uniclass, cost_category, description,
+                 task_start=0, task_end=0):
+        self.id = id
+        self.name = name
+        self.naics = naics
+        self.naics_name = naics_name
+        self.uniclass = uniclass
+        self.cost_category = cost_category
+        self.description = description
+        self.task_start = task_start
+        self.task_end = task_end
+
+    def __repr__(self):
+        return f"Trade({self.id}, {self.name!r}, naics={self.naics})"
+
+
+class Phase:
+    __slots__ = ('id', 'trade', 'name', 'task_start', 'task_end')
+
+    def __init__(self, id, trade, name, task_start=0, task_end=0):
+        self.id = id
+        self.trade = trade
+        self.name = name
+        self.task_start = task_start
+        self.task_end = task_end
+
+    def __repr__(self):
+        return f"Phase({self.id}, {self.name!r}, trade={self.trade})"
+
+
+class Task:
+    __slots__ = ('id', 'trade', 'phase', 'text', 'type', 'variants')
+
+    def __init__(self, id, trade, phase, text, type, variants=()):
+        self.id = id
+        self.trade = trade
+        self.phase = phase
+        self.text = text
+        self.type = type
+        self.variants = variants
+
+    def __repr__(self):
+        return f"Task({self.id}, {self.text!r}, {self.type})"
+
+
+def code_prefixes(code: str) -> list:
+    """Ancestor codes including the code itself.
+
+    'Ss_25_13' -> ['Ss', 'Ss_25', 'Ss_25_13']; '238130' -> ['23', ..., '238130'].
+    """
+    if not code:
+        return []
+    if code.isdigit():
+        return [code[:n] for n in range(2, len(code) + 1)]
+    parts = code.split('_')
+    return ['_'.join(parts[:n]) for n in range(1, len(parts) + 1)]
+
+
+class TaskOntology:
+    """Flat, indexed task ontology."""
+
+    def __init__(self, trades: list, phases: list, tasks: list, meta: dict = None):
+        self.trades = trades
+        self.phases = phases
+        self.tasks = tasks
+        self.meta = meta or {}
+        self._build_indexes()
+
+    def _build_indexes(self):
+        self.trade_by_name = {t.name: t.id for t in self.trades}
+        self.by_naics = defaultdict(list)
+        self.by_uniclass = defaultdict(list)
+        self.by_cost_category = defaultdict(list)
+        self.by_type = defaultdict(list)
+        for t in self.trades:
+            for prefix in code_prefixes(t.naics):
+                self.by_naics[prefix].append(t.id)
+            seen = set()
+            for code in t.uniclass:
+                for prefix in code_prefixes(code):
+                    if prefix not in seen:
+                        seen.add(prefix)
+                        self.by_uniclass[prefix].append(t.id)
+            self.by_cost_category[t.cost_category].append(t.id)
+            # 'Hard Costs > Site Costs' is also reachable as 'Hard Costs'
+            top = t.cost_category.split(' > ')[0]
+            if top != t.cost_category:
+                self.by_cost_category[top].append(t.id)
+        for task in self.tasks:
+            self.by_type[task.type].append(task.id)
+
+    # -- Loading -------------------------------------------------------------
+
+    @classmethod
+    def from_json(cls, data: dict):
+        trades, phases, tasks = [], [], []
+        for name, tdata in data.get('trades', {}).items():
+            trade = Trade(len(trades), name, tdata.get('naics', ''), tdata.get('naics_name', ''),
+                          tuple(tdata.get('uniclass_ss', [])), tdata.get('cost_category', ''),
+                          tdata.get('description', ''), task_start=len(tasks))
+            trades.append(trade)
+            for pname, pdata in tdata.get('phases', {}).items():
+                phase = Phase(len(phases), trade.id, pname, task_start=len(tasks))
+                phases.append(phase)
+                for t in pdata.get('tasks', []):
+                    tasks.append(Task(len(tasks), trade.id, phase.id, t.get('task', ''),
+                                      t.get('type', 'standard'), tuple(t.get('variants', ()))))
+                phase.task_end = len(tasks)
+            trade.task_end = len(tasks)
+        return cls(trades, phases, tasks, data.get('_meta', {}))
+
+    @classmethod
+    def load(cls, path: Path = TASK_ONTOLOGY, cache: Path = CACHE_FILE):
+        """Load from the binary cache when it matches the JSON, else rebuild it."""
+        stat = path.stat()
+        stamp = (stat.st_size, stat.st_mtime_ns)
+        if cache is not None and cache.exists():
+            try:
+                ontology, cached_stamp = cls.read_cache(cache)
+                if cached_stamp == stamp:
+                    return ontology
+            except (ValueError, struct.error, UnicodeDecodeError):
+                pass    # stale or corrupt cache: rebuild below
+        with open(path) as f:
+            ontology = cls.from_json(json.load(f))
+        if cache is not None:
+            ontology.write_cache(cache, stamp)
+        return ontology
+
+    # -- Binary cache --------------------------------------------------------
+
+    def write_cache(self, cache: Path, stamp=(0, 0)):
+        strings = {}
+
+        def sid(s):
+            return strings.setdefault(s or '', len(strings))
+
+        ints = array('q')
+        for t in self.trades:
+            ints.extend([sid(t.name), sid(t.naics), sid(t.naics_name), sid(t.cost_category),
+                         sid(t.description), t.task_start, t.task_end, len(t.uniclass)])
+            ints.extend(sid(c) for c in t.uniclass)
+        for p in self.phases:
+            ints.extend([p.trade, sid(p.name), p.task_start, p.task_end])
+        for task in self.tasks:
+            ints.extend([task.trade, task.phase, sid(task.text), sid(task.type), len(task.variants)])
+            ints.extend(sid(v) for v in task.variants)
+        meta = sid(json.dumps(self.meta))
+
+        # String table: character lengths, then the UTF-8 of all strings joined
+        lengths = array('q', (len(s) for s in strings)).tobytes()
+        blob = ''.join(strings).encode('utf-8')
+        header = struct.pack(_HEADER, CACHE_MAGIC, CACHE_VERSION, stamp[0], stamp[1],
+                             len(self.trades), len(self.phases), len(self.tasks), meta,
+                             len(strings), len(blob))
+        tmp = cache.with_suffix('.tmp')
+        with open(tmp, 'wb') as f:
+            f.write(header)
+            f.write(lengths)
+            f.write(blob)
+            f.write(ints.tobytes())
+        tmp.replace(cache)
+
+    @classmethod
+    def read_cache(cls, cache: Path):
+        """Return (ontology, (size, mtime_ns) of the JSON it was built from)."""
+        raw = cache.read_bytes()
+        head = struct.Struct(_HEADER)
+        (magic, version, size, mtime, n_trades, n_phases, n_tasks, meta,
+         n_strings, blob_len) = head.unpack_from(raw)
+        if magic != CACHE_MAGIC or version != CACHE_VERSION:
+            raise ValueError("Not a task ontology cache")
+        offset = head.size
+        lengths = array('q')
+        lengths.frombytes(raw[offset:offset + 8 * n_strings])
+        offset += 8 * n_strings
+        text = raw[offset:offset + blob_len].decode('utf-8')
+        strings = []
+        pos = 0
+        for n in lengths:
+            strings.append(text[pos:pos + n])
+            pos += n
+        if pos != len(text):
+            raise ValueError("Corrupt string table")
+        ints = array('q')
+        ints.frombytes(raw[offset + blob_len:])
+
+        it = iter(ints.tolist())
+        trades, phases, tasks = [], [], []
+        try:
+            for i in range(n_trades):
+                name, naics, naics_name, cost, desc, start, end, n = (next(it) for _ in range(8))
+                uniclass = tuple(strings[next(it)] for _ in range(n))
+                trades.append(Trade(i, strings[name], strings[naics], strings[naics_name], uniclass,
+                                    strings[cost], strings[desc], start, end))
+            for i in range(n_phases):
+                phases.append(Phase(i, next(it), strings[next(it)], next(it), next(it)))
+            for i in range(n_tasks):
+                trade, phase, text, ttype, n = next(it), next(it), next(it), next(it), next(it)
+                variants = tuple(strings[next(it)] for _ in range(n)) if n else ()
+                tasks.append(Task(i, trade, phase, strings[text], strings[ttype], variants))
+        except StopIteration:
+            raise ValueError("Truncated record section") from None
+        if next(it, None) is not None:
+            raise ValueError("Corrupt record section")
+        return cls(trades, phases, tasks, json.loads(strings[meta])), (size, mtime)
+
+    # -- Queries -------------------------------------------------------------
+
+    def trade(self, name: str) -> Trade:
+        return self.trades[self.trade_by_name[name]]
+
+    def trade_ids(self, naics=None, uniclass=None, cost_category=None) -> list:
+        """Trade ids matching every given filter (codes match descendants)."""
+        lists = []
+        if naics:
+            lists.append(self.by_naics.get(naics, []))
+        if uniclass:
+            lists.append(self.by_uniclass.get(uniclass, []))
+        if cost_category:
+            lists.append(self.by_cost_category.get(cost_category, []))
+        if not lists:
+            return [t.id for t in self.trades]
+        lists.sort(key=len)
+        rest = [set(l) for l in lists[1:]]
+        return [t for t in lists[0] if all(t in s for s in rest)]
+
+    def find_tasks(self, naics=None, uniclass=None, cost_category=None, task_type=None) -> list:
+        """Tasks for trades matching the filters, optionally of one type.
+
+        e.g. find_tasks(uniclass='Ss_25', task_type='parameterized')
+        """
+        trade_ids = self.trade_ids(naics, uniclass, cost_category)
+        if task_type is None:
+            return [task for t in trade_ids
+                    for task in self.tasks[self.trades[t].task_start:self.trades[t].task_end]]
+        typed = self.by_type.get(task_type, [])
+        ranges = [(self.trades[t].task_start, self.trades[t].task_end) for t in trade_ids]
+        if sum(end - start for start, end in ranges) <= len(typed):
+            return [task for start, end in ranges for task in self.tasks[start:end]
+                    if task.type == task_type]
+        wanted = set(trade_ids)
+        return [self.tasks[i] for i in typed if self.tasks[i].trade in wanted]
+
+    def summary(self) -> dict:
+        types = Counter(task.type for task in self.tasks)
+        return {
+            'total_trades': len(self.trades),
+            'total_phases': len(self.phases),
+            'total_tasks': len(self.tasks),
+            'standard_tasks': types.get('standard', 0),
+            'parameterized_tasks': types.get('parameterized', 0),
+        }
+
+
+def main():
+    start = time.perf_counter()
+    ontology = TaskOntology.load()
+    load_ms = (time.perf_counter() - start) * 1000
+    summary = ontology.summary()
+    print(f"Loaded {summary['total_trades']} trades, {summary['total_phases']} phases, "
+          f"{summary['total_tasks']} tasks in {load_ms:.1f} ms")
+
+    code = sys.argv[1] if len(sys.argv) > 1 else 'Ss_25'
+    task_type = sys.argv[2] if len(sys.argv) > 2 else 'parameterized'
+    if code.isdigit():
+        tasks = ontology.find_tasks(naics=code, task_type=task_type)
+    else:
+        tasks = ontology.find_tasks(uniclass=code, task_type=task_type)
+    print(f"\n{len(tasks)} {task_type} tasks for trades mapped to {code}:")
+    for task in tasks:
+        print(f"  [{ontology.trades[task.trade].name}] {task.text}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""Precision/recall sweep over every method's confidence cut-offs.
+
+The A/B/C/D letters each matcher assigns come from hand-picked score
+cut-offs (embedding_match 0.4/0.25/0.18, linguistic_match 0.5/0.3/0.2,
+onet_task_match 0.3). This stage measures them against the labels and
+suggests replacements, per method and per Uniclass table.
+
+Method:
+1. Scores come from the pair-feature columns (score.<method>), labels
+   from ensemble_score.label_pairs: ground truth and expert-approved
+   pairs are positive, everything else negative. Recall is measured
+   against every positive pair in the table, so a method that never
+   proposes a positive loses recall for it.
+2. Each (method, table) score list is sorted once, best first. A single
+   cumulative pass over it yields precision and recall at every distinct
+   score, i.e. the whole PR curve, and in the same pass the loosest
+   cut-off meeting each letter's target precision (TARGET_PRECISION,
+   needing at least MIN_SUPPORT pairs above it) and the best-F1 cut-off.
+3. Current cut-offs are read back from the data: the lowest score that
+   got each letter (conf.<method>); methods without letters (onet)
+   report their keep threshold as C. Pairs below a method's keep
+   threshold never reach candidates/, so D cannot be lowered here.
+   Methods that give every pair the same score (hierarchy) are skipped.
+
+Ground truth is itself linguistic + embedding A/B agreement, so those
+two methods' A/B suggestions are partly self-fulfilling until more
+expert labels exist.
+
+Output: reports/threshold_sweep.json (curves and cut-offs) and
+reports/pr_curves.csv (method, table, threshold, precision, recall, f1).
+
+Usage: threshold_sweep.py [--targets=0.8,0.6,0.4] [--min-support=N]
+"""
+
+import csv
+import json
+import sys
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+
+import perf
+from candidate_stream import target_table
+from ensemble_score import label_pairs
+from pair_features import CONF_LETTERS, open_features
+
+BASE = Path(__file__).parent.parent
+REPORTS = BASE / "reports"
+OUTPUT = REPORTS / "threshold_sweep.json"
+CURVES_CSV = REPORTS / "pr_curves.csv"
+
+LETTERS = ['A', 'B', 'C']
+TARGET_PRECISION = [0.8, 0.6, 0.4]     # per letter in LETTERS
+MIN_SUPPORT = 5
+
+
+def sweep(scored: list, positives: int, targets: list, min_support: int = MIN_SUPPORT) -> dict:
+    """PR curve and suggested cut-offs for one [(score, label)] list.
+
+    The list is sorted here; everything else is one pass over it.
+    """
+    scored = sorted(scored, key=lambda x: -x[0])
+    curve, cutoffs, best = [], [None] * len(targets), None
+    tp = kept = 0
+    for i, (score, label) in enumerate(scored):
+        tp += label
+        kept += 1
+        if i + 1 < len(scored) and scored[i + 1][0] == score:
+            continue    # evaluate once per distinct score
+        precision = tp / kept
+        recall = tp / positives if positives else 0.0
+        f1 = 2 * precision * recall / (precision + recall) if tp else 0.0
+        curve.append([score, round(precision, 4), round(recall, 4), round(f1, 4)])
+        if kept >= min_support:
+            for j, target in enumerate(targets):
+                if precision >= target:
+                    cutoffs[j] = score
+        if best is None or f1 > best[3]:
+            best = curve[-1]
+    return {'curve': curve, 'cutoffs': cutoffs, 'best_f1': best}
+
+
+def at(curve: list, threshold) -> dict:
+    """Precision/recall when keeping scores >= threshold."""
+    if threshold is None:
+        return None
+    point = None
+    for p in curve:             # curve is sorted by threshold, descending
+        if p[0] < threshold:
+            break
+        point = p
+    if point is None:
+        return {'cutoff': threshold, 'precision': None, 'recall': 0.0}
+    return {'cutoff': threshold, 'precision': point[1], 'recall': point[2]}
+
+
+def current_cutoffs(scores, confs, ids: list) -> list:
+    """Lowest score that received each of A, B, C (None if unused)."""
+    lowest = {}
+    for pid in ids:
+        letter = CONF_LETTERS[confs[pid]]
+        if letter in LETTERS:
+            lowest[letter] = min(lowest.get(letter, scores[pid]), scores[pid])
+    return [lowest.get(letter) for letter in LETTERS]
+
+
+def run(targets: list, min_support: int) -> dict:
+    features = open_features()
+    with perf.span('labels'):
+        score_columns = [features.column(f"score.{m}") for m in features.methods()]
+        ids = [pid for pid in range(len(features)) if any(col[pid] == col[pid] for col in score_columns)]
+        labels = dict(zip(ids, label_pairs(features, ids)))
+        tables = {pid: target_table(features.key(pid)[1]) for pid in ids}
+        positives = defaultdict(int)
+        for pid, label in labels.items():
+            if label:
+                positives[tables[pid]] += 1
+                positives['all'] += 1
+
+    results = {}
+    for method in features.methods():
+        scores = features.column(f"score.{method}")
+        confs = features.column(f"conf.{method}") if method != 'onet' else None
+        by_table = defaultdict(list)
+        for pid in ids:
+            if scores[pid] == scores[pid]:
+                by_table[tables[pid]].append(pid)
+        by_table['all'] = [pid for group in list(by_table.values()) for pid in group]
+        if len({scores[pid] for pid in by_table['all']}) < 2:
+            print(f"{method}: one score for every pair, nothing to sweep\n")
+            continue
+
+        results[method] = {}
+        for table, members in sorted(by_table.items()):
+            with perf.span('sweep', method=method, table=table):
+                result = sweep([(scores[pid], int(labels[pid])) for pid in members],
+                               positives[table], targets, min_support)
+            if confs is None:
+                # Keep threshold only: count it as the loosest letter
+                current = [None, None, min(scores[pid] for pid in members)]
+            else:
+                current = current_cutoffs(scores, confs, members)
+            perf.count('pairs_swept', len(members))
+            results[method][table] = {
+                'pairs': len(members),
+                'positives': sum(int(labels[pid]) for pid in members),
+                'table_positives': positives[table],
+                'current': {l: at(result['curve'], c) for l, c in zip(LETTERS, current)},
+                'suggested': {l: at(result['curve'], c) for l, c in zip(LETTERS, result['cutoffs'])},
+                'best_f1': dict(zip(['cutoff', 'precision', 'recall', 'f1'], result['best_f1'] or [])),
+                'curve': result['curve'],
+            }
+    return results
+
+
+def _fmt(point) -> str:
+    if not point:
+        return f"{'-':>17}"
+    precision = '-' if point['precision'] is None else f"{point['precision']:.2f}"
+    return f"{point['cutoff']:>5.3f} P{precision:>4} R{point['recall']:.2f}"
+
+
+def save(results: dict, targets: list, min_support: int):
+    REPORTS.mkdir(exist_ok=True)
+    output = {
+        "_meta": {
+            "generated_at": datetime.now().isoformat(),
+            "description": "Per-method precision/recall curves and confidence cut-offs",
+            "target_precision": dict(zip(LETTERS, targets)),
+            "min_support": min_support,
+        },
+        "methods": results,
+    }
+    with open(OUTPUT, 'w', encoding='utf-8') as f:
+        json.dump(output, f, indent=1)
+    with open(CURVES_CSV, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['method', 'table', 'threshold', 'precision', 'recall', 'f1'])
+        for method, tables in results.items():
+            for table, r in tables.items():
+                for point in r['curve']:
+                    writer.writerow([method, table] + point)
+
+
+@perf.staged('threshold_sweep')
+def main():
+    flags = dict(a[2:].partition('=')[::2] for a in sys.argv[1:] if a.startswith('--'))
+    targets = [float(t) for t in flags['targets'].split(',')] if flags.get('targets') else TARGET_PRECISION
+    min_support = int(flags.get('min-support') or MIN_SUPPORT)
+    if len(targets) != len(LETTERS):
+        sys.exit(f"--targets needs {len(LETTERS)} values (A,B,C)")
+
+    print(f"Target precision: {', '.join(f'{l}>={t}' for l, t in zip(LETTERS, targets))}\n")
+    results = run(targets, min_support)
+    with perf.span('save'):
+        save(results, targets, min_support)
+
+    for method, tables in results.items():
+        print(f"{method}")
+        for table, r in tables.items():
+            print(f"  {table:<4} {r['pairs']:>5} pairs, {r['positives']:>4}/{r['table_positives']:<4} positives"
+                  f"   best F1 {r['best_f1'].get('f1', 0):.2f} @ {r['best_f1'].get('cutoff', 0):.3f}")
+            for letter in LETTERS:
+                print(f"       {letter}  now {_fmt(r['current'][letter])}   suggested {_fmt(r['suggested'][letter])}")
+    print(f"\nSaved to {OUTPUT.relative_to(BASE)} and {CURVES_CSV.relative_to(BASE)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,55 +4,32 @@ Confidence increases when multiple independent methods agree
 """
 
 import json
-import csv
 from pathlib import Path
 from collections import defaultdict
 
+import perf
+from candidate_stream import target_table
+from export_ground_truth import load_names
+from pair_features import open_features
+
 # Input files
-LINGUISTIC_MATCHES = Path("crosswalk/review_ss.csv")
-EMBEDDING_MATCHES = Path("crosswalk/embedding_ss.csv")
 ONET_MATCHES = Path("crosswalk/onet_task_matches.json")
-GROUND_TRUTH = Path("crosswalk/ground_truth.csv")
 EXPERT_VALIDATIONS = Path("reviewed/expert_validations.json")
 
+# Pair-feature score columns -> evidence source (linguistic/embedding on Ss only)
+EVIDENCE_COLUMNS = [
+    ('linguistic', 'score.linguistic'),
+    ('embedding', 'score.embedding'),
+    ('onet_task', 'score.onet'),
+]
+TABLE = 'ss'
+
 # Output
 OUTPUT = Path("crosswalk/triangulated_mappings.json")
 
-def load_linguistic_matches():
-    """Load linguistic (Jaccard) matches"""
-    matches = {}
-    if LINGUISTIC_MATCHES.exists():
-        with open(LINGUISTIC_MATCHES, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                key = (row.get('naics_code', ''), row.get('uniclass_code', ''))
-                if key[0] and key[1]:
-                    matches[key] = {
-                        'method': 'linguistic',
-                        'score': float(row.get('jaccard_score', 0) or 0),
-                        'naics_title': row.get('naics_title', ''),
-                        'uniclass_title': row.get('uniclass_title', '')
-                    }
-    return matches
-
-def load_embedding_matches():
-    """Load embedding (TF-IDF) matches"""
-    matches = {}
-    if EMBEDDING_MATCHES.exists():
-        with open(EMBEDDING_MATCHES, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                key = (row.get('naics_code', ''), row.get('uniclass_code', ''))
-                if key[0] and key[1]:
-                    matches[key] = {
-                        'method': 'embedding',
-                        'score': float(row.get('cosine_score', 0) or 0),
-                    }
-    return matches
-
-def load_onet_matches():
-    """Load O*NET task-based matches"""
-    matches = {}
+def load_onet_details():
+    """O*NET occupation and keywords per (naics, uniclass) pair"""
+    details = {}
     if ONET_MATCHES.exists():
         with open(ONET_MATCHES, 'r') as f:
             data = json.load(f)
@@ -60,26 +37,12 @@ def load_onet_matches():
                 naics = m.get('naics_code', '')
                 uniclass = m.get('uniclass_ss', '')
                 if naics and naics != 'unknown' and uniclass:
-                    key = (naics, uniclass)
-                    matches[key] = {
-                        'method': 'onet_task',
-                        'score': m.get('confidence', 0),
+                    key = (f"naics:{naics.replace('naics:', '')}", f"uc:{uniclass.replace('uc:', '')}")
+                    details[key] = {
                         'occupation': m.get('occupation', ''),
                         'keywords': m.get('keywords', [])
                     }
-    return matches
-
-def load_ground_truth():
-    """Load ground truth mappings (both methods agree)"""
-    matches = set()
-    if GROUND_TRUTH.exists():
-        with open(GROUND_TRUTH, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                key = (row.get('naics_code', ''), row.get('uniclass_code', ''))
-                if key[0] and key[1]:
-                    matches.add(key)
-    return matches
+    return details
 
 def load_expert_validations():
     """Load expert validation decisions"""
@@ -106,45 +69,38 @@ def triangulate():
     """Combine all evidence sources"""
     print("Loading evidence sources...")
 
-    linguistic = load_linguistic_matches()
-    print(f"  Linguistic matches: {len(linguistic)}")
+    features = open_features()
+    names = load_names()
+    columns = [(source, features.column(name)) for source, name in EVIDENCE_COLUMNS]
+    for source, col in columns:
+        print(f"  {source}: {sum(1 for v in col if v == v)} pairs")
 
-    embedding = load_embedding_matches()
-    print(f"  Embedding matches: {len(embedding)}")
+    # Ground truth = validation tier 1 from export_ground_truth
+    tier = features.column('tier')
+    print(f"  Ground truth: {sum(1 for t in tier if t == 1)}")
 
-    onet = load_onet_matches()
-    print(f"  O*NET task matches: {len(onet)}")
-
-    ground_truth = load_ground_truth()
-    print(f"  Ground truth: {len(ground_truth)}")
+    onet = load_onet_details()
 
     validated, rejected = load_expert_validations()
     print(f"  Expert validated: {len(validated)}, rejected: {len(rejected)}")
 
-    # Combine all mappings
-    all_mappings = set(linguistic.keys()) | set(embedding.keys()) | set(onet.keys())
-    print(f"\nTotal unique mappings: {len(all_mappings)}")
-
     # Score each mapping
     results = []
-    for key in all_mappings:
-        naics, uniclass = key
+    for pid, (naics, uniclass) in enumerate(features.keys()):
+        if target_table(uniclass) != TABLE:
+            continue
         evidence = []
         total_score = 0
 
-        if key in linguistic:
-            evidence.append('linguistic')
-            total_score += linguistic[key]['score']
+        for source, col in columns:
+            if col[pid] == col[pid]:
+                evidence.append(source)
+                total_score += col[pid]
 
-        if key in embedding:
-            evidence.append('embedding')
-            total_score += embedding[key]['score']
+        if not evidence:
+            continue
 
-        if key in onet:
-            evidence.append('onet_task')
-            total_score += onet[key]['score']
-
-        if key in ground_truth:
+        if tier[pid] == 1:
             evidence.append('ground_truth')
             total_score += 0.5  # Bonus for ground truth
 
@@ -153,42 +109,47 @@ def triangulate():
         avg_score = total_score / num_methods if num_methods > 0 else 0
 
         if num_methods >= 3:
-            tier = 1
+            tier_num = 1
             confidence = 'ground_truth'
         elif num_methods == 2:
-            tier = 2 if avg_score >= 0.4 else 3
+            tier_num = 2 if avg_score >= 0.4 else 3
             confidence = 'high' if avg_score >= 0.4 else 'medium'
         else:
-            tier = 3 if avg_score >= 0.5 else 4
+            tier_num = 3 if avg_score >= 0.5 else 4
             confidence = 'medium' if avg_score >= 0.5 else 'low'
 
         result = {
             'naics_code': naics,
             'uniclass_code': uniclass,
-            'naics_title': linguistic.get(key, {}).get('naics_title', ''),
-            'uniclass_title': linguistic.get(key, {}).get('uniclass_title', ''),
+            'naics_title': names.get(naics, ''),
+            'uniclass_title': names.get(uniclass, ''),
             'evidence_sources': evidence,
             'num_methods': num_methods,
             'total_score': round(total_score, 3),
             'avg_score': round(avg_score, 3),
-            'tier': tier,
+            'tier': tier_num,
             'confidence': confidence
         }
 
         # Add O*NET details if available
+        key = (naics, uniclass)
         if key in onet:
             result['onet_occupation'] = onet[key].get('occupation', '')
             result['task_keywords'] = onet[key].get('keywords', [])
 
         results.append(result)
 
+    print(f"\nTotal unique mappings: {len(results)}")
+
     # Sort by tier, then by num_methods, then by score
     results.sort(key=lambda x: (x['tier'], -x['num_methods'], -x['avg_score']))
 
     return results
 
+@perf.staged('triangulate')
 def main():
-    results = triangulate()
+    with perf.span('triangulate'):
+        results = triangulate()
 
     # Statistics
     tier_counts = defaultdict(int)
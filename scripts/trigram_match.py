@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""Character trigram matching for spelling and morphology variants.
+
+Token matchers only meet on identical tokens, so "colour"/"color",
+"storey"/"story", "plasterboard"/"plaster board" and "galvanised"/
+"galvanized" never match. This method compares names by their character
+trigrams instead (pg_trgm style: each token padded as "  token ").
+
+Method:
+1. Index the trigrams of every Uniclass name in a per-table posting list.
+   Trigrams found in more than MAX_DF of a table's names (" co", "ion",
+   ...) are kept for scoring but not indexed, so no posting list is long.
+2. For each NAICS name, count shared trigrams per Uniclass node by walking
+   the postings of its trigrams. Nodes sharing fewer than
+   max(MIN_OVERLAP, OVERLAP_RATIO x the shorter name's indexed trigram
+   count) are pruned unscored.
+3. Score survivors with an IDF-weighted Dice coefficient:
+   2 * w(shared) / (w(naics) + w(uniclass)).
+
+Work per NAICS name is bounded by its trigram count times MAX_DF of the
+table, never the full table, so the full NAICS x Uniclass Pr space stays
+well under quadratic.
+
+Usage: trigram_match.py [--all-naics]   (default: construction, NAICS 23)
+"""
+
+import json
+import math
+import sys
+from collections import Counter, defaultdict
+from pathlib import Path
+
+import perf
+from crosswalk_store import write_through_candidates
+from embedding_match import load_extracted, tokenize
+
+BASE = Path(__file__).parent.parent
+CANDIDATES = BASE / "candidates"
+
+TABLES = ['ss', 'pr', 'ac', 'en', 'co']
+MAX_DF = 0.05         # trigrams in more of a table's names than this are not indexed
+MIN_OVERLAP = 3       # shared indexed trigrams required to score a pair
+OVERLAP_RATIO = 0.4   # ... and at least this share of the shorter name's trigrams
+THRESHOLD = 0.3       # minimum weighted Dice to keep a match
+TOP_K = 5
+
+# Words that describe the NAICS business, not the work result
+GENERIC = {'contractors', 'contractor', 'construction', 'other', 'all', 'related', 'trade',
+           'specialty', 'services'}
+
+
+def trigrams(text: str) -> set:
+    """Character trigrams of the name's tokens, each padded as '  token '."""
+    grams = set()
+    for token in tokenize(text):
+        if token in GENERIC:
+            continue
+        padded = f"  {token} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TrigramIndex:
+    """Trigram posting lists and IDF weights over one table's names."""
+
+    def __init__(self, nodes: list):
+        self.nodes = nodes
+        self.grams = [trigrams(n['name']) for n in nodes]
+        df = Counter(g for grams in self.grams for g in grams)
+        n = len(nodes)
+        self.default_weight = math.log(n + 1) + 1
+        self.weight = {g: math.log((n + 1) / (c + 1)) + 1 for g, c in df.items()}
+        self.mass = [sum(self.weight[g] for g in grams) for grams in self.grams]
+
+        max_df = max(1, int(MAX_DF * n))
+        self.postings = defaultdict(list)
+        self.indexed = [0] * n    # indexed trigram count per name
+        for i, grams in enumerate(self.grams):
+            for g in grams:
+                if df[g] <= max_df:
+                    self.postings[g].append(i)
+                    self.indexed[i] += 1
+
+    def search(self, text: str, threshold: float = THRESHOLD, top_k: int = TOP_K) -> list:
+        """[(score, node)] best first, for names scoring at least threshold."""
+        query = trigrams(text)
+        if not query:
+            return []
+        overlap = Counter()
+        indexed = 0
+        for g in query:
+            postings = self.postings.get(g)
+            if postings:
+                overlap.update(postings)
+                indexed += 1
+        perf.count('postings_read', sum(overlap.values()))
+
+        weight, default = self.weight, self.default_weight
+        query_mass = sum(weight.get(g, default) for g in query)
+        scored = []
+        for i, shared in overlap.items():
+            if shared < max(MIN_OVERLAP, OVERLAP_RATIO * min(indexed, self.indexed[i])):
+                continue
+            common = sum(weight[g] for g in query & self.grams[i])
+            score = 2 * common / (query_mass + self.mass[i])
+            if score >= threshold:
+                scored.append((score, i))
+        perf.count('pairs_scored', len(overlap))
+        perf.count('pairs_pruned', len(overlap) - len(scored))
+
+        scored.sort(key=lambda x: (-x[0], x[1]))
+        return [(score, self.nodes[i]) for score, i in scored[:top_k]]
+
+
+def confidence(score: float) -> str:
+    if score >= 0.7:
+        return 'A'
+    elif score >= 0.5:
+        return 'B'
+    elif score >= 0.4:
+        return 'C'
+    return 'D'
+
+
+def build_trigram_candidates(all_naics: bool = False) -> dict:
+    """Build candidates from trigram overlap for every Uniclass table."""
+    naics = load_extracted("naics")
+    if not all_naics:
+        naics = [n for n in naics if n['id'].replace('naics:', '').startswith('23')]
+
+    results = {}
+    for table in TABLES:
+        uc_nodes = load_extracted(f"uniclass_{table}")
+        if not uc_nodes:
+            continue
+
+        with perf.span('index', table=table):
+            index = TrigramIndex(uc_nodes)
+
+        candidates = []
+        with perf.span('search', table=table):
+            for naics_node in naics:
+                matches = [{
+                    'target_id': uc_node['id'],
+                    'target_name': uc_node['name'],
+                    'relationship': 'lexically_similar',
+                    'confidence': confidence(score),
+                    'score': round(score, 3),
+                    'method': 'trigram_dice'
+                } for score, uc_node in index.search(naics_node['name'])]
+                if matches:
+                    perf.count('candidates_kept', len(matches))
+                    candidates.append({
+                        'source_id': naics_node['id'],
+                        'source_name': naics_node['name'],
+                        'matches': matches
+                    })
+
+        results[table] = candidates
+
+    return results
+
+
+def save_candidates(results: dict):
+    """Save trigram candidates."""
+    total = 0
+    for table, candidates in results.items():
+        if not candidates:
+            continue
+
+        outfile = CANDIDATES / f"naics_to_uniclass_{table}_trigram.json"
+        with open(outfile, 'w') as f:
+            json.dump(candidates, f, indent=2)
+        write_through_candidates(outfile, candidates)
+
+        count = sum(len(c['matches']) for c in candidates)
+        total += count
+        print(f"Trigram {table.upper()}: {len(candidates)} sources, {count} mappings")
+
+    print(f"Total trigram mappings: {total}")
+
+
+@perf.staged('trigram')
+def main():
+    all_naics = '--all-naics' in sys.argv
+    print(f"Building trigram candidates ({'all NAICS' if all_naics else 'construction NAICS'})...\n")
+    results = build_trigram_candidates(all_naics)
+    with perf.span('save'):
+        save_candidates(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,859 @@
+#!/usr/bin/env python3
+"""In-process triple store for the combined ontology graph.
+
+Bulk-loads the sources described in docs/GRAPH_MODEL.md into one graph:
+
+  extracted   extracted/*.json nodes: type, schema:name, corelot:partOf
+              (code hierarchy), rdfs:subClassOf for schema.org types
+  instances   instances/nodes/**/*.jsonld (terms from the corelot context)
+              and instances/edges/relationships.csv
+  crosswalk   crosswalk/final_crosswalk.json mappings, typed with the
+              linguistic matcher's relationship inference
+  brick       data/Brick.ttl (Turtle, parsed here - no rdflib)
+
+N-Triples / N-Quads dumps written by export_rdf.py load back with
+load_nquads().
+
+Terms are N-Triples-style strings - CURIEs ('uc:Ss_25_10_30',
+'corelot:produces'), '<full IRIs>', '"literals"' (with @lang or
+^^datatype) and '_:blank' nodes - interned to integers. Every term is
+canonicalized on the way in: IRIs are compacted with the store's
+prefixes (PREFIXES plus those declared by loaded Turtle files), so an
+IRI spelled 'brick:X' in Brick.ttl and '<https://brickschema.org/...X>'
+in an N-Quads dump is one term. Triples are kept
+in three sorted permutation indexes (SPO, POS, OSP), so every triple
+pattern is one bisect range whose size is known before it is read.
+
+Basic graph pattern queries pick their join order greedily: the next
+pattern is the connected one with the smallest estimated range, where
+each variable already bound by an earlier pattern divides the estimate.
+Filters run as soon as their variable is bound.
+
+  store = TripleStore.load()
+  store.select('''?trade corelot:produces ?sys . ?trade corelot:uses ?product''',
+               filters={'?sys': under('uc:Ss_25'), '?product': under('uc:Pr')})
+
+Usage: triple_store.py ["<basic graph pattern>"]
+"""
+
+import csv
+import gzip
+import itertools
+import json
+import re
+import sys
+import time
+from bisect import bisect_left
+from pathlib import Path
+
+BASE = Path(__file__).parent.parent
+EXTRACTED = BASE / "extracted"
+INSTANCES = BASE / "instances"
+CROSSWALK = BASE / "crosswalk"
+CONTEXT_FILE = BASE / "schemas" / "corelot-context.jsonld"
+BRICK_FILE = BASE / "data" / "Brick.ttl"
+FINAL_CROSSWALK = CROSSWALK / "final_crosswalk.json"
+RELATIONSHIPS = INSTANCES / "edges" / "relationships.csv"
+
+RDF_TYPE = "rdf:type"
+RDFS_SUBCLASS = "rdfs:subClassOf"
+NAME = "schema:name"
+PART_OF = "corelot:partOf"
+
+PREFIXES = {
+    "rdf": "http://www.w3.org/1999/02/22-rdf-syntax-ns#",
+    "rdfs": "http://www.w3.org/2000/01/rdf-schema#",
+    "xsd": "http://www.w3.org/2001/XMLSchema#",
+    "schema": "https://schema.org/",
+    "naics": "https://www.census.gov/naics/",
+    "uc": "https://uniclass.thenbs.com/taxon/",
+    "corelot": "https://corelot.io/ontology/",
+    "dcterms": "http://purl.org/dc/terms/",
+    "prov": "http://www.w3.org/ns/prov#",
+}
+
+# Named graphs in N-Quads dumps: GRAPH_BASE + source graph name
+GRAPH_BASE = "https://corelot.io/graph/"
+
+UNICLASS_TYPES = {"Ss": "corelot:WorkResult", "Pr": "corelot:Product", "Ac": "corelot:Activity",
+                  "En": "corelot:Entity", "Co": "corelot:Complex"}
+NAICS_TYPES = {2: "corelot:Sector", 3: "corelot:Subsector"}
+
+# Join-order estimate: each already-bound variable position divides a
+# pattern's range size by this much.
+BOUND_SELECTIVITY = 100.0
+
+
+# =============================================================================
+# TERMS
+# =============================================================================
+
+_ESCAPES = {'\\': '\\\\', '"': '\\"', '\n': '\\n', '\r': '\\r', '\t': '\\t'}
+_ESCAPE_RE = re.compile(r'[\\"\n\r\t]')
+_UNESCAPE_RE = re.compile(r'\\(u[0-9A-Fa-f]{4}|U[0-9A-Fa-f]{8}|.)', re.DOTALL)
+_UNESCAPES = {'t': '\t', 'n': '\n', 'r': '\r', 'b': '\b', 'f': '\f'}
+
+
+def literal(value: str, lang: str = None, datatype: str = None) -> str:
+    """Literal term in N-Triples form ('"text"', '"text"@en', '"5"^^xsd:integer')."""
+    term = '"' + _ESCAPE_RE.sub(lambda m: _ESCAPES[m.group()], value) + '"'
+    if lang:
+        return f"{term}@{lang.lower()}"
+    if datatype and datatype not in ("xsd:string", f"<{PREFIXES['xsd']}string>"):
+        return f"{term}^^{datatype}"
+    return term
+
+
+def literal_value(term: str) -> str:
+    """Lexical value of a literal term (the inverse of literal())."""
+    body = term[1:term.rindex('"')]
+    return _UNESCAPE_RE.sub(_unescape, body)
+
+
+def _unescape(m) -> str:
+    esc = m.group(1)
+    if esc[0] in 'uU' and len(esc) > 1:
+        return chr(int(esc[1:], 16))
+    return _UNESCAPES.get(esc, esc)
+
+
+def is_literal(term: str) -> bool:
+    return term.startswith('"')
+
+
+def under(root: str):
+    """Filter: term is root or sits below it in its code hierarchy."""
+    sep = '_' if root.startswith('uc:') else ''
+    prefix = root + sep
+    return lambda term: term == root or term.startswith(prefix)
+
+
+def compact(iri: str, prefixes: dict = PREFIXES) -> str:
+    """'https://schema.org/Thing' -> 'schema:Thing' (else '<iri>').
+
+    The longest matching base wins, so nested namespaces (brick: and its
+    ref: below it) compact the same way whatever order they are listed in.
+    """
+    best = None
+    for name, base in prefixes.items():
+        if iri.startswith(base) and (best is None or len(base) > len(prefixes[best])):
+            if re.fullmatch(r"[\w.-]*", iri[len(base):]):
+                best = name
+    if best is None:
+        return f"<{iri}>"
+    return f"{best}:{iri[len(prefixes[best]):]}"
+
+
+def to_nt(term: str, prefixes: dict = PREFIXES) -> str:
+    """Term in N-Triples syntax: CURIEs, including literal datatypes, expanded."""
+    if term[0] == '"':
+        end = term.rindex('"')
+        if term[end + 1:end + 3] == '^^' and term[end + 3] != '<':
+            return term[:end + 3] + to_nt(term[end + 3:], prefixes)
+        return term
+    if term[0] in '<_':
+        return term
+    prefix, _, local = term.partition(':')
+    if prefix not in prefixes:
+        raise ValueError(f"Unknown prefix in {term!r}")
+    return f"<{prefixes[prefix]}{local}>"
+
+
+_NQUAD_TERM_RE = re.compile(r'<[^>]*>|_:\S+|"(?:[^"\\]|\\.)*"(?:@[A-Za-z0-9-]+|\^\^<[^>]*>)?')
+
+
+def _from_nt(term: str, bnode_prefix: str) -> str:
+    """N-Triples term -> store term (the inverse of to_nt())."""
+    if term[0] == '<':
+        return compact(term[1:-1])
+    if term[0] == '_':
+        return bnode_prefix + term[2:]
+    end = term.rindex('"')
+    if term[end + 1:end + 4] == '^^<':
+        return term[:end + 3] + compact(term[end + 4:-1])
+    return term
+
+
+# =============================================================================
+# TURTLE
+# =============================================================================
+
+_TOKEN_RE = re.compile(r'''
+     (?P<ws>\s+|\#[^\n]*)
+    |(?P<iri><[^<>"{}|^`\\\s]*>)
+    |(?P<long>"""(?:[^"\\]|\\.|"(?!""))*"""|\'\'\'(?:[^'\\]|\\.|'(?!''))*\'\'\')
+    |(?P<str>"(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*')
+    |(?P<at>@[A-Za-z]+(?:-[A-Za-z0-9]+)*)
+    |(?P<dt>\^\^)
+    |(?P<num>[+-]?(?:\d+\.\d*(?:[eE][+-]?\d+)?|\.\d+(?:[eE][+-]?\d+)?|\d+(?:[eE][+-]?\d+)?))
+    |(?P<bnode>_:[\w-]+(?:\.[\w-]+)*)
+    |(?P<var>[?$]\w+)
+    |(?P<pname>(?:[A-Za-z][\w-]*(?:\.[\w-]+)*)?:(?:[\w:%-]+(?:\.[\w:%-]+)*)?)
+    |(?P<word>[A-Za-z]+)
+    |(?P<punct>[.;,\[\]()])
+''', re.VERBOSE | re.DOTALL)
+
+
+def tokenize(text: str) -> list:
+    tokens = []
+    pos, end = 0, len(text)
+    while pos < end:
+        m = _TOKEN_RE.match(text, pos)
+        if not m:
+            line = text.count('\n', 0, pos) + 1
+            raise ValueError(f"Turtle syntax error at line {line}: {text[pos:pos + 30]!r}")
+        kind = m.lastgroup
+        if kind != 'ws':
+            tokens.append((kind, m.group()))
+        pos = m.end()
+    tokens.append(('eof', ''))
+    return tokens
+
+
+class TurtleParser:
+    """Turtle (and basic-graph-pattern) parser producing term-string triples.
+
+    Prefixed names are kept as CURIEs with the prefix the file declared,
+    '<IRIs>' as written. Blank node labels are made unique per parse.
+    """
+
+    def __init__(self, text: str, bnode_prefix: str = "b", allow_vars: bool = False):
+        self.tokens = tokenize(text)
+        self.i = 0
+        self.prefixes = {}
+        self.triples = []
+        self.allow_vars = allow_vars
+        self.bnode_prefix = bnode_prefix
+        self.bnode_count = 0
+        self.bnode_labels = {}
+
+    def peek(self):
+        return self.tokens[self.i]
+
+    def next(self):
+        tok = self.tokens[self.i]
+        self.i += 1
+        return tok
+
+    def expect(self, value: str):
+        kind, text = self.next()
+        if text != value:
+            raise ValueError(f"Expected {value!r}, found {text!r}")
+
+    def new_bnode(self) -> str:
+        self.bnode_count += 1
+        return f"_:{self.bnode_prefix}{self.bnode_count}"
+
+    def parse(self) -> list:
+        while self.peek()[0] != 'eof':
+            kind, text = self.peek()
+            if kind == 'at' and text in ('@prefix', '@base'):
+                self.next()
+                self.directive(text[1:])
+                self.expect('.')
+            elif kind == 'word' and text.upper() in ('PREFIX', 'BASE'):
+                self.next()
+                self.directive(text.lower())
+            else:
+                self.statement()
+                if self.peek()[1] == '.':
+                    self.next()
+                elif self.peek()[0] != 'eof' or not self.allow_vars:
+                    self.expect('.')
+        return self.triples
+
+    def directive(self, name: str):
+        if name == 'prefix':
+            kind, pname = self.next()
+            kind, iri = self.next()
+            self.prefixes[pname[:-1]] = iri[1:-1]
+        else:
+            self.next()
+
+    def statement(self):
+        if self.peek()[1] == '[':
+            subject = self.blank_node_properties()
+            if self.peek()[1] in ('.', '') or self.peek()[0] == 'eof':
+                return
+        else:
+            subject = self.term()
+        self.predicate_objects(subject)
+
+    def predicate_objects(self, subject: str):
+        while True:
+            kind, text = self.next()
+            predicate = RDF_TYPE if (kind, text) == ('word', 'a') else self.resolve(kind, text)
+            self.triples.append((subject, predicate, self.object()))
+            while self.peek()[1] == ',':
+                self.next()
+                self.triples.append((subject, predicate, self.object()))
+            if self.peek()[1] != ';':
+                return
+            while self.peek()[1] == ';':
+                self.next()
+            if self.peek()[1] in ('.', ']') or self.peek()[0] == 'eof':
+                return
+
+    def blank_node_properties(self) -> str:
+        self.expect('[')
+        node = self.new_bnode()
+        if self.peek()[1] != ']':
+            self.predicate_objects(node)
+        self.expect(']')
+        return node
+
+    def collection(self) -> str:
+        self.expect('(')
+        items = []
+        while self.peek()[1] != ')':
+            items.append(self.object())
+        self.next()
+        if not items:
+            return "rdf:nil"
+        head = node = self.new_bnode()
+        for i, item in enumerate(items):
+            self.triples.append((node, "rdf:first", item))
+            rest = self.new_bnode() if i + 1 < len(items) else "rdf:nil"
+            self.triples.append((node, "rdf:rest", rest))
+            node = rest
+        return head
+
+    def object(self) -> str:
+        text = self.peek()[1]
+        if text == '[':
+            return self.blank_node_properties()
+        if text == '(':
+            return self.collection()
+        return self.term()
+
+    def term(self) -> str:
+        if self.peek()[1] == '(':
+            return self.collection()
+        kind, text = self.next()
+        if kind in ('str', 'long'):
+            value = literal_value('"' + (text[3:-3] if kind == 'long' else text[1:-1]) + '"')
+            if self.peek()[0] == 'at':
+                return literal(value, lang=self.next()[1][1:])
+            if self.peek()[0] == 'dt':
+                self.next()
+                return literal(value, datatype=self.resolve(*self.next()))
+            return literal(value)
+        if kind == 'num':
+            dt = "xsd:double" if 'e' in text.lower() else "xsd:decimal" if '.' in text else "xsd:integer"
+            return literal(text, datatype=dt)
+        if kind == 'word' and text in ('true', 'false'):
+            return literal(text, datatype="xsd:boolean")
+        return self.resolve(kind, text)
+
+    def resolve(self, kind: str, text: str) -> str:
+        if kind in ('iri', 'pname'):
+            return text
+        if kind == 'bnode':
+            if text not in self.bnode_labels:
+                self.bnode_labels[text] = self.new_bnode()
+            return self.bnode_labels[text]
+        if kind == 'var' and self.allow_vars:
+            return '?' + text[1:]
+        raise ValueError(f"Unexpected token {text!r}")
+
+
+def parse_turtle(text: str, bnode_prefix: str = "b"):
+    """(prefixes, triples) for a Turtle document."""
+    parser = TurtleParser(text, bnode_prefix)
+    triples = parser.parse()
+    return parser.prefixes, triples
+
+
+def parse_patterns(text: str) -> list:
+    """'?s p ?o . ?o q "x"' -> [(s, p, o), ...] with '?var' terms."""
+    return TurtleParser(text, bnode_prefix="q", allow_vars=True).parse()
+
+
+# =============================================================================
+# SOURCES
+# =============================================================================
+# Each source is a generator of (s, p, o) terms, so it can be bulk-loaded
+# into a TripleStore or streamed straight to a file (export_rdf.py).
+
+def extracted_triples(directory: Path = EXTRACTED):
+    """Type, name, code and code-hierarchy triples for extracted/*.json."""
+    for path in sorted(directory.glob("*.json")):
+        with open(path) as f:
+            nodes = json.load(f)
+        codes = {n['code'] for n in nodes if 'code' in n}
+        for n in nodes:
+            node = n['id']
+            yield node, NAME, literal(n['name'])
+            if path.stem == 'naics':
+                yield node, RDF_TYPE, NAICS_TYPES.get(len(n['code']), "corelot:Trade")
+                yield node, "corelot:naicsCode", literal(n['code'])
+                parent = next((n['code'][:k] for k in range(len(n['code']) - 1, 1, -1)
+                               if n['code'][:k] in codes), None)
+                if parent:
+                    yield node, PART_OF, f"naics:{parent}"
+            elif path.stem.startswith('uniclass_'):
+                yield node, RDF_TYPE, UNICLASS_TYPES.get(n['table'], "corelot:Entity")
+                yield node, "corelot:uniclassCode", literal(n['code'])
+                parent = n['code'].rsplit('_', 1)[0]
+                if parent != n['code'] and parent in codes:
+                    yield node, PART_OF, f"uc:{parent}"
+            elif n.get('subTypeOf'):
+                yield node, RDFS_SUBCLASS, compact(n['subTypeOf'])
+
+
+def jsonld_triples(directory: Path = INSTANCES / "nodes", bnode_prefix: str = "j"):
+    """Triples for instances/nodes/**/*.jsonld (terms from the corelot context)."""
+    context = load_context()
+    counter = itertools.count(1)
+    for path in sorted(directory.rglob("*.jsonld")):
+        with open(path) as f:
+            doc = json.load(f)
+        for node in doc.get("@graph", [doc]):
+            yield from _jsonld_node(node, context, lambda: f"_:{bnode_prefix}{next(counter)}")
+
+
+def _jsonld_node(node: dict, context: dict, new_bnode):
+    """Triples for one node object; returns (via yield from) its subject."""
+    subject = node.get("@id") or new_bnode()
+    for key, value in node.items():
+        if key in ("@context", "@id"):
+            continue
+        if key == "@type":
+            for t in value if isinstance(value, list) else [value]:
+                yield subject, RDF_TYPE, context.get(t, (t, None))[0]
+            continue
+        predicate, kind = context.get(key, (f"corelot:{key}", None))
+        for item in value if isinstance(value, list) else [value]:
+            if isinstance(item, dict):
+                obj = item["@id"] if "@id" in item else (yield from _jsonld_node(item, context, new_bnode))
+            elif kind == "@id":
+                obj = compact(item)
+            else:
+                obj = literal(str(item), datatype=kind)
+            yield subject, predicate, obj
+    return subject
+
+
+def relationship_triples(path: Path = RELATIONSHIPS):
+    """One edge triple per instances/edges/relationships.csv row."""
+    context = load_context()
+    with open(path, newline='') as f:
+        for row in csv.DictReader(line for line in f if not line.startswith('#')):
+            rel = row['relationship']
+            yield row['source_id'], context.get(rel, (f"corelot:{rel}", None))[0], row['target_id']
+
+
+def crosswalk_triples(path: Path = FINAL_CROSSWALK):
+    """One edge per final crosswalk mapping, typed by relationship inference (streamed)."""
+    for _, m in crosswalk_mappings(path):
+        yield m['naics_code'], m['predicate'], m['uniclass_code']
+
+
+def crosswalk_mappings(path: Path = FINAL_CROSSWALK):
+    """Streamed (source, mapping) pairs, each mapping with its edge 'predicate'."""
+    from candidate_stream import stream_crosswalk
+    from linguistic_match import infer_relationship
+    for source, m in stream_crosswalk(path):
+        table = m['uniclass_code'].replace('uc:', '')[:2]
+        m['predicate'] = f"corelot:{infer_relationship(m['naics_code'].replace('naics:', ''), table)}"
+        yield source, m
+
+
+# =============================================================================
+# STORE
+# =============================================================================
+
+def is_var(term) -> bool:
+    return isinstance(term, str) and term.startswith('?')
+
+
+class TripleStore:
+    """Interned triples with sorted SPO / POS / OSP permutation indexes."""
+
+    def __init__(self):
+        self.ids = {}        # term -> id
+        self.terms = []      # id -> term
+        self.prefixes = dict(PREFIXES)
+        self.canon = {}      # term as written -> canonical term
+        self.graphs = {}     # source graph name -> triple count
+        self.graph_of = {}   # (s, p, o) ids -> source graph name (first source wins)
+        self.pending = set()
+        self.spo, self.pos, self.osp = [], [], []
+        self.bnode_loads = 0
+
+    def canonical(self, term: str) -> str:
+        """A term's store form: IRIs and CURIEs compacted with self.prefixes."""
+        result = self.canon.get(term)
+        if result is not None:
+            return result
+        if term[0] == '<':
+            result = compact(term[1:-1], self.prefixes)
+        elif term[0] == '"':
+            end = term.rindex('"')
+            if term[end + 1:end + 3] == '^^':
+                result = term[:end + 3] + self.canonical(term[end + 3:])
+            else:
+                result = term
+        elif term[0] in '_?':
+            result = term
+        else:
+            prefix, _, local = term.partition(':')
+            base = self.prefixes.get(prefix)
+            result = term if base is None else compact(base + local, self.prefixes)
+        self.canon[term] = result
+        return result
+
+    def add_prefixes(self, prefixes: dict):
+        """Register a source's prefixes; returns the names they got here.
+
+        A namespace already known keeps its name. A new namespace whose
+        name is taken by another one is registered as name2, name3, ...
+        Terms interned before the registration are re-canonicalized.
+        """
+        names = {}
+        known = {base: name for name, base in self.prefixes.items()}
+        added = False
+        for name, base in prefixes.items():
+            if base in known:
+                names[name] = known[base]
+                continue
+            unique, n = name, 1
+            while unique in self.prefixes:
+                n += 1
+                unique = f"{name}{n}"
+            if unique != name:
+                print(f"Prefix {name}: <{base}> clashes with <{self.prefixes[name]}>; using {unique}:")
+            self.prefixes[unique] = base
+            known[base] = names[name] = unique
+            added = True
+        if added:
+            self.canon = {}
+            self._recanonicalize()
+        return names
+
+    def _recanonicalize(self):
+        """Rename interned terms whose canonical form changed, merging duplicates."""
+        merged = {}
+        for tid, term in enumerate(self.terms):
+            if self.ids.get(term) != tid:
+                continue        # already merged away
+            new = self.canonical(term)
+            if new == term:
+                continue
+            del self.ids[term]
+            target = self.ids.get(new)
+            if target is None:
+                self.ids[new] = tid
+                self.terms[tid] = new
+            else:
+                merged[tid] = target
+        if not merged:
+            return
+        old = self.graph_of
+        self.graph_of, self.graphs, self.pending = {}, {}, set()
+        self.spo, self.pos, self.osp = [], [], []
+        for (s, p, o), graph in old.items():
+            key = (merged.get(s, s), merged.get(p, p), merged.get(o, o))
+            if key not in self.graph_of:
+                self.graph_of[key] = graph
+                self.graphs[graph] = self.graphs.get(graph, 0) + 1
+                self.pending.add(key)
+
+    def intern(self, term: str) -> int:
+        term = self.canonical(term)
+        tid = self.ids.get(term)
+        if tid is None:
+            tid = self.ids[term] = len(self.terms)
+            self.terms.append(term)
+        return tid
+
+    def add(self, s: str, p: str, o: str, graph: str = "default"):
+        key = (self.intern(s), self.intern(p), self.intern(o))
+        if key not in self.graph_of:
+            self.graph_of[key] = graph
+            self.graphs[graph] = self.graphs.get(graph, 0) + 1
+            self.pending.add(key)
+
+    def add_all(self, triples, graph: str = "default"):
+        for s, p, o in triples:
+            self.add(s, p, o, graph)
+
+    def commit(self):
+        """Merge pending triples into the three sorted indexes."""
+        if not self.pending:
+            return
+        spo = sorted(set(self.spo).union(self.pending)) if self.spo else sorted(self.pending)
+        self.spo = spo
+        self.pos = sorted((p, o, s) for s, p, o in spo)
+        self.osp = sorted((o, s, p) for s, p, o in spo)
+        self.pending = set()
+
+    def __len__(self) -> int:
+        return len(self.graph_of)
+
+    # -- pattern access ------------------------------------------------------
+
+    def _range(self, s, p, o):
+        """(index, lo, hi, unpermute) for a pattern of ids / None."""
+        if s is not None:
+            if p is not None:
+                index, prefix, unperm = self.spo, (s, p) if o is None else (s, p, o), _SPO
+            elif o is not None:
+                index, prefix, unperm = self.osp, (o, s), _OSP
+            else:
+                index, prefix, unperm = self.spo, (s,), _SPO
+        elif p is not None:
+            index, prefix, unperm = self.pos, (p,) if o is None else (p, o), _POS
+        elif o is not None:
+            index, prefix, unperm = self.osp, (o,), _OSP
+        else:
+            return self.spo, 0, len(self.spo), _SPO
+        lo = bisect_left(index, prefix)
+        hi = bisect_left(index, prefix[:-1] + (prefix[-1] + 1,), lo)
+        return index, lo, hi, unperm
+
+    def count_ids(self, s=None, p=None, o=None) -> int:
+        self.commit()
+        _, lo, hi, _ = self._range(s, p, o)
+        return hi - lo
+
+    def match_ids(self, s=None, p=None, o=None):
+        self.commit()
+        index, lo, hi, unperm = self._range(s, p, o)
+        for i in range(lo, hi):
+            yield unperm(index[i])
+
+    def triples(self, s: str = None, p: str = None, o: str = None):
+        """Term triples matching a pattern (None = any)."""
+        ids = [None if t is None else self.ids.get(self.canonical(t), -1) for t in (s, p, o)]
+        if -1 in ids:
+            return
+        for t in self.match_ids(*ids):
+            yield tuple(self.terms[x] for x in t)
+
+    def objects(self, s: str, p: str) -> list:
+        return [o for _, _, o in self.triples(s, p, None)]
+
+    def subjects(self, p: str, o: str) -> list:
+        return [s for s, _, _ in self.triples(None, p, o)]
+
+    # -- basic graph patterns ------------------------------------------------
+
+    def plan(self, patterns: list) -> list:
+        """Greedy join order for compiled patterns (see module docstring)."""
+        remaining = list(patterns)
+        bound = set()
+        order = []
+        while remaining:
+            def cost(pat):
+                consts = [None if is_var(x) else x for x in pat]
+                estimate = self.count_ids(*consts)
+                shared = sum(1 for x in pat if is_var(x) and x in bound)
+                connected = shared > 0 or not bound
+                return (not connected, estimate / BOUND_SELECTIVITY ** shared)
+            best = min(remaining, key=cost)
+            remaining.remove(best)
+            order.append(best)
+            bound.update(x for x in best if is_var(x))
+        return order
+
+    def query(self, patterns: list, filters: dict = None, limit: int = None) -> list:
+        """Solutions [{var: term}] for a list of (s, p, o) term patterns."""
+        self.commit()
+        compiled = []
+        for pat in patterns:
+            ids = []
+            for x in pat:
+                if is_var(x):
+                    ids.append(x)
+                elif self.canonical(x) in self.ids:
+                    ids.append(self.ids[self.canonical(x)])
+                else:
+                    return []       # constant not in the graph: no solutions
+            compiled.append(tuple(ids))
+
+        checks = {}
+        for var, fn in (filters or {}).items():
+            cache = {}
+            def check(tid, fn=fn, cache=cache):
+                ok = cache.get(tid)
+                if ok is None:
+                    ok = cache[tid] = bool(fn(self.terms[tid]))
+                return ok
+            checks[var] = check
+
+        solutions = [{}]
+        for pat in self.plan(compiled):
+            extended = []
+            for b in solutions:
+                s, p, o = (b.get(x) if is_var(x) else x for x in pat)
+                for triple in self.match_ids(s, p, o):
+                    nb = None
+                    for var, value in zip(pat, triple):
+                        if not is_var(var):
+                            continue
+                        current = (nb or b).get(var)
+                        if current is None:
+                            if var in checks and not checks[var](value):
+                                break
+                            nb = nb or dict(b)
+                            nb[var] = value
+                        elif current != value:
+                            break
+                    else:
+                        extended.append(nb or b)
+            solutions = extended
+            if not solutions:
+                break
+
+        out = []
+        for b in solutions[:limit] if limit else solutions:
+            out.append({var: self.terms[tid] for var, tid in b.items()})
+        return out
+
+    def select(self, bgp: str, filters: dict = None, limit: int = None) -> list:
+        """query() over a textual pattern: '?t corelot:produces ?s . ?t corelot:uses ?p'."""
+        return self.query(parse_patterns(bgp), filters, limit)
+
+    # -- loaders -------------------------------------------------------------
+
+    def load_turtle(self, path: Path, graph: str = None):
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+        self.bnode_loads += 1
+        prefixes, triples = parse_turtle(text, bnode_prefix=f"t{self.bnode_loads}_")
+        self.add_prefixes(prefixes)
+        # Expand with the file's own prefixes; add() compacts with the store's
+        self.add_all(((to_nt(s, prefixes), to_nt(p, prefixes), to_nt(o, prefixes))
+                      for s, p, o in triples), graph or path.stem)
+
+    def load_extracted(self, directory: Path = EXTRACTED, graph: str = "extracted"):
+        self.add_all(extracted_triples(directory), graph)
+
+    def load_jsonld(self, directory: Path = INSTANCES / "nodes", graph: str = "instances"):
+        self.bnode_loads += 1
+        self.add_all(jsonld_triples(directory, bnode_prefix=f"j{self.bnode_loads}_"), graph)
+
+    def load_relationships(self, path: Path = RELATIONSHIPS, graph: str = "instances"):
+        self.add_all(relationship_triples(path), graph)
+
+    def load_crosswalk(self, path: Path = FINAL_CROSSWALK, graph: str = "crosswalk"):
+        self.add_all(crosswalk_triples(path), graph)
+
+    def load_nquads(self, path: Path, graph: str = None):
+        """N-Triples or N-Quads (optionally .gz), e.g. an export_rdf.py dump.
+
+        Quads go to the graph named by their fourth term (the local name
+        under GRAPH_BASE), triples to `graph` or the file's stem.
+        """
+        self.bnode_loads += 1
+        prefix = f"_:n{self.bnode_loads}_"
+        default = graph or Path(path).name.split('.')[0]
+        opener = gzip.open if str(path).endswith('.gz') else open
+        with opener(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                terms = [m.group() for m in _NQUAD_TERM_RE.finditer(line)]
+                if len(terms) < 3:
+                    continue
+                s, p, o = (_from_nt(t, prefix) for t in terms[:3])
+                name = terms[3][1:-1] if len(terms) > 3 else None
+                if name and name.startswith(GRAPH_BASE):
+                    name = name[len(GRAPH_BASE):]
+                self.add(s, p, o, name or default)
+
+    @classmethod
+    def load(cls, brick: bool = True):
+        """The combined graph from every available source."""
+        store = cls()
+        store.load_extracted()
+        if (INSTANCES / "nodes").exists():
+            store.load_jsonld()
+        if RELATIONSHIPS.exists():
+            store.load_relationships()
+        if FINAL_CROSSWALK.exists():
+            store.load_crosswalk()
+        if brick and BRICK_FILE.exists():
+            store.load_turtle(BRICK_FILE, graph="brick")
+        store.commit()
+        return store
+
+    # -- helpers -------------------------------------------------------------
+
+    def compact(self, iri: str) -> str:
+        return compact(iri, self.prefixes)
+
+    def expand(self, term: str) -> str:
+        """CURIE -> '<full IRI>'; other terms unchanged."""
+        if term[0] in '<"_':
+            return term
+        prefix, _, local = term.partition(':')
+        base = self.prefixes.get(prefix)
+        return f"<{base}{local}>" if base is not None else term
+
+    def stats(self) -> dict:
+        self.commit()
+        return {'triples': len(self), 'terms': len(self.terms), 'graphs': dict(self.graphs)}
+
+
+def _SPO(t):
+    return t
+
+
+def _POS(t):
+    return (t[2], t[0], t[1])
+
+
+def _OSP(t):
+    return (t[1], t[2], t[0])
+
+
+def load_context(path: Path = CONTEXT_FILE) -> dict:
+    """JSON-LD context terms -> (CURIE, value type)."""
+    with open(path) as f:
+        ctx = json.load(f)["@context"]
+    terms = {}
+    for key, value in ctx.items():
+        if key.startswith('@') or key in PREFIXES:
+            continue
+        if isinstance(value, str):
+            if value.startswith('http'):
+                continue
+            terms[key] = (value, None)
+        else:
+            terms[key] = (value["@id"], value.get("@type"))
+    return terms
+
+
+EXAMPLE_QUERY = """
+?trade corelot:produces ?system .
+?trade corelot:uses ?product .
+?product schema:name ?name .
+"""
+
+
+def main():
+    start = time.perf_counter()
+    store = TripleStore.load()
+    load_ms = (time.perf_counter() - start) * 1000
+    stats = store.stats()
+    print(f"Loaded {stats['triples']} triples, {stats['terms']} terms in {load_ms:.0f} ms")
+    for graph, count in stats['graphs'].items():
+        print(f"  {graph:<10} {count:>8}")
+
+    if len(sys.argv) > 1:
+        bgp, filters = sys.argv[1], None
+    else:
+        bgp = EXAMPLE_QUERY
+        filters = {'?system': under('uc:Ss_25'), '?product': under('uc:Pr')}
+        print("\nPr products used by trades producing Ss_25 systems:")
+
+    start = time.perf_counter()
+    rows = store.select(bgp, filters)
+    query_ms = (time.perf_counter() - start) * 1000
+    for row in rows[:20]:
+        print("  " + "  ".join(f"{k}={v}" for k, v in row.items()))
+    print(f"{len(rows)} solutions in {query_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
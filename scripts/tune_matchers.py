@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""Grid / random search over linguistic and embedding matcher settings.
+
+The knobs are constants spread over the matchers: linguistic_match's
+min_score, top-10 cut and SYNONYMS expansion, embedding_match's
+threshold, DOMAIN_BOOST, stopword list and top-5 cut. This stage scores
+every combination in GRID against the labels and ranks them.
+
+Method:
+1. Artifacts are built once per run and cached on disk
+   (reports/.tune_cache.json, rebuilt when extracted/ changes):
+   linguistic token sets with and without synonym expansion, and
+   embedding term counts plus per-table IDF, each with the default
+   stopwords and with trigram_match.GENERIC words also dropped.
+2. Each configuration only re-runs scoring, in a process pool. Vectors
+   are reweighted from the cached counts (boost b scales every
+   DOMAIN_BOOST weight w to 1 + b * (w - 1), so b=1 is the current
+   table and b=0 turns it off), and pairs are scored through an
+   inverted index over the Uniclass side, so only pairs sharing a term
+   are touched.
+3. Every configuration's candidates go through threshold_sweep.sweep
+   (one sorted pass) against the ground truth and expert decisions.
+   Configurations are ranked by average precision, with best F1 and
+   its cut-off alongside. The current settings are marked in the
+   leaderboard.
+
+Labels come from ground truth, which is linguistic + embedding
+agreement under the current settings. Configurations close to the
+current ones are therefore favoured until more expert labels exist.
+
+Output: reports/tuning_leaderboard.json
+
+Usage: tune_matchers.py [--methods=linguistic,embedding] [--random=N] [--workers=N] [--all-naics]
+"""
+
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import perf
+from embedding_match import DOMAIN_BOOST, tokenize
+from ensemble_score import load_expert_labels, load_ground_truth
+from linguistic_match import expand_synonyms
+from pair_features import file_signature
+from threshold_sweep import TARGET_PRECISION, sweep
+from trigram_match import GENERIC
+
+BASE = Path(__file__).parent.parent
+EXTRACTED = BASE / "extracted"
+REPORTS = BASE / "reports"
+CACHE = REPORTS / ".tune_cache.json"
+OUTPUT = REPORTS / "tuning_leaderboard.json"
+
+TABLES = ['ss', 'pr', 'ac', 'en', 'co']
+CACHE_VERSION = 1
+SEED = 20260101
+TOP_N = 10
+
+GRID = {
+    'linguistic': {
+        'min_score': [0.1, 0.15, 0.2, 0.25],
+        'top_k': [5, 10, 20],
+        'synonyms': [True, False],
+        'stopwords': ['default', 'generic'],
+    },
+    'embedding': {
+        'threshold': [0.1, 0.15, 0.2, 0.25],
+        'top_k': [3, 5, 10],
+        'boost': [0.0, 0.5, 1.0, 2.0],
+        'stopwords': ['default', 'generic'],
+    },
+}
+
+# Settings the matchers use today
+CURRENT = {
+    'linguistic': {'min_score': 0.15, 'top_k': 10, 'synonyms': True, 'stopwords': 'default'},
+    'embedding': {'threshold': 0.15, 'top_k': 5, 'boost': 1.0, 'stopwords': 'default'},
+}
+
+
+# =============================================================================
+# ARTIFACTS (built once, cached on disk)
+# =============================================================================
+
+def build_artifacts(all_naics: bool) -> dict:
+    """Token sets and term counts for every node, per stopword variant."""
+    naics = perf.load_json(EXTRACTED / "naics.json")
+    if not all_naics:
+        naics = [n for n in naics if n['code'].startswith('23')]
+    tables = {t: perf.load_json(EXTRACTED / f"uniclass_{t}.json") for t in TABLES
+              if (EXTRACTED / f"uniclass_{t}.json").exists()}
+
+    artifacts = {
+        'naics': [n['id'] for n in naics],
+        'tables': {t: [n['id'] for n in nodes] for t, nodes in tables.items()},
+        'linguistic': {},
+        'embedding': {},
+    }
+    for stopwords, extra in [('default', set()), ('generic', GENERIC)]:
+        for synonyms in (True, False):
+            def tokens(node):
+                base = set(node['tokens']) - extra
+                return sorted(expand_synonyms(base) if synonyms else base)
+            artifacts['linguistic'][f"{stopwords}:{synonyms}"] = {
+                'naics': [tokens(n) for n in naics],
+                **{t: [tokens(n) for n in nodes] for t, nodes in tables.items()},
+            }
+
+        naics_tf = [Counter(tokenize(n['name'], extra)) for n in naics]
+        variant = {'naics': naics_tf}
+        for t, nodes in tables.items():
+            uc_tf = [Counter(tokenize(n['name'], extra)) for n in nodes]
+            # Same corpus and smoothing as TFIDFVectorizer.fit (NAICS + one table)
+            df = Counter(term for tf in naics_tf + uc_tf for term in tf)
+            count = len(naics_tf) + len(uc_tf)
+            idf = {term: math.log((count + 1) / (c + 1)) + 1 for term, c in df.items()}
+            variant[t] = {'tf': uc_tf, 'idf': idf}
+        artifacts['embedding'][stopwords] = variant
+    return artifacts
+
+
+def load_artifacts(all_naics: bool) -> dict:
+    signature = [CACHE_VERSION, all_naics, file_signature(EXTRACTED.glob("*.json"))]
+    if CACHE.exists():
+        with open(CACHE, encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached.get('signature') == signature:
+            perf.count('cache_hits')
+            return cached['artifacts']
+    artifacts = build_artifacts(all_naics)
+    REPORTS.mkdir(exist_ok=True)
+    with open(CACHE, 'w', encoding='utf-8') as f:
+        json.dump({'signature': signature, 'artifacts': artifacts}, f)
+    # Round-trip so fresh and cached runs see identical (JSON) types
+    return json.loads(json.dumps(artifacts))
+
+
+def positive_pairs(artifacts: dict) -> set:
+    """In-scope (NAICS, Uniclass) pairs labeled positive (ensemble_score rules)."""
+    names = {}
+    for name in ['naics'] + [f"uniclass_{t}" for t in TABLES]:
+        path = EXTRACTED / f"{name}.json"
+        if path.exists():
+            names.update((n['id'], n['name'].lower()) for n in perf.load_json(path))
+    sources = set(artifacts['naics'])
+    targets = {t for ids in artifacts['tables'].values() for t in ids}
+    positives = {key for key in load_ground_truth() if key[0] in sources and key[1] in targets}
+
+    by_name = defaultdict(list)
+    for t in targets:
+        by_name[names.get(t, '')].append(t)
+    for stem, target_name, approved in load_expert_labels():
+        for s in sources:
+            if any(w.startswith(stem) for w in names.get(s, '').split()):
+                for t in by_name.get(target_name, []):
+                    (positives.add if approved else positives.discard)((s, t))
+    return positives
+
+
+# =============================================================================
+# SCORING (per configuration, in worker processes)
+# =============================================================================
+
+_state = {}     # worker globals: artifacts, positives, memoized postings
+
+
+def _init_worker(artifacts: dict, positives: set):
+    _state['artifacts'] = artifacts
+    _state['positives'] = positives
+    _state['postings'] = {}
+
+
+def _postings(key, build):
+    postings = _state['postings'].get(key)
+    if postings is None:
+        postings = _state['postings'][key] = build()
+    return postings
+
+
+def score_linguistic(config: dict) -> list:
+    """[(source, target, score)] like linguistic_match.match_naics_to_uniclass."""
+    a = _state['artifacts']
+    variant = a['linguistic'][f"{config['stopwords']}:{config['synonyms']}"]
+    pairs = []
+    for table, ids in a['tables'].items():
+        uc_tokens = variant[table]
+
+        def build():
+            index = defaultdict(list)
+            for j, tokens in enumerate(uc_tokens):
+                for token in tokens:
+                    index[token].append(j)
+            return index
+        index = _postings(('linguistic', config['stopwords'], config['synonyms'], table), build)
+
+        for source, tokens in zip(a['naics'], variant['naics']):
+            if not tokens:
+                continue
+            shared = Counter(j for token in tokens for j in index.get(token, ()))
+            matches = []
+            for j, inter in shared.items():
+                score = round(inter / (len(tokens) + len(uc_tokens[j]) - inter), 3)
+                if score >= config['min_score']:
+                    matches.append((score, ids[j]))
+            matches.sort(key=lambda m: -m[0])
+            pairs.extend((source, target, score) for score, target in matches[:config['top_k']])
+    return pairs
+
+
+def _vector(tf: dict, idf: dict, boost: float) -> dict:
+    vector = {t: c * idf.get(t, 1.0) * (1 + boost * (DOMAIN_BOOST.get(t, 1.0) - 1)) for t, c in tf.items()}
+    norm = math.sqrt(sum(v * v for v in vector.values()))
+    return {t: v / norm for t, v in vector.items()} if norm else {}
+
+
+def score_embedding(config: dict) -> list:
+    """[(source, target, score)] like embedding_match.build_embedding_candidates."""
+    a = _state['artifacts']
+    variant = a['embedding'][config['stopwords']]
+    pairs = []
+    for table, ids in a['tables'].items():
+        idf = variant[table]['idf']
+
+        def build():
+            index = defaultdict(list)
+            for j, tf in enumerate(variant[table]['tf']):
+                for term, weight in _vector(tf, idf, config['boost']).items():
+                    index[term].append((j, weight))
+            return index
+        index = _postings(('embedding', config['stopwords'], config['boost'], table), build)
+
+        for source, tf in zip(a['naics'], variant['naics']):
+            acc = defaultdict(float)
+            for term, weight in _vector(tf, idf, config['boost']).items():
+                for j, w in index.get(term, ()):
+                    acc[j] += weight * w
+            matches = [(round(sim, 3), ids[j]) for j, sim in acc.items() if sim >= config['threshold']]
+            matches.sort(key=lambda m: -m[0])
+            pairs.extend((source, target, score) for score, target in matches[:config['top_k']])
+    return pairs
+
+
+def average_precision(curve: list) -> float:
+    """Area under the step PR curve ([threshold, precision, recall, f1], best first)."""
+    ap, last_recall = 0.0, 0.0
+    for _, precision, recall, _ in curve:
+        ap += (recall - last_recall) * precision
+        last_recall = recall
+    return ap
+
+
+def evaluate(task: tuple) -> dict:
+    method, config = task
+    start = time.perf_counter()
+    pairs = (score_linguistic if method == 'linguistic' else score_embedding)(config)
+    positives = _state['positives']
+    result = sweep([(score, int((s, t) in positives)) for s, t, score in pairs],
+                   len(positives), TARGET_PRECISION)
+    cutoff, precision, recall, f1 = result['best_f1'] or (None, 0.0, 0.0, 0.0)
+    return {
+        'method': method,
+        'config': config,
+        'current': config == CURRENT[method],
+        'pairs': len(pairs),
+        'average_precision': round(average_precision(result['curve']), 4),
+        'best_f1': f1,
+        'best_f1_cutoff': cutoff,
+        'precision': precision,
+        'recall': recall,
+        'seconds': round(time.perf_counter() - start, 3),
+    }
+
+
+# =============================================================================
+# SEARCH
+# =============================================================================
+
+def configurations(methods: list, sample: int = None) -> list:
+    """[(method, config)] over the grid, or a seeded random sample of it."""
+    tasks = []
+    for method in methods:
+        names = list(GRID[method])
+        for values in itertools.product(*(GRID[method][n] for n in names)):
+            tasks.append((method, dict(zip(names, values))))
+    if sample and sample < len(tasks):
+        current = [(m, CURRENT[m]) for m in methods]
+        others = [t for t in tasks if t not in current]
+        tasks = current + random.Random(SEED).sample(others, max(sample - len(current), 0))
+    return tasks
+
+
+@perf.staged('tune')
+def main():
+    flags = dict(a[2:].partition('=')[::2] for a in sys.argv[1:] if a.startswith('--'))
+    methods = flags['methods'].split(',') if flags.get('methods') else list(GRID)
+    workers = int(flags.get('workers') or os.cpu_count() or 1)
+    sample = int(flags['random']) if flags.get('random') else None
+    all_naics = 'all-naics' in flags
+
+    with perf.span('artifacts'):
+        start = time.perf_counter()
+        artifacts = load_artifacts(all_naics)
+        positives = positive_pairs(artifacts)
+    print(f"Artifacts ready in {time.perf_counter() - start:.2f}s "
+          f"({len(artifacts['naics'])} NAICS, {len(positives)} positive pairs)")
+
+    tasks = configurations(methods, sample)
+    print(f"Evaluating {len(tasks)} configurations on {workers} worker(s)...\n")
+    start = time.perf_counter()
+    with perf.span('search'):
+        ctx = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(workers, mp_context=ctx, initializer=_init_worker,
+                                 initargs=(artifacts, positives)) as pool:
+            results = list(pool.map(evaluate, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+    elapsed = time.perf_counter() - start
+    perf.count('configurations', len(results))
+
+    results.sort(key=lambda r: (-r['average_precision'], -r['best_f1']))
+    for rank, r in enumerate(results, 1):
+        r['rank'] = rank
+
+    output = {
+        "_meta": {
+            "generated_at": datetime.now().isoformat(),
+            "description": "Matcher hyperparameter search ranked by average precision",
+            "grid": {m: GRID[m] for m in methods},
+            "current": {m: CURRENT[m] for m in methods},
+            "configurations": len(results),
+            "positives": len(positives),
+            "search_seconds": round(elapsed, 2),
+        },
+        "leaderboard": results,
+    }
+    with open(OUTPUT, 'w', encoding='utf-8') as f:
+        json.dump(output, f, indent=1)
+
+    print(f"Searched in {elapsed:.1f}s ({elapsed / len(results) * 1000:.0f} ms per configuration)\n")
+    for method in methods:
+        ranked = [r for r in results if r['method'] == method]
+        print(f"{method} (top {min(TOP_N, len(ranked))} of {len(ranked)})")
+        print(f"  {'AP':>6} {'F1':>6} {'@':>6} {'pairs':>6}  config")
+        shown = ranked[:TOP_N] + [r for r in ranked[TOP_N:] if r['current']]
+        for r in shown:
+            config = ', '.join(f"{k}={v}" for k, v in r['config'].items())
+            mark = '  <- current' if r['current'] else ''
+            print(f"  {r['average_precision']:>6.3f} {r['best_f1']:>6.3f} {r['best_f1_cutoff'] or 0:>6.3f} "
+                  f"{r['pairs']:>6}  {config}{mark}")
+        print()
+    print(f"Saved to {OUTPUT.relative_to(BASE)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,29 @@
 """
 Wikidata SPARQL Query for Construction Occupations
 License: CC0 (Wikidata)
+
+Queries go through sparql_client: paged with LIMIT/OFFSET, rate limited,
+and cached under data/sparql_cache/, so re-runs within the cache TTL
+make no network requests.
+
+Usage: wikidata_construction.py [--offline] [--refresh] [--endpoint=URL] [--max-rows=N]
+  --offline        answer from the cache only
+  --refresh        ignore cached responses and refetch
+  --endpoint=URL   e.g. a local stand-in: http://127.0.0.1:8890/sparql
+                   (started with: sparql_client.py serve)
 """
 
 import json
-import urllib.request
-import urllib.parse
+import sys
 from pathlib import Path
 
-WIKIDATA_ENDPOINT = "https://query.wikidata.org/sparql"
+from sparql_client import SparqlClient, SparqlError, WIKIDATA_ENDPOINT
+
 OUTPUT = Path("data/wikidata_construction.json")
 
+PAGE_SIZE = 500
+MAX_ROWS = 20000
+
 CONSTRUCTION_QUERY = """
 SELECT DISTINCT ?occupation ?occupationLabel ?occupationAltLabel ?field ?fieldLabel
 WHERE {
@@ -42,7 +55,7 @@ WHERE {
 
   SERVICE wikibase:label { bd:serviceParam wikibase:language "en". }
 }
-LIMIT 200
+ORDER BY ?occupation ?field
 """
 
 UK_US_TERMS_QUERY = """
@@ -63,30 +76,27 @@ WHERE {
   # Only items with both UK and US labels
   FILTER(BOUND(?enGbLabel) || BOUND(?enUsLabel))
 }
-LIMIT 500
+ORDER BY ?item
 """
 
-def query_wikidata(query):
-    """Execute SPARQL query against Wikidata"""
-    params = {"query": query, "format": "json"}
-    url = f"{WIKIDATA_ENDPOINT}?{urllib.parse.urlencode(params)}"
-
-    req = urllib.request.Request(url)
-    req.add_header("User-Agent", "OntologyCrosswalk/1.0 (research project)")
-    req.add_header("Accept", "application/json")
-
+def query_wikidata(client, query, max_rows=MAX_ROWS):
+    """Execute SPARQL query against Wikidata (all pages)"""
     try:
-        with urllib.request.urlopen(req, timeout=30) as response:
-            return json.loads(response.read().decode("utf-8"))
-    except Exception as e:
+        return client.query_paged(query, page_size=PAGE_SIZE, max_rows=max_rows)
+    except SparqlError as e:
         print(f"Error querying Wikidata: {e}")
         return None
 
 def main():
+    flags = dict(a[2:].partition('=')[::2] for a in sys.argv[1:] if a.startswith('--'))
+    client = SparqlClient(endpoint=flags.get('endpoint') or WIKIDATA_ENDPOINT,
+                          offline='offline' in flags, refresh='refresh' in flags)
+    max_rows = int(flags['max-rows']) if flags.get('max-rows') else MAX_ROWS
+
     print("Querying Wikidata for construction occupations...")
 
     # Query occupations
-    results = query_wikidata(CONSTRUCTION_QUERY)
+    results = query_wikidata(client, CONSTRUCTION_QUERY, max_rows)
 
     if not results:
         print("Failed to query Wikidata")
@@ -107,7 +117,7 @@ def main():
 
     # Query UK/US terms
     print("\nQuerying Wikidata for UK/US terminology variants...")
-    uk_us_results = query_wikidata(UK_US_TERMS_QUERY)
+    uk_us_results = query_wikidata(client, UK_US_TERMS_QUERY, max_rows)
 
     uk_us_terms = []
     if uk_us_results:
@@ -141,6 +151,7 @@ def main():
         json.dump(output, f, indent=2, ensure_ascii=False)
 
     print(f"\nSaved to: {OUTPUT}")
+    print(f"  SPARQL requests: {client.stats['requests']}, cache hits: {client.stats['cache_hits']}")
 
     # Show sample
     print("\nSample occupations:")
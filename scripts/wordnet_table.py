@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""Precomputed WordNet expansion table for the node vocabulary.
+
+Walking wordnet.synsets / lemmas / hypernyms at match time needs NLTK,
+the WordNet corpus and (on first use) a network download. This module
+splits that into two steps:
+
+  build   run once where NLTK is available: expand every token in
+          extracted/*.json and write data/enhanced/wordnet_table.json
+  load    WordNetTable.load() reads the table with plain json - no NLTK
+          import, no corpus, no network - so matchers can use WordNet
+          expansions in an air-gapped environment
+
+Table layout (compact; expansion strings are stored once):
+
+  {"_meta": {..., "relations": ["synonym", "hypernym"], "weights": [1.0, 0.5]},
+   "expansions": ["building material", "framing", ...],
+   "terms": {"frame": [expansion_id, relation_id, expansion_id, relation_id, ...]}}
+
+The curated UK/US synonyms in data/enhanced/wordnet_expansions.json are
+merged in, so the table is still useful when built without WordNet.
+
+Usage: wordnet_table.py [build]   (build is the default)
+       wordnet_table.py <term>... (look up terms in the built table)
+"""
+
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+BASE = Path(__file__).parent.parent
+EXTRACTED = BASE / "extracted"
+ENHANCED = BASE / "data" / "enhanced"
+TABLE_FILE = ENHANCED / "wordnet_table.json"
+CURATED_FILE = ENHANCED / "wordnet_expansions.json"
+
+RELATIONS = ["synonym", "hypernym"]
+RELATION_WEIGHTS = {"synonym": 1.0, "hypernym": 0.5}
+MAX_SYNONYMS = 10
+MAX_HYPERNYMS = 5
+
+
+# =============================================================================
+# BUILD
+# =============================================================================
+
+def vocabulary() -> list:
+    """Sorted set of node tokens across extracted/*.json."""
+    vocab = set()
+    for path in sorted(EXTRACTED.glob("*.json")):
+        with open(path) as f:
+            for node in json.load(f):
+                vocab.update(t.lower() for t in node.get('tokens', []))
+    return sorted(vocab)
+
+
+def _lemma_text(lemma) -> str:
+    return lemma.name().replace('_', ' ').lower()
+
+
+def wordnet_relations(wordnet, term: str) -> dict:
+    """{'synonym': [...], 'hypernym': [...]} in WordNet sense order."""
+    synonyms, hypernyms = {}, {}
+    for syn in wordnet.synsets(term):
+        for lemma in syn.lemmas():
+            name = _lemma_text(lemma)
+            if name != term:
+                synonyms.setdefault(name, None)
+        for hyper in syn.hypernyms():
+            for lemma in hyper.lemmas():
+                hypernyms.setdefault(_lemma_text(lemma), None)
+    return {"synonym": list(synonyms)[:MAX_SYNONYMS],
+            "hypernym": [h for h in hypernyms if h not in synonyms][:MAX_HYPERNYMS]}
+
+
+def curated_relations() -> dict:
+    """Curated expansions keyed by term (wordnet_expansions.json layout)."""
+    if not CURATED_FILE.exists():
+        return {}
+    with open(CURATED_FILE) as f:
+        expansions = json.load(f).get('expansions', {})
+    return {term.lower(): {"synonym": [s.lower() for s in e.get('synonyms', [])],
+                           "hypernym": [h.lower() for h in e.get('hypernyms', [])]}
+            for term, e in expansions.items()}
+
+
+def build_table(vocab: list, wordnet=None) -> dict:
+    """Expand the vocabulary (plus curated terms) into the compact table."""
+    relations = {}
+    if wordnet is not None:
+        for term in vocab:
+            rel = wordnet_relations(wordnet, term)
+            if rel["synonym"] or rel["hypernym"]:
+                relations[term] = rel
+    for term, rel in curated_relations().items():
+        merged = relations.setdefault(term, {"synonym": [], "hypernym": []})
+        for name in RELATIONS:
+            merged[name] += [x for x in rel[name] if x not in merged[name] and x != term]
+
+    expansions = sorted({x for rel in relations.values() for names in rel.values() for x in names})
+    index = {x: i for i, x in enumerate(expansions)}
+    terms = {}
+    for term in sorted(relations):
+        row = []
+        for rel_id, name in enumerate(RELATIONS):
+            for x in relations[term][name]:
+                row += [index[x], rel_id]
+        terms[term] = row
+
+    return {
+        "_meta": {
+            "source": ("Princeton WordNet + " if wordnet is not None else "") + "curated UK/US synonyms",
+            "license": "WordNet License (BSD-like) / CC0",
+            "built_at": datetime.now().isoformat(),
+            "vocabulary": len(vocab),
+            "relations": RELATIONS,
+            "weights": [RELATION_WEIGHTS[name] for name in RELATIONS],
+        },
+        "expansions": expansions,
+        "terms": terms,
+    }
+
+
+# =============================================================================
+# LOAD
+# =============================================================================
+
+class WordNetTable:
+    """Read-only term -> [(expansion, relation, weight)] lookups."""
+
+    def __init__(self, data: dict):
+        meta = data["_meta"]
+        self.meta = meta
+        self.relations = meta["relations"]
+        self.weights = meta["weights"]
+        self.expansions = data["expansions"]
+        self.terms = data["terms"]
+
+    @classmethod
+    def load(cls, path: Path = TABLE_FILE):
+        with open(path) as f:
+            return cls(json.load(f))
+
+    def __contains__(self, term: str) -> bool:
+        return term in self.terms
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def expand(self, term: str) -> list:
+        """[(expansion, relation, weight)] for one term, synonyms first."""
+        row = self.terms.get(term, ())
+        return [(self.expansions[row[i]], self.relations[row[i + 1]], self.weights[row[i + 1]])
+                for i in range(0, len(row), 2)]
+
+    def weighted(self, tokens) -> dict:
+        """{term: weight} for tokens (weight 1.0) and their expansions."""
+        out = {t: 1.0 for t in tokens}
+        for t in tokens:
+            for x, _, w in self.expand(t):
+                if w > out.get(x, 0.0):
+                    out[x] = w
+        return out
+
+    def expand_tokens(self, tokens, min_weight: float = 1.0) -> set:
+        """Tokens plus single-word expansions weighing at least min_weight."""
+        expanded = set(tokens)
+        for t in tokens:
+            for x, _, w in self.expand(t):
+                if w >= min_weight and ' ' not in x:
+                    expanded.add(x)
+        return expanded
+
+
+def load_table(path: Path = TABLE_FILE):
+    """The built table, or None if it has not been built."""
+    return WordNetTable.load(path) if path.exists() else None
+
+
+def main():
+    args = sys.argv[1:]
+    if args and args[0] != 'build':
+        table = load_table()
+        if table is None:
+            print(f"No table at {TABLE_FILE} (run: wordnet_table.py build)")
+            sys.exit(1)
+        for term in args:
+            print(f"{term}:")
+            for x, rel, w in table.expand(term.lower()):
+                print(f"  {rel:<9} {w:.1f}  {x}")
+        return
+
+    from enhance_all_methods import load_wordnet
+    vocab = vocabulary()
+    print(f"Vocabulary: {len(vocab)} tokens from {EXTRACTED}")
+    table = build_table(vocab, load_wordnet())
+    ENHANCED.mkdir(parents=True, exist_ok=True)
+    with open(TABLE_FILE, "w") as f:
+        json.dump(table, f, separators=(',', ':'))
+    print(f"Expanded {len(table['terms'])} terms -> {len(table['expansions'])} expansions "
+          f"({table['_meta']['source']})")
+    print(f"Saved to {TABLE_FILE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+"""Candidate stream: filters on the final crosswalk layout."""
+
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from candidate_stream import stream_crosswalk  # noqa: E402
+
+
+def _crosswalk(tmp_path):
+    path = tmp_path / "final_crosswalk.json"
+    mappings = [{'naics_code': f'naics:2{tier}', 'uniclass_code': 'uc:Ss_25', 'final_tier': tier,
+                 'methods': ['embedding']} for tier in (1, 2, 3, 4)]
+    path.write_text(json.dumps({'_meta': {}, 'mappings': mappings}))
+    return path
+
+
+def test_confidence_selects_tiers(tmp_path):
+    path = _crosswalk(tmp_path)
+    assert [m['final_tier'] for _, m in stream_crosswalk(path, confidence='A')] == [1]
+    assert [m['final_tier'] for _, m in stream_crosswalk(path, confidence=['B', 'D'])] == [2, 4]
+
+
+def test_confidence_and_tiers_both_apply(tmp_path):
+    path = _crosswalk(tmp_path)
+    assert [m['final_tier'] for _, m in stream_crosswalk(path, confidence=['A', 'B'], tiers=[2, 3])] == [2]
+    assert list(stream_crosswalk(path, confidence='A', tiers=4)) == []
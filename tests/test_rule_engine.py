@@ -0,0 +1,31 @@
+"""Rule engine: conditions with missing operands."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from rule_engine import compile_condition, compile_expression  # noqa: E402
+
+
+def test_or_with_missing_operand():
+    cond = compile_condition("sqft >= 2500 OR stories >= 2")
+    assert cond({"stories": 3}) is True
+    assert cond({"stories": 1}) is False
+    assert cond({}) is False
+
+
+def test_not_with_missing_operand():
+    assert compile_condition("NOT sqft >= 2500")({}) is True
+    assert compile_condition("NOT sqft >= 2500")({"sqft": 3000}) is False
+
+
+def test_and_with_missing_operand():
+    cond = compile_condition("site.gas_available == true AND selection.water_heater == 'tank_gas'")
+    assert cond({"site.gas_available": True}) is False
+    assert cond({"site.gas_available": True, "selection.water_heater": "tank_gas"}) is True
+
+
+def test_arithmetic_with_missing_operand():
+    assert compile_expression("room.sqft / 25")({}) is None
+    assert compile_expression("room.sqft / 25")({"room.sqft": 250}) == 10
@@ -0,0 +1,28 @@
+"""Triple store: one term per IRI whatever its spelling."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from triple_store import TripleStore  # noqa: E402
+
+BRICK = "https://brickschema.org/schema/Brick#"
+
+
+def test_curie_and_full_iri_are_one_term():
+    store = TripleStore()
+    store.add(f"<{BRICK}AHU>", "rdf:type", "owl:Class")   # owl: unknown yet
+    store.add_prefixes({"brick": BRICK, "owl": "http://www.w3.org/2002/07/owl#"})
+    store.add("brick:AHU", "rdf:type", "owl:Class")
+    assert len(store) == 1
+    assert list(store.triples("brick:AHU")) == [("brick:AHU", "rdf:type", "owl:Class")]
+    assert list(store.triples(f"<{BRICK}AHU>")) == [("brick:AHU", "rdf:type", "owl:Class")]
+
+
+def test_clashing_prefix_gets_a_new_name():
+    store = TripleStore()
+    names = store.add_prefixes({"schema": "http://schema.org/", "s": "https://schema.org/"})
+    assert names == {"schema": "schema2", "s": "schema"}
+    store.add("<http://schema.org/Thing>", "rdf:type", "<https://schema.org/Thing>")
+    assert list(store.triples()) == [("schema2:Thing", "rdf:type", "schema:Thing")]